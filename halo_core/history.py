@@ -0,0 +1,349 @@
+# halo_core/history.py
+"""
+Persistent command history.
+
+Every voice command that makes it past the recorder (completed, no speech,
+failed in a stage, or dropped) is appended to a SQLite table (WAL). The stored
+fields are transcript, reply, intents, outcome, per-stage timings, mic levels
+and whether the LLM's JSON parsed. record() only enqueues. A single writer
+thread batches rows into one transaction, so the voice loop never waits on disk
+and concurrent readers (the CLI, cache pre-warming) don't block it.
+
+Indexes cover the usual questions: time ranges (ts), per-action and per-outcome
+slices, and a partial index over parse failures. Retention is applied by the
+writer every COMPACT_EVERY rows and at startup. It drops rows older than
+HALO_HISTORY_DAYS, keeps at most HALO_HISTORY_MAX_ROWS, and truncates the WAL.
+
+CLI:
+  python -m halo_core.history slowest  [--days 7] [--limit 10]
+  python -m halo_core.history frequent [--days 30] [--limit 10]
+  python -m halo_core.history failures [--days 7] [--limit 10]
+  python -m halo_core.history recent   [--limit 20]
+  python -m halo_core.history compact
+
+Env knobs:
+  HALO_HISTORY            1 = on, 0 = off                     (default: 1)
+  HALO_HISTORY_DB         database path                       (default: <project>/data/history.db)
+  HALO_HISTORY_DAYS       retention in days                   (default: 90)
+  HALO_HISTORY_MAX_ROWS   row cap after compaction            (default: 50000)
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+HISTORY_ENABLED = os.getenv("HALO_HISTORY", "1") != "0"
+DB_PATH = Path(os.getenv("HALO_HISTORY_DB", str(PROJECT_ROOT / "data" / "history.db")))
+RETENTION_DAYS = float(os.getenv("HALO_HISTORY_DAYS", "90"))
+MAX_ROWS = int(os.getenv("HALO_HISTORY_MAX_ROWS", "50000"))
+QUEUE_MAX = 1000
+BATCH_MAX = 200
+COMPACT_EVERY = 500
+
+OK, NO_SPEECH, ERROR, DROPPED = "ok", "no_speech", "error", "dropped"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS commands ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, command_id INTEGER,"
+    " transcript TEXT, norm TEXT, reply TEXT, intents TEXT, action TEXT,"
+    " outcome TEXT NOT NULL, stage TEXT, error TEXT,"
+    " parse_ok INTEGER NOT NULL DEFAULT 1, llm_raw TEXT,"
+    " total_s REAL, timings TEXT, meta TEXT);"
+    "CREATE INDEX IF NOT EXISTS commands_ts ON commands (ts);"
+    "CREATE INDEX IF NOT EXISTS commands_action ON commands (action, ts);"
+    "CREATE INDEX IF NOT EXISTS commands_outcome ON commands (outcome, ts);"
+    "CREATE INDEX IF NOT EXISTS commands_parse_failed ON commands (ts) WHERE parse_ok = 0;"
+)
+_COLUMNS = ("ts", "command_id", "transcript", "norm", "reply", "intents", "action", "outcome", "stage",
+            "error", "parse_ok", "llm_raw", "total_s", "timings", "meta")
+_INSERT = f"INSERT INTO commands ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+_NORM_STRIP = re.compile(r"[^\w\s']+")
+
+
+def normalize_utterance(text: str) -> str:
+    """Grouping key for "same thing said twice": lowercase, no punctuation, single spaces."""
+    return " ".join(_NORM_STRIP.sub(" ", text.lower()).split())
+
+
+@dataclass
+class CommandRecord:
+    transcript: str
+    outcome: str = OK
+    reply: str = ""
+    intents: List[Dict[str, Any]] = field(default_factory=list)
+    command_id: Optional[int] = None
+    stage: Optional[str] = None           # stage that failed (outcome=error)
+    error: Optional[str] = None
+    parse_ok: bool = True
+    llm_raw: Optional[str] = None         # kept only when parsing failed
+    total_s: Optional[float] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    ts: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_context(cls, ctx, outcome: str = OK, stage: Optional[str] = None,
+                     error: Optional[BaseException] = None) -> "CommandRecord":
+        """Snapshot a pipeline CommandContext (copies, so later mutation doesn't leak in)."""
+        meta = dict(ctx.meta)
+        parse_error = meta.pop("parse_error", None)
+        llm_raw = meta.pop("llm_raw", None)
+        return cls(
+            transcript=ctx.text, outcome=outcome, reply=ctx.reply, intents=list(ctx.intents),
+            command_id=ctx.id, stage=stage, error=f"{type(error).__name__}: {error}" if error else parse_error,
+            parse_ok=parse_error is None, llm_raw=llm_raw if parse_error else None,
+            total_s=ctx.elapsed(), timings=dict(ctx.timings), meta=meta, ts=ctx.created,
+        )
+
+    def row(self) -> tuple:
+        action = next((i.get("action") for i in self.intents if i.get("action")), None)
+        return (self.ts, self.command_id, self.transcript, normalize_utterance(self.transcript or ""),
+                self.reply, json.dumps(self.intents, ensure_ascii=False), action, self.outcome, self.stage,
+                self.error, int(self.parse_ok), self.llm_raw, self.total_s,
+                json.dumps({k: round(v, 4) for k, v in self.timings.items()}),
+                json.dumps(self.meta, ensure_ascii=False, default=str))
+
+
+class CommandHistory:
+    _instance: Optional["CommandHistory"] = None
+
+    def __init__(self, db_path: Path = DB_PATH, retention_days: float = RETENTION_DAYS,
+                 max_rows: int = MAX_ROWS, enabled: bool = HISTORY_ENABLED):
+        self.db_path = Path(db_path)
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self.enabled = enabled
+        self._queue: "queue.Queue[Optional[CommandRecord]]" = queue.Queue(maxsize=QUEUE_MAX)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._reader: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self._since_compact = 0
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "compacted": 0, "errors": 0}
+
+    @classmethod
+    def get_instance(cls) -> "CommandHistory":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # ---------- writing ----------
+    def record(self, rec: CommandRecord):
+        """Enqueue one command; never blocks (a full queue drops the row and counts it)."""
+        if not self.enabled:
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(rec)
+            self.stats["queued"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def flush(self):
+        """Wait until everything recorded so far is committed."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(timeout=5.0)
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Apply retention (age, then row cap) and truncate the WAL; returns rows deleted."""
+        db = self._connect()
+        try:
+            return self._compact(db, now if now is not None else time.time())
+        finally:
+            db.close()
+
+    # ---------- queries ----------
+    def slowest(self, days: float = 7, limit: int = 10, action: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Completed commands with the longest end-to-end time since `days` ago."""
+        sql = ("SELECT ts, transcript, action, total_s, timings FROM commands"
+               " WHERE ts >= ? AND outcome = ?")
+        args: List[Any] = [self._since(days), OK]
+        if action:
+            sql += " AND action = ?"
+            args.append(action)
+        rows = self._query(sql + " ORDER BY total_s DESC LIMIT ?", (*args, limit))
+        return [{"ts": ts, "transcript": text, "action": act, "total_s": total, "timings": json.loads(timings or "{}")}
+                for ts, text, act, total, timings in rows]
+
+    def frequent_utterances(self, days: float = 30, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most repeated utterances (normalized) with their usual action and typical latency."""
+        rows = self._query(
+            "SELECT norm, COUNT(*) AS n, MAX(ts), AVG(total_s),"
+            " (SELECT c2.action FROM commands c2 WHERE c2.norm = c.norm AND c2.action IS NOT NULL"
+            "  GROUP BY c2.action ORDER BY COUNT(*) DESC LIMIT 1)"
+            " FROM commands c WHERE ts >= ? AND norm != '' GROUP BY norm ORDER BY n DESC, MAX(ts) DESC LIMIT ?",
+            (self._since(days), limit))
+        return [{"utterance": norm, "count": n, "last_ts": last, "avg_s": avg, "action": act}
+                for norm, n, last, avg, act in rows]
+
+    def parse_failures(self, days: float = 7, limit: int = 10) -> List[Dict[str, Any]]:
+        """Commands whose LLM output wasn't valid JSON, newest first, with the raw output."""
+        rows = self._query(
+            "SELECT ts, transcript, error, llm_raw FROM commands WHERE parse_ok = 0 AND ts >= ?"
+            " ORDER BY ts DESC LIMIT ?", (self._since(days), limit))
+        return [{"ts": ts, "transcript": text, "error": err, "llm_raw": raw} for ts, text, err, raw in rows]
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT ts, transcript, action, outcome, total_s, reply FROM commands ORDER BY ts DESC LIMIT ?", (limit,))
+        return [{"ts": ts, "transcript": text, "action": act, "outcome": outcome, "total_s": total, "reply": reply}
+                for ts, text, act, outcome, total, reply in rows]
+
+    def counts(self, days: float = 7) -> Dict[str, int]:
+        """Commands per outcome since `days` ago."""
+        return dict(self._query("SELECT outcome, COUNT(*) FROM commands WHERE ts >= ? GROUP BY outcome",
+                                (self._since(days),)))
+
+    # ---------- internals ----------
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10.0)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(_SCHEMA)
+        return db
+
+    def _query(self, sql: str, args: tuple = ()) -> List[tuple]:
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = self._connect()
+            return self._reader.execute(sql, args).fetchall()
+
+    @staticmethod
+    def _since(days: float) -> float:
+        return time.time() - days * 86400.0
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="halo-history", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        db = self._connect()
+        try:
+            self._compact(db, time.time())
+            while True:
+                first = self._queue.get()
+                batch = [first]
+                while len(batch) < BATCH_MAX:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                records = [r for r in batch if r is not None]
+                try:
+                    if records:
+                        with db:
+                            db.executemany(_INSERT, [r.row() for r in records])
+                        self.stats["written"] += len(records)
+                        self.stats["batches"] += 1
+                        self._since_compact += len(records)
+                        if self._since_compact >= COMPACT_EVERY:
+                            self._compact(db, time.time())
+                except sqlite3.Error as e:
+                    self.stats["errors"] += 1
+                    print(f"[History] ⚠️ Write failed: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if len(records) != len(batch):
+                    return  # close() sentinel
+        finally:
+            db.close()
+
+    def _compact(self, db: sqlite3.Connection, now: float) -> int:
+        self._since_compact = 0
+        with db:
+            deleted = db.execute("DELETE FROM commands WHERE ts < ?",
+                                 (now - self.retention_days * 86400.0,)).rowcount
+            deleted += db.execute(
+                "DELETE FROM commands WHERE id <= (SELECT id FROM commands ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_rows,)).rowcount
+        if deleted:
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.stats["compacted"] += deleted
+        return deleted
+
+
+def get_history() -> CommandHistory:
+    return CommandHistory.get_instance()
+
+
+# ───────────────────────────────────────────────────────────
+# CLI
+# ───────────────────────────────────────────────────────────
+def _when(ts: float) -> str:
+    return dt.datetime.fromtimestamp(ts).strftime("%a %m-%d %H:%M")
+
+
+def _secs(value: Optional[float]) -> str:
+    return f"{value:6.2f}s" if value is not None else "     -"
+
+
+def main(argv: Optional[List[str]] = None, history: Optional[CommandHistory] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m halo_core.history", description="Query Halo's command history.")
+    parser.add_argument("--db", type=Path, default=None, help=f"database (default: {DB_PATH})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for name, days in (("slowest", 7), ("frequent", 30), ("failures", 7)):
+        p = sub.add_parser(name)
+        p.add_argument("--days", type=float, default=days)
+        p.add_argument("--limit", type=int, default=10)
+        if name == "slowest":
+            p.add_argument("--action", default=None, help="only this action")
+    sub.add_parser("recent").add_argument("--limit", type=int, default=20)
+    sub.add_parser("compact")
+    args = parser.parse_args(argv)
+
+    history = history or CommandHistory(args.db or DB_PATH)
+    try:
+        if args.cmd == "slowest":
+            for r in history.slowest(args.days, args.limit, args.action):
+                stages = " ".join(f"{k}={v:.2f}" for k, v in r["timings"].items())
+                print(f"{_when(r['ts'])}  {_secs(r['total_s'])}  {r['action'] or '-':<16} {r['transcript']!r}  [{stages}]")
+        elif args.cmd == "frequent":
+            for r in history.frequent_utterances(args.days, args.limit):
+                print(f"{r['count']:5d}x  {_secs(r['avg_s'])}  {r['action'] or '-':<16} {r['utterance']!r}")
+        elif args.cmd == "failures":
+            for r in history.parse_failures(args.days, args.limit):
+                raw = " ".join((r["llm_raw"] or "").split())[:120]
+                print(f"{_when(r['ts'])}  {r['transcript']!r}\n    {r['error']}\n    raw: {raw}")
+        elif args.cmd == "recent":
+            for r in history.recent(args.limit):
+                print(f"{_when(r['ts'])}  {r['outcome']:<9} {_secs(r['total_s'])}  {r['action'] or '-':<16} "
+                      f"{r['transcript']!r}")
+        elif args.cmd == "compact":
+            print(f"[History] Removed {history.compact()} row(s)")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
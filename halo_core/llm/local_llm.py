@@ -6,17 +6,50 @@ class LocalLLM:
     def __init__(self, model="gemma3:4b", api_url="http://localhost:11434/api/generate"):
         self.model = model
         self.api_url = api_url
+        # Token counts / durations reported by Ollama for the last call
+        self.last_stats = {}
 
-    def generate(self, prompt: str, stream: bool = False) -> str:
+    def _record_stats(self, data: dict):
+        """Keep Ollama's token accounting (prompt_eval_count / eval_count) for tracing."""
+        self.last_stats = {
+            "prompt_tokens": data.get("prompt_eval_count"),
+            "completion_tokens": data.get("eval_count"),
+            "load_ms": (data.get("load_duration") or 0) / 1e6,
+            "prompt_eval_ms": (data.get("prompt_eval_duration") or 0) / 1e6,
+            "eval_ms": (data.get("eval_duration") or 0) / 1e6,
+        }
+
+    def warm_up(self, keep_alive: str = "30m") -> bool:
+        """
+        Ask Ollama to load the model into memory (empty prompt) so the first
+        real command doesn't pay the model load.
+        """
+        try:
+            resp = requests.post(
+                self.api_url,
+                json={"model": self.model, "keep_alive": keep_alive},
+                timeout=120,
+            )
+            resp.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"[LocalLLM] ⚠️ Warm-up failed: {e}")
+            return False
+
+    def generate(self, prompt: str, stream: bool = False, raise_errors: bool = False) -> str:
         """
         Generate a response from the local Ollama model.
 
         - stream=False → returns the full text as a string (default)
         - stream=True  → streams chunks and returns concatenated string at the end
+        - raise_errors → re-raise failures instead of returning an in-character
+          apology (for callers that store or post-process the text)
         """
         if not prompt or not prompt.strip():
             return ""
 
+        self.last_stats = {}
+
         payload = {
             "model": self.model,
             "prompt": prompt,
@@ -29,6 +62,7 @@ class LocalLLM:
                 resp = requests.post(self.api_url, json=payload, timeout=60)
                 resp.raise_for_status()
                 data = resp.json()
+                self._record_stats(data)
                 return data.get("response", "").strip()
 
             # 🟡 Streaming: collect and merge chunks
@@ -43,6 +77,8 @@ class LocalLLM:
                         chunk = data.get("response", "")
                         if chunk:
                             chunks.append(chunk)
+                        if data.get("done"):
+                            self._record_stats(data)
                     except json.JSONDecodeError:
                         # Ignore malformed partial lines gracefully
                         continue
@@ -50,8 +86,12 @@ class LocalLLM:
 
         except requests.exceptions.RequestException as e:
             print(f"[LocalLLM] ❌ Network or API error: {e}")
+            if raise_errors:
+                raise
             return "(...ugh, my brain froze. Try again?)"
 
         except Exception as e:
             print(f"[LocalLLM] ❌ Unexpected error: {e}")
+            if raise_errors:
+                raise
             return "(Something went wrong with my thoughts...)"
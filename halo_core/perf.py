@@ -0,0 +1,145 @@
+# halo_core/perf.py
+"""
+Performance snapshots for the HUD overlay.
+
+A PerfPublisher thread gathers everything the overlay shows at a fixed low rate
+(HALO_PERF_INTERVAL): recent per-stage latencies from the tracer, CPU/RAM,
+model residency, cache hit rates and queue depths. Each round it builds a new
+immutable PerfSnapshot and swaps it into `latest` with a single reference
+assignment. Readers (the Qt timer) take that reference without a lock, and the
+voice thread never does any of this work.
+
+Sources are plain callables registered by main.py; each returns a dict with
+any of the keys "cpu", "mem", "residency", "hit_rates", "queues". A failing
+source is skipped for that round.
+
+Env knobs:
+  HALO_PERF_INTERVAL   seconds between snapshots            (default: 1.0)
+  HALO_PERF_HISTORY    commands shown per stage sparkline   (default: 20)
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from halo_core.tracing import get_tracer
+
+PERF_INTERVAL = float(os.getenv("HALO_PERF_INTERVAL", "1.0"))
+PERF_HISTORY = int(os.getenv("HALO_PERF_HISTORY", "20"))
+STAGES = ("stt", "llm", "skills", "tts", "command")
+
+Source = Callable[[], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class PerfSnapshot:
+    ts: float = 0.0
+    seq: int = 0
+    latencies_ms: Dict[str, Tuple[float, ...]] = field(default_factory=dict)  # stage -> last N, oldest first
+    cpu: Optional[float] = None
+    mem: Optional[float] = None
+    residency: Dict[str, bool] = field(default_factory=dict)                 # model/component -> loaded
+    hit_rates: Dict[str, float] = field(default_factory=dict)                # cache -> 0..1
+    queues: Dict[str, int] = field(default_factory=dict)                     # queue -> depth
+
+
+class PerfPublisher:
+    _instance: Optional["PerfPublisher"] = None
+
+    def __init__(self, interval: float = PERF_INTERVAL, history: int = PERF_HISTORY,
+                 stages: Tuple[str, ...] = STAGES):
+        self.interval = interval
+        self.history = history
+        self.stages = stages
+        self.latest = PerfSnapshot()
+        self._sources: List[Tuple[str, Source]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+        self.errors: Dict[str, str] = {}
+
+    @classmethod
+    def get_instance(cls) -> "PerfPublisher":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def add_source(self, name: str, source: Source):
+        self._sources.append((name, source))
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="halo-perf", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def publish(self) -> PerfSnapshot:
+        """Build one snapshot from the tracer and every source, and make it `latest`."""
+        tracer = get_tracer()
+        latencies = {}
+        for stage in self.stages:
+            values = tracer.last(stage, self.history)
+            if values:
+                latencies[stage] = tuple(round(v * 1000.0, 1) for v in values)
+        merged: Dict[str, Any] = {"residency": {}, "hit_rates": {}, "queues": {}}
+        for name, source in self._sources:
+            try:
+                data = source() or {}
+            except Exception as e:
+                self.errors[name] = f"{type(e).__name__}: {e}"
+                continue
+            for key, value in data.items():
+                if isinstance(merged.get(key), dict) and isinstance(value, dict):
+                    merged[key].update(value)
+                else:
+                    merged[key] = value
+        self._seq += 1
+        snapshot = PerfSnapshot(
+            ts=time.time(), seq=self._seq, latencies_ms=latencies,
+            cpu=merged.get("cpu"), mem=merged.get("mem"),
+            residency=merged["residency"], hit_rates=merged["hit_rates"], queues=merged["queues"],
+        )
+        self.latest = snapshot  # single reference swap; readers never lock
+        return snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.publish()
+            self._stop.wait(self.interval)
+
+
+def get_perf() -> PerfPublisher:
+    return PerfPublisher.get_instance()
+
+
+def ollama_residency(api_base: str, models: List[str], timeout: float = 0.5) -> Dict[str, bool]:
+    """Which of `models` Ollama currently has loaded (GET /api/ps)."""
+    import requests
+    resp = requests.get(api_base.rstrip("/") + "/api/ps", timeout=timeout)
+    resp.raise_for_status()
+    loaded = set()
+    for m in resp.json().get("models", []):
+        loaded.update((m.get("name"), m.get("model")))
+    return {m: m in loaded for m in models}
+
+
+def throttled(source: Source, every_s: float) -> Source:
+    """Wrap a slow source (HTTP probe) so it runs at most every `every_s`; repeats its last result between."""
+    state: Dict[str, Any] = {"at": float("-inf"), "value": {}}
+
+    def wrapper() -> Dict[str, Any]:
+        now = time.monotonic()
+        if now - state["at"] >= every_s:
+            state["at"] = now  # also on failure, so a dead endpoint isn't hammered
+            state["value"] = source()
+        return state["value"]
+    return wrapper
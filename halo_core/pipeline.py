@@ -0,0 +1,288 @@
+# halo_core/pipeline.py
+"""
+Multi-stage voice orchestrator.
+
+A command flows through a chain of stages (record → STT → LLM → skills → TTS).
+Each stage is a worker thread connected to the next one by a bounded queue, and
+every command carries a CommandContext through the chain. The source (wake word +
+recording) runs on the caller's thread and goes straight back to listening as
+soon as it has handed a recording to the first queue.
+
+Modes:
+  - "pipelined": one worker per stage, stages overlap across commands
+  - "serial":    the old behaviour — source and stages run one after another
+                 on a single thread
+
+Env knobs:
+  HALO_PIPELINE_MODE        pipelined | serial              (default: pipelined)
+  HALO_PIPELINE_QUEUE_SIZE  per-stage queue capacity         (default: 2)
+  HALO_PIPELINE_POLICY      block | drop_oldest | drop_newest (default: block)
+"""
+from __future__ import annotations
+import collections
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from halo_core.tracing import get_tracer
+
+MODES = ("pipelined", "serial")
+POLICIES = ("block", "drop_oldest", "drop_newest")
+
+PIPELINE_MODE = os.getenv("HALO_PIPELINE_MODE", "pipelined").lower().strip()
+QUEUE_SIZE = int(os.getenv("HALO_PIPELINE_QUEUE_SIZE", "2"))
+DROP_POLICY = os.getenv("HALO_PIPELINE_POLICY", "block").lower().strip()
+
+_command_ids = itertools.count(1)
+
+
+@dataclass
+class CommandContext:
+    """Everything one voice command accumulates on its way through the stages."""
+    id: int = field(default_factory=lambda: next(_command_ids))
+    created: float = field(default_factory=time.time)
+    audio_path: Optional[str] = None
+    text: str = ""
+    reply: str = ""
+    intents: List[Dict[str, Any]] = field(default_factory=list)
+    skill_responses: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def elapsed(self) -> float:
+        return time.time() - self.created
+
+
+class StageQueue:
+    """
+    Bounded FIFO between two stages with a configurable back-pressure policy.
+
+    - block:       producer waits until there is room
+    - drop_oldest: evict the oldest queued command to make room
+    - drop_newest: refuse the incoming command
+    """
+
+    def __init__(self, name: str, maxsize: int = QUEUE_SIZE, policy: str = DROP_POLICY,
+                 on_drop: Optional[Callable[[Any], None]] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown back-pressure policy '{policy}' (expected one of {POLICIES})")
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._items: Deque[Any] = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item: Any) -> bool:
+        """Enqueue an item. Returns False if it (or nothing) was accepted because of the policy."""
+        evicted = None
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    evicted = item
+                elif self.policy == "drop_oldest":
+                    evicted = self._items.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return False
+            if evicted is not item:
+                self._items.append(item)
+                self._cond.notify_all()
+        if evicted is not None and self.on_drop:
+            self.on_drop(evicted)
+        return evicted is not item
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Dequeue the next item, or None when closed/timed out."""
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._items and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+StageFunc = Callable[[CommandContext], Optional[CommandContext]]
+
+
+class Stage:
+    """
+    One step of the chain. `func(ctx)` returns the context to pass on,
+    or None to finish the command early (e.g. no speech detected).
+    """
+
+    def __init__(self, name: str, func: StageFunc, *, maxsize: Optional[int] = None,
+                 policy: Optional[str] = None):
+        self.name = name
+        self.func = func
+        self.maxsize = QUEUE_SIZE if maxsize is None else maxsize
+        self.policy = policy or DROP_POLICY
+        self.processed = 0
+        self.busy = False
+        self.inbox: Optional[StageQueue] = None
+
+
+class Pipeline:
+    """
+    Runs `source()` → stages in either pipelined or serial mode.
+
+    `source()` blocks until a new command is captured and returns its context,
+    or None to stop the pipeline. `on_done(ctx)` fires after the last stage,
+    `on_error(stage_name, ctx, exc)` when a stage raises, and `on_drop(ctx)`
+    when back-pressure discards a queued command.
+    """
+
+    def __init__(self, source: Callable[[], Optional[CommandContext]], stages: List[Stage], *,
+                 mode: str = PIPELINE_MODE,
+                 on_done: Optional[Callable[[CommandContext], None]] = None,
+                 on_error: Optional[Callable[[str, CommandContext, BaseException], None]] = None,
+                 on_drop: Optional[Callable[[CommandContext], None]] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown pipeline mode '{mode}' (expected one of {MODES})")
+        self.source = source
+        self.stages = stages
+        self.mode = mode
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_drop = on_drop
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    # ---------- public API ----------
+    def run(self):
+        """Block the calling thread running the source loop until stopped."""
+        if self.mode == "serial":
+            self._run_serial()
+        else:
+            self._run_pipelined()
+
+    def stop(self):
+        self._stop.set()
+        for stage in self.stages:
+            if stage.inbox is not None:
+                stage.inbox.close()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depths, drop counters and throughput per stage."""
+        out: Dict[str, Any] = {"mode": self.mode, "in_flight": self.in_flight(), "stages": {}}
+        for stage in self.stages:
+            q = stage.inbox
+            out["stages"][stage.name] = {
+                "queued": len(q) if q is not None else 0,
+                "dropped": q.dropped if q is not None else 0,
+                "processed": stage.processed,
+                "busy": stage.busy,
+            }
+        return out
+
+    # ---------- internals ----------
+    def _track(self, delta: int):
+        with self._lock:
+            self._in_flight += delta
+
+    def _apply(self, stage: Stage, ctx: CommandContext) -> Optional[CommandContext]:
+        stage.busy = True
+        start = time.perf_counter()
+        tracer = get_tracer()
+        try:
+            with tracer.trace(ctx.id), tracer.span(stage.name):
+                return stage.func(ctx)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(stage.name, ctx, e)
+            return None
+        finally:
+            ctx.timings[stage.name] = time.perf_counter() - start
+            stage.processed += 1
+            stage.busy = False
+
+    def _finish(self, ctx: CommandContext, completed: bool):
+        self._track(-1)
+        if completed and self.on_done:
+            self.on_done(ctx)
+
+    def _dropped(self, ctx: CommandContext):
+        self._track(-1)
+        if self.on_drop:
+            self.on_drop(ctx)
+
+    def _run_serial(self):
+        while not self._stop.is_set():
+            ctx = self.source()
+            if ctx is None:
+                break
+            self._track(+1)
+            current: Optional[CommandContext] = ctx
+            for stage in self.stages:
+                current = self._apply(stage, current)
+                if current is None:
+                    break
+            self._finish(ctx, current is not None)
+
+    def _run_pipelined(self):
+        for stage in self.stages:
+            stage.inbox = StageQueue(stage.name, stage.maxsize, stage.policy, on_drop=self._dropped)
+        for i, stage in enumerate(self.stages):
+            nxt = self.stages[i + 1] if i + 1 < len(self.stages) else None
+            t = threading.Thread(target=self._worker, args=(stage, nxt),
+                                 name=f"halo-stage-{stage.name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+        try:
+            while not self._stop.is_set():
+                ctx = self.source()
+                if ctx is None:
+                    break
+                self._track(+1)
+                if self.stages:
+                    self.stages[0].inbox.put(ctx)
+                else:
+                    self._finish(ctx, True)
+        finally:
+            self.stop()
+
+    def _worker(self, stage: Stage, nxt: Optional[Stage]):
+        while not self._stop.is_set():
+            ctx = stage.inbox.get(timeout=0.5)
+            if ctx is None:
+                continue
+            out = self._apply(stage, ctx)
+            if out is None:
+                self._finish(ctx, False)
+            elif nxt is None:
+                self._finish(out, True)
+            else:
+                nxt.inbox.put(out)
@@ -1,9 +1,12 @@
 # halo_core/skills/__init__.py
 from __future__ import annotations
-import importlib
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional
+
+from .executor import JobEvent, get_executor
+from .planner import PlanRunner, Step, plan_dependencies
+from .registry import SkillRegistry, SkillSpec
 
 ACTION_MAP_PATH = Path(__file__).resolve().parent / "action_map.json"
 if not ACTION_MAP_PATH.exists():
@@ -12,45 +15,8 @@ if not ACTION_MAP_PATH.exists():
 with open(ACTION_MAP_PATH, "r", encoding="utf-8") as f:
     ACTION_MAP: Dict[str, Any] = json.load(f)
 
-
-def _resolve_action_entry(action: str, entry: Any) -> Optional[Tuple[str, str]]:
-    """
-    Normalize different mapping styles into (module_name, func_name).
-
-    Supported shapes in action_map.json:
-      - ["module_name", "function_name"]
-      - {"module": "module_name", "function": "function_name"}
-      - "module_name.function_name"   (string dotted path)
-    """
-    if isinstance(entry, list) and len(entry) == 2:
-        module_name, func_name = entry
-        return str(module_name), str(func_name)
-
-    if isinstance(entry, dict):
-        module_name = entry.get("module")
-        func_name = entry.get("function")
-        if module_name and func_name:
-            return str(module_name), str(func_name)
-
-    if isinstance(entry, str) and "." in entry:
-        module_name, func_name = entry.rsplit(".", 1)
-        return module_name, func_name
-
-    # Unrecognized shape
-    print(f"[Skills] invalid map entry for '{action}': {entry!r}")
-    return None
-
-
-def _import_skill(module_name: str, func_name: str):
-    """
-    Import halo_core.skills.<module_name> and fetch <func_name>.
-    """
-    module = importlib.import_module(f"halo_core.skills.{module_name}")
-    func = getattr(module, func_name, None)
-    if not callable(func):
-        print(f"[Skills] function '{func_name}' not found in module '{module_name}'.")
-        return None
-    return func
+# Built once; callables are resolved lazily on each action's first use.
+REGISTRY = SkillRegistry(ACTION_MAP)
 
 
 def _postprocess_result(action: str, result: Any) -> Optional[str]:
@@ -91,18 +57,55 @@ def _postprocess_result(action: str, result: Any) -> Optional[str]:
         return str(result)
 
 
+def job_event_text(event: JobEvent) -> Optional[str]:
+    """Human-friendly line for a background job event (None if nothing worth saying)."""
+    job = event.job
+    if event.kind == "progress":
+        return f"{job.action}: {event.message}" if event.message else None
+    if event.kind == "done":
+        return _postprocess_result(job.action, job.result)
+    if event.kind == "failed":
+        return f"Ugh, {job.action} failed: {job.error}"
+    if event.kind == "timeout":
+        return f"{job.action} took too long, so I gave up on it."
+    if event.kind == "cancelled":
+        return f"Fine, I cancelled {job.action}."
+    return None
+
+
+def _launcher(executor, spec: SkillSpec, target: Any):
+    """Build the callable a plan Step uses to submit its skill as an executor job."""
+    def launch(background: bool):
+        return executor.submit(spec.action, spec.runner, target, timeout=spec.timeout, background=background)
+    return launch
+
+
+def validate_action_map() -> List[str]:
+    """Report bad action_map.json entries (call once at startup)."""
+    return REGISTRY.validate()
+
+
 def execute_intents(intents: List[Dict[str, Any]]) -> List[str]:
     """
     Dispatch parsed intents to their respective skill functions.
 
+    Intents are planned by the resource tags in action_map.json: unrelated ones
+    run concurrently, conflicting ones keep their original order. Each skill runs
+    as a job on the skill executor; jobs that finish within their inline budget
+    answer directly, slower ones continue in the background and report back
+    through executor events (see job_event_text).
+
     Returns:
-        List[str] – human-friendly messages produced by skills,
-        suitable for logging, HUD, or TTS (caller decides).
+        List[str] – human-friendly messages produced by skills, in the original
+        intent order, suitable for logging, HUD, or TTS (caller decides).
     """
     responses: List[str] = []
     if not intents:
         return responses
 
+    executor = get_executor()
+    steps: List[Step] = []
+
     for intent in intents:
         action = intent.get("action")
         target = intent.get("target")
@@ -113,35 +116,43 @@ def execute_intents(intents: List[Dict[str, Any]]) -> List[str]:
             print("[Skills] missing 'action' in intent, skipping.")
             continue
 
-        entry = ACTION_MAP.get(action)
-        if not entry:
+        if action not in ACTION_MAP:
             print(f"[Skills] unknown action '{action}', skipping.")
             continue
 
-        resolved = _resolve_action_entry(action, entry)
-        if not resolved:
-            # Already logged invalid shape
+        spec = REGISTRY.get(action)
+        if spec is None:
+            # Already logged (invalid entry or unresolvable function)
+            continue
+
+        steps.append(Step(
+            index=len(steps),
+            action=action,
+            target=target,
+            entry=spec.entry,
+            launch=_launcher(executor, spec, target),
+            inline=spec.inline,
+            resources=spec.resources,
+        ))
+
+    PlanRunner(plan_dependencies(steps), executor).run()
+
+    for step in steps:
+        job = step.job
+        if step.skipped is not None:
+            responses.append(f"Hmph, I skipped {step.action} because {step.skipped}.")
+            continue
+        if step.background:
+            ref = f" ({job.id})" if job is not None else ""
+            responses.append(f"Hmph, {step.action} will take a while. I'm on it{ref}.")
             continue
 
-        module_name, func_name = resolved
+        if job.status != "done":
+            print(f"[Skills] error executing '{step.action}': {job.error or job.status}")
+            continue
 
-        try:
-            func = _import_skill(module_name, func_name)
-            if not func:
-                continue
-
-            # Call with or without target depending on signature tolerance
-            try:
-                result = func(target) if target is not None else func()
-            except TypeError:
-                # Skill might not accept args
-                result = func()
-
-            msg = _postprocess_result(action, result)
-            if msg:
-                responses.append(msg)
-
-        except Exception as e:
-            print(f"[Skills] error executing '{action}': {e}")
+        msg = _postprocess_result(step.action, job.result)
+        if msg:
+            responses.append(msg)
 
     return responses
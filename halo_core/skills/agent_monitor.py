@@ -0,0 +1,218 @@
+# halo_core/skills/agent_monitor.py
+"""
+Step-level instrumentation and early termination for browser-agent tasks.
+
+AgentMonitor is handed to Agent.run() as its on_step_start / on_step_end
+hooks. For every step it records the wall time, the actions the model chose,
+the page URL and the tokens spent, and emits a "web.step" span on the
+current trace. It stops the agent early (keeping what it found so far) when:
+
+  - the same action on the same page repeats HALO_WEB_LOOP_REPEATS times;
+  - the page fingerprint stays the same for that many steps without any new
+    extracted content (scroll/extract loops);
+  - the wall-clock budget for the web action is used up.
+
+The budget comes from the action's "budget" in action_map.json, else
+HALO_WEB_BUDGET_S. browser-use only checks for a stop between steps, so
+web.py also wraps the run in a hard timeout of budget + HALO_WEB_BUDGET_GRACE_S.
+"""
+from __future__ import annotations
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ..tracing import get_tracer
+
+BUDGET_S = float(os.getenv("HALO_WEB_BUDGET_S", "120"))
+BUDGET_GRACE_S = float(os.getenv("HALO_WEB_BUDGET_GRACE_S", "20"))
+LOOP_REPEATS = int(os.getenv("HALO_WEB_LOOP_REPEATS", "3"))
+
+Fingerprint = Callable[[], Optional[str]]
+
+
+@dataclass
+class StepRecord:
+    step: int
+    duration_s: float
+    actions: List[str]
+    url: Optional[str] = None
+    tokens: Optional[int] = None
+    extracted: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    fingerprint: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step, "duration_s": round(self.duration_s, 3), "actions": self.actions,
+            "url": self.url, "tokens": self.tokens, "errors": self.errors,
+        }
+
+
+def action_budget(action: Optional[str]) -> float:
+    """Wall-clock budget for a web action: action_map "budget", else HALO_WEB_BUDGET_S."""
+    if action:
+        from . import ACTION_MAP
+        entry = ACTION_MAP.get(action)
+        if isinstance(entry, dict) and entry.get("budget") is not None:
+            try:
+                return float(entry["budget"])
+            except (TypeError, ValueError):
+                pass
+    return BUDGET_S
+
+
+# ───────────────────────────────────────────────────────────
+# browser-use history accessors (field names vary across versions)
+# ───────────────────────────────────────────────────────────
+def _dump(model: Any) -> Any:
+    for name in ("model_dump", "dict"):
+        fn = getattr(model, name, None)
+        if callable(fn):
+            try:
+                return fn(exclude_unset=True)
+            except TypeError:
+                return fn()
+    return model
+
+
+def _last_history_item(agent: Any) -> Any:
+    state = getattr(agent, "state", None)
+    history = getattr(state, "history", None) or getattr(agent, "history", None)
+    items = getattr(history, "history", None)
+    return items[-1] if items else None
+
+
+def _action_names(item: Any) -> List[str]:
+    output = getattr(item, "model_output", None)
+    out = []
+    for action in getattr(output, "action", None) or []:
+        data = _dump(action)
+        if isinstance(data, dict):
+            data = {k: v for k, v in data.items() if v is not None}
+            out.append(json.dumps(data, sort_keys=True, default=str))
+        else:
+            out.append(str(data))
+    return out
+
+
+def _action_label(signature: str) -> str:
+    """'{"scroll_down": {...}}' -> 'scroll_down'."""
+    try:
+        data = json.loads(signature)
+    except ValueError:
+        return signature
+    return next(iter(data), signature) if isinstance(data, dict) else signature
+
+
+def _step_tokens(item: Any) -> Optional[int]:
+    meta = getattr(item, "metadata", None)
+    for name in ("input_tokens", "tokens"):
+        value = getattr(meta, name, None)
+        if isinstance(value, int) and value > 0:
+            return value
+    return None
+
+
+class AgentMonitor:
+    def __init__(self, budget_s: float = BUDGET_S, repeat_limit: int = LOOP_REPEATS,
+                 fingerprint: Optional[Fingerprint] = None, clock: Callable[[], float] = time.monotonic):
+        self.budget_s = budget_s
+        self.repeat_limit = max(2, repeat_limit)
+        self.fingerprint = fingerprint
+        self.clock = clock
+        self.steps: List[StepRecord] = []
+        self.stop_reason: Optional[str] = None
+        self._t0 = clock()
+        self._step_t0: Optional[float] = None
+        self._perf0 = 0.0
+        self._found: List[str] = []
+
+    # ---------- Agent.run hooks ----------
+    async def on_step_start(self, agent: Any):
+        self._step_t0 = self.clock()
+        self._perf0 = time.perf_counter()
+        if self.stop_reason is None and self.elapsed() >= self.budget_s:
+            self._stop(agent, f"time budget of {self.budget_s:g}s used up")
+
+    async def on_step_end(self, agent: Any):
+        item = _last_history_item(agent)
+        state = getattr(item, "state", None)
+        results = getattr(item, "result", None) or []
+        reason = self.observe(
+            actions=_action_names(item),
+            url=getattr(state, "url", None),
+            tokens=_step_tokens(item),
+            extracted=[r.extracted_content for r in results if getattr(r, "extracted_content", None)],
+            errors=[str(r.error) for r in results if getattr(r, "error", None)],
+            fingerprint=self.fingerprint() if self.fingerprint else None,
+        )
+        if reason is not None and self.stop_reason is None:
+            self._stop(agent, reason)
+
+    # ---------- core (testable without browser-use) ----------
+    def observe(self, actions: List[str], url: Optional[str] = None, tokens: Optional[int] = None,
+                extracted: Optional[List[str]] = None, errors: Optional[List[str]] = None,
+                fingerprint: Optional[str] = None) -> Optional[str]:
+        """Record one finished step; returns a stop reason if the agent is looping."""
+        now = self.clock()
+        started = self._step_t0 if self._step_t0 is not None else now
+        rec = StepRecord(len(self.steps) + 1, now - started, list(actions), url, tokens,
+                         list(extracted or []), list(errors or []), fingerprint or url)
+        self.steps.append(rec)
+        self._step_t0 = None
+        get_tracer().add("web.step", self._perf0 or time.perf_counter(), time.perf_counter(),
+                         step=rec.step, actions=rec.actions, url=url, tokens=tokens,
+                         errors=len(rec.errors))
+        new_content = [c for c in rec.extracted if c not in self._found]
+        self._found.extend(new_content)
+        return self._loop_reason()
+
+    def _loop_reason(self) -> Optional[str]:
+        recent = self.steps[-self.repeat_limit:]
+        if len(recent) < self.repeat_limit:
+            return None
+        if all(s.actions and s.actions == recent[0].actions and s.url == recent[0].url for s in recent):
+            return f"repeated '{_action_label(recent[0].actions[0])}' {self.repeat_limit} times on the same page"
+        window = self.steps[-(self.repeat_limit + 1):]
+        if len(window) > self.repeat_limit and window[0].fingerprint is not None and all(s.fingerprint == window[0].fingerprint for s in window):
+            seen_before = {c for s in self.steps[:-self.repeat_limit] for c in s.extracted}
+            if all(c in seen_before for s in recent for c in s.extracted):
+                return f"page unchanged for {self.repeat_limit} steps with nothing new extracted"
+        return None
+
+    def _stop(self, agent: Any, reason: str):
+        self.stop_reason = reason
+        print(f"[WEB] Stopping agent early: {reason}")
+        stop = getattr(agent, "stop", None)
+        if callable(stop):
+            stop()
+        else:
+            state = getattr(agent, "state", None)
+            if state is not None and hasattr(state, "stopped"):
+                state.stopped = True
+
+    # ---------- results ----------
+    def elapsed(self) -> float:
+        return self.clock() - self._t0
+
+    @property
+    def hard_timeout(self) -> float:
+        return self.budget_s + BUDGET_GRACE_S
+
+    def best_result(self) -> Optional[str]:
+        """The most recent content the agent extracted (used when it's stopped early)."""
+        return self._found[-1] if self._found else None
+
+    def summary(self) -> Dict[str, Any]:
+        slowest = max(self.steps, key=lambda s: s.duration_s, default=None)
+        tokens = [s.tokens for s in self.steps if s.tokens]
+        return {
+            "steps": len(self.steps),
+            "elapsed_s": round(self.elapsed(), 2),
+            "stop_reason": self.stop_reason,
+            "slowest_step": slowest.step if slowest else None,
+            "slowest_s": round(slowest.duration_s, 2) if slowest else None,
+            "tokens": sum(tokens) if tokens else None,
+        }
@@ -0,0 +1,533 @@
+# halo_core/skills/app_index.py
+"""
+Installed-application catalog for open_app / close_app.
+
+Sources (whatever exists on this machine):
+  - Start-menu shortcuts (*.lnk, *.url) under %APPDATA% and %PROGRAMDATA%
+  - freedesktop .desktop files (XDG_DATA_DIRS/applications, ~/.local/share/applications)
+  - executables on PATH
+
+The index is persisted to HALO_CACHE_DIR/app_index.json, grouped by source
+directory with each directory's mtime. A refresh only rescans directories whose
+mtime changed (adding/removing a shortcut bumps it), so keeping it current
+costs a handful of stat() calls. The periodic rescan is put off while the
+monitoring sampler says the machine is busy.
+
+Lookup goes through a trigram index over several spellings of each name
+(compact name, executable stem, initials, "initials + last word"), so STT
+output like "v s code" or "fire fox" still lands on the right app. Scoring is a
+Dice coefficient over padded trigrams; the candidates come straight from the
+inverted index, so a lookup touches only names that share a trigram.
+
+ProcessTable is the close_app side: a short-lived cached snapshot of running
+processes with the same fuzzy matching over process names. Shells, interpreters
+and launchers (PROTECTED_PROCESSES) are never returned, since terminating "bash"
+or "python3" by name would take unrelated processes down with it.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import shlex
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = Path(os.getenv("HALO_CACHE_DIR", str(PROJECT_ROOT / "cache")))
+INDEX_PATH = CACHE_DIR / "app_index.json"
+INDEX_VERSION = 2
+
+REFRESH_INTERVAL_S = float(os.getenv("HALO_APP_INDEX_REFRESH_S", "60"))
+PROCESS_TTL_S = float(os.getenv("HALO_PROCESS_TTL_S", "3"))
+MIN_SCORE = 0.45
+CLOSE_MIN_SCORE = 0.8   # destructive lookups (close_app) need a near-exact name
+
+SHORTCUT_EXTS = {".lnk", ".url"}
+WIN_EXEC_EXTS = {e.lower() for e in os.getenv("PATHEXT", ".EXE;.BAT;.CMD").split(";") if e}
+
+# Shortcut names that are never what the user means by "open X"
+_NOISE = re.compile(r"\b(uninstall|readme|help|documentation|release notes|website)\b", re.I)
+
+# Launchers that wrap the real program in an Exec line / process list
+_WRAPPERS = {"env", "sh", "bash", "dash", "zsh", "fish", "flatpak", "snap", "nice", "ionice", "nohup",
+             "gtk-launch", "xdg-open"}
+_INTERPRETER = re.compile(r"^(python[\d.]*w?|pythonw|perl|ruby|node|java|javaw|wine|mono)(\.exe)?$", re.I)
+
+# Never terminated by name: shells, interpreters, launchers and session processes
+PROTECTED_PROCESSES = _WRAPPERS | {
+    "cmd.exe", "powershell.exe", "pwsh", "pwsh.exe", "conhost.exe", "explorer.exe", "dwm.exe", "csrss.exe",
+    "winlogon.exe", "services.exe", "svchost.exe", "lsass.exe", "systemd", "init", "dbus-daemon", "sudo", "su",
+    "login", "sshd", "tmux", "screen", "ksh", "tcsh", "csh",
+}
+
+
+def is_protected_process(name: str) -> bool:
+    name = name.lower()
+    return name in PROTECTED_PROCESSES or bool(_INTERPRETER.match(name))
+
+
+# Source kinds in preference order (ties go to the earlier kind)
+KIND_RANK = {"shortcut": 0, "desktop": 0, "path": 1}
+
+
+# ───────────────────────────────────────────────────────────
+# Name normalization + trigrams
+# ───────────────────────────────────────────────────────────
+def normalize(text: str) -> List[str]:
+    """Lowercase word tokens; splits camelCase and strips punctuation/version noise."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text or "")
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def spellings(name: str, exe: Optional[str] = None) -> Dict[str, float]:
+    """Compact keys a user might say for this app -> weight (partial spellings rank lower)."""
+    tokens = normalize(name)
+    keys: Dict[str, float] = {}
+
+    def put(key: str, weight: float):
+        if key and weight > keys.get(key, 0.0):
+            keys[key] = weight
+
+    if tokens:
+        put("".join(tokens), 1.0)
+        if len(tokens) > 1:
+            put("".join(t[0] for t in tokens[:-1]) + tokens[-1], 1.0)  # "vscode"
+            put("".join(t[0] for t in tokens), 0.9)                     # "vsc"
+            for t in (tokens[0], tokens[-1]):
+                if len(t) > 3:
+                    put(t, 0.85)                                         # "code"
+    if exe:
+        put("".join(normalize(Path(exe).stem)), 1.0)
+    return keys
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"${key}$"
+    if len(padded) < 3:
+        return {padded}
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """Inverted trigram index from compact keys to item ids."""
+
+    def __init__(self):
+        self._grams: Dict[str, Set[str]] = defaultdict(set)     # trigram -> keys
+        self._key_items: Dict[str, Dict[int, float]] = defaultdict(dict)  # key -> {item: weight}
+        self._key_size: Dict[str, int] = {}
+
+    def add(self, item: int, keys: Dict[str, float]):
+        for key, weight in keys.items():
+            if key not in self._key_size:
+                grams = trigrams(key)
+                self._key_size[key] = len(grams)
+                for g in grams:
+                    self._grams[g].add(key)
+            self._key_items[key][item] = weight
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, int]]:
+        """[(score, item)] best first; an exact full-name key scores 1.0."""
+        q = "".join(normalize(query))
+        if not q:
+            return []
+        best: Dict[int, float] = {}
+        for item, weight in self._key_items.get(q, {}).items():
+            best[item] = weight
+        q_grams = trigrams(q)
+        shared: Dict[str, int] = defaultdict(int)
+        for g in q_grams:
+            for key in self._grams.get(g, ()):
+                shared[key] += 1
+        for key, n in shared.items():
+            dice = 2.0 * n / (len(q_grams) + self._key_size[key])
+            for item, weight in self._key_items[key].items():
+                score = dice * weight
+                if score > best.get(item, 0.0):
+                    best[item] = score
+        ranked = sorted(((s, i) for i, s in best.items()), reverse=True)
+        return ranked[:limit]
+
+
+# ───────────────────────────────────────────────────────────
+# Catalog
+# ───────────────────────────────────────────────────────────
+@dataclass
+class AppEntry:
+    name: str
+    path: str                       # what we launch (.lnk/.desktop/executable)
+    kind: str                       # shortcut | desktop | path
+    exe: Optional[str] = None       # executable, when known (for close_app)
+    command: Optional[List[str]] = None  # argv for .desktop Exec lines
+
+    def launch(self):
+        import subprocess
+        if self.kind == "shortcut" and hasattr(os, "startfile"):
+            os.startfile(self.path)
+        elif self.command:
+            subprocess.Popen(self.command, start_new_session=True)
+        else:
+            subprocess.Popen([self.path], start_new_session=(os.name != "nt"))
+
+
+def shortcut_dirs() -> List[Path]:
+    if os.name != "nt":
+        return []
+    out = []
+    for var in ("APPDATA", "PROGRAMDATA"):
+        base = os.environ.get(var)
+        if base:
+            out.append(Path(base) / "Microsoft" / "Windows" / "Start Menu" / "Programs")
+    return out
+
+
+def desktop_dirs() -> List[Path]:
+    if os.name == "nt":
+        return []
+    data_home = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [data_home] + data_dirs.split(os.pathsep)
+    dirs.append("/var/lib/flatpak/exports/share")
+    return [Path(d) / "applications" for d in dict.fromkeys(dirs) if d]
+
+
+def path_dirs() -> List[Path]:
+    return [Path(d) for d in dict.fromkeys(os.environ.get("PATH", "").split(os.pathsep)) if d]
+
+
+def _parse_desktop(path: Path) -> Optional[AppEntry]:
+    fields: Dict[str, str] = {}
+    in_entry = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_entry:
+                        break
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line:
+                    k, v = line.split("=", 1)
+                    fields.setdefault(k.strip(), v.strip())
+    except OSError:
+        return None
+    if fields.get("Type", "Application") != "Application":
+        return None
+    if fields.get("NoDisplay", "").lower() == "true" or fields.get("Hidden", "").lower() == "true":
+        return None
+    name, exec_line = fields.get("Name"), fields.get("Exec")
+    if not name or not exec_line:
+        return None
+    try:
+        argv = [a for a in shlex.split(exec_line) if not re.fullmatch(r"%[a-zA-Z]", a)]
+    except ValueError:
+        return None
+    if not argv:
+        return None
+    return AppEntry(name=name, path=str(path), kind="desktop", exe=exec_name(argv), command=argv)
+
+
+def exec_name(argv: List[str]) -> Optional[str]:
+    """
+    Process name an Exec line ends up running, looking through launchers:
+    `env VAR=1 foo` -> foo, `sh -c "foo --x"` -> foo, `flatpak run org.app.Id` -> org.app.Id.
+    None when the program is an interpreter (its process name says nothing about the app).
+    """
+    argv = list(argv)
+    while argv:
+        head = Path(argv[0]).name
+        rest = argv[1:]
+        if head == "env":
+            while rest and (rest[0].startswith("-") or "=" in rest[0]):
+                rest = rest[2:] if rest[0] in ("-u", "-C", "--unset", "--chdir") else rest[1:]
+        elif head in ("sh", "bash", "dash", "zsh", "fish"):
+            if "-c" not in rest or rest.index("-c") + 1 >= len(rest):
+                return None
+            try:
+                rest = shlex.split(rest[rest.index("-c") + 1])
+            except ValueError:
+                return None
+            while rest and ("=" in rest[0] or rest[0] == "exec"):
+                rest = rest[1:]
+        elif head == "flatpak":
+            args = [a for a in rest if not a.startswith("-")]
+            return args[1] if len(args) > 1 and args[0] == "run" else None
+        elif head in _WRAPPERS:
+            rest = [a for a in rest if not a.startswith("-")]
+            if head in ("nice", "ionice"):
+                rest = [a for a in rest if not a.lstrip("-").isdigit()]
+        elif _INTERPRETER.match(head):
+            return None
+        else:
+            return head
+        argv = rest
+    return None
+
+
+def _scan_dir(directory: Path, kind: str) -> List[AppEntry]:
+    """Entries directly inside one directory (subdirectories are tracked separately)."""
+    found = []
+    try:
+        it = os.scandir(directory)
+    except OSError:
+        return found
+    with it:
+        for de in it:
+            name, ext = os.path.splitext(de.name)
+            ext = ext.lower()
+            try:
+                if kind == "shortcut":
+                    if ext in SHORTCUT_EXTS and de.is_file() and not _NOISE.search(name):
+                        found.append(AppEntry(name=name, path=de.path, kind=kind))
+                elif kind == "desktop":
+                    if ext == ".desktop" and de.is_file():
+                        entry = _parse_desktop(Path(de.path))
+                        if entry:
+                            found.append(entry)
+                elif kind == "path":
+                    if os.name == "nt":
+                        if ext in WIN_EXEC_EXTS and de.is_file():
+                            found.append(AppEntry(name=name, path=de.path, kind=kind, exe=de.name))
+                    elif de.is_file() and os.access(de.path, os.X_OK):
+                        found.append(AppEntry(name=de.name, path=de.path, kind=kind, exe=de.name))
+            except OSError:
+                continue
+    return found
+
+
+def _subdirs(root: Path) -> List[Path]:
+    out = [root]
+    for dirpath, dirnames, _ in os.walk(root):
+        out.extend(Path(dirpath) / d for d in dirnames)
+    return out
+
+
+class AppIndex:
+    _instance: Optional["AppIndex"] = None
+
+    def __init__(self, index_path: Optional[Path] = INDEX_PATH, roots: Optional[Dict[str, List[Path]]] = None):
+        self.index_path = index_path
+        self._roots = roots
+        # dir -> {"kind", "mtime", "apps": [AppEntry]}
+        self._dirs: Dict[str, Dict] = {}
+        self._entries: List[AppEntry] = []
+        self._fuzzy = FuzzyIndex()
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._loaded = False
+        self.stats = {"rescanned_dirs": 0, "entries": 0, "refresh_ms": 0.0}
+
+    @classmethod
+    def get_instance(cls) -> "AppIndex":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def roots(self) -> Dict[str, List[Path]]:
+        if self._roots is not None:
+            return self._roots
+        return {"shortcut": shortcut_dirs(), "desktop": desktop_dirs(), "path": path_dirs()}
+
+    # ---------- persistence ----------
+    def load(self):
+        self._loaded = True
+        if not self.index_path or not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"[Apps] ignoring unreadable index {self.index_path}: {e}")
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        with self._lock:
+            self._dirs = {
+                d: {"kind": v["kind"], "mtime": v["mtime"], "apps": [AppEntry(**a) for a in v["apps"]]}
+                for d, v in data.get("dirs", {}).items()
+            }
+            self._rebuild()
+
+    def save(self):
+        if not self.index_path:
+            return
+        with self._lock:
+            data = {
+                "version": INDEX_VERSION,
+                "dirs": {
+                    d: {"kind": v["kind"], "mtime": v["mtime"], "apps": [asdict(a) for a in v["apps"]]}
+                    for d, v in self._dirs.items()
+                },
+            }
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    # ---------- refresh ----------
+    def refresh(self, force: bool = False) -> int:
+        """Rescan directories whose mtime changed; returns how many were rescanned."""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            t0 = time.perf_counter()
+            seen = set()
+            rescanned = 0
+            for kind, roots in self.roots().items():
+                for root in roots:
+                    if not root.is_dir():
+                        continue
+                    dirs = _subdirs(root) if kind == "shortcut" else [root]
+                    for d in dirs:
+                        key = str(d)
+                        seen.add(key)
+                        try:
+                            mtime = d.stat().st_mtime
+                        except OSError:
+                            continue
+                        cached = self._dirs.get(key)
+                        if not force and cached and cached["mtime"] == mtime and cached["kind"] == kind:
+                            continue
+                        self._dirs[key] = {"kind": kind, "mtime": mtime, "apps": _scan_dir(d, kind)}
+                        rescanned += 1
+            stale = [d for d in self._dirs if d not in seen]
+            for d in stale:
+                del self._dirs[d]
+            if rescanned or stale or not self._entries:
+                self._rebuild()
+            self._last_refresh = time.monotonic()
+            self.stats.update(rescanned_dirs=rescanned, entries=len(self._entries),
+                              refresh_ms=(time.perf_counter() - t0) * 1000)
+        if rescanned or stale:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"[Apps] could not persist index: {e}")
+        return rescanned
+
+    def maybe_refresh(self):
+        if not self._loaded:
+            self.refresh()
+        elif time.monotonic() - self._last_refresh > REFRESH_INTERVAL_S:
+            from .monitoring import machine_busy
+            if machine_busy():
+                return  # the loaded index is good enough; rescan on a later lookup
+            self.refresh()
+
+    def _rebuild(self):
+        by_name: Dict[str, AppEntry] = {}
+        for info in self._dirs.values():
+            for app in info["apps"]:
+                key = app.name.lower()
+                other = by_name.get(key)
+                if other is None or KIND_RANK[app.kind] < KIND_RANK[other.kind]:
+                    by_name[key] = app
+        entries = list(by_name.values())
+        fuzzy = FuzzyIndex()
+        for i, app in enumerate(entries):
+            fuzzy.add(i, spellings(app.name, app.exe))
+        self._entries, self._fuzzy = entries, fuzzy
+
+    # ---------- lookup ----------
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, AppEntry]]:
+        self.maybe_refresh()
+        with self._lock:
+            entries, fuzzy = self._entries, self._fuzzy
+        ranked = [(s, entries[i]) for s, i in fuzzy.search(query, limit=limit * 3)]
+        # Prefer menu entries over bare PATH binaries at the same score
+        ranked.sort(key=lambda r: (-r[0], KIND_RANK[r[1].kind], len(r[1].name)))
+        return ranked[:limit]
+
+    def find(self, query: str, min_score: float = MIN_SCORE) -> Optional[AppEntry]:
+        ranked = self.search(query, limit=1)
+        if ranked and ranked[0][0] >= min_score:
+            return ranked[0][1]
+        return None
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_app_index() -> AppIndex:
+    return AppIndex.get_instance()
+
+
+# ───────────────────────────────────────────────────────────
+# Running processes (for close_app)
+# ───────────────────────────────────────────────────────────
+class ProcessTable:
+    """Cached {process name -> pids} snapshot, rebuilt at most every `ttl` seconds."""
+
+    _instance: Optional["ProcessTable"] = None
+
+    def __init__(self, ttl: float = PROCESS_TTL_S):
+        self.ttl = ttl
+        self._names: List[str] = []
+        self._pids: Dict[str, List[int]] = {}
+        self._fuzzy = FuzzyIndex()
+        self._taken = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "ProcessTable":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def snapshot(self, force: bool = False):
+        with self._lock:
+            if not force and time.monotonic() - self._taken < self.ttl:
+                return
+            import psutil
+            pids: Dict[str, List[int]] = defaultdict(list)
+            me = os.getpid()
+            for p in psutil.process_iter(["pid", "name"]):
+                name = p.info.get("name")
+                if name and p.info["pid"] != me and not is_protected_process(name):
+                    pids[name.lower()].append(p.info["pid"])
+            names = list(pids)
+            fuzzy = FuzzyIndex()
+            for i, name in enumerate(names):
+                fuzzy.add(i, spellings(Path(name).stem))
+            self._names, self._pids, self._fuzzy = names, dict(pids), fuzzy
+            self._taken = time.monotonic()
+
+    def invalidate(self):
+        self._taken = 0.0
+
+    def match(self, query: str, exe: Optional[str] = None, min_score: float = MIN_SCORE) -> Dict[str, List[int]]:
+        """
+        Process names (with pids) matching an executable name exactly, or a spoken app
+        name scoring at least `min_score`. Protected processes never match.
+        """
+        self.snapshot()
+        with self._lock:
+            names, pids, fuzzy = self._names, self._pids, self._fuzzy
+        if exe and exe.lower() in pids:
+            return {exe.lower(): pids[exe.lower()]}
+        ranked = fuzzy.search(query, limit=3)
+        if not ranked or ranked[0][0] < min_score:
+            return {}
+        top = ranked[0][0]
+        return {names[i]: pids[names[i]] for s, i in ranked if s == top}
+
+
+def get_process_table() -> ProcessTable:
+    return ProcessTable.get_instance()
+
+
+if __name__ == "__main__":
+    index = get_app_index()
+    n = index.refresh(force="--force" in sys.argv)
+    print(f"[Apps] {len(index)} apps, rescanned {n} dirs in {index.stats['refresh_ms']:.1f} ms")
+    for q in sys.argv[1:]:
+        if q.startswith("--"):
+            continue
+        t = time.perf_counter()
+        hits = index.search(q)
+        print(f"{q!r} ({(time.perf_counter() - t) * 1000:.3f} ms):")
+        for score, app in hits:
+            print(f"   {score:.2f}  {app.name}  [{app.kind}] {app.path}")
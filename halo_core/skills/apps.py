@@ -2,7 +2,9 @@ import os
 import subprocess
 import webbrowser
 
-# 🔥 Simple alias map (expandable)
+from .app_index import CLOSE_MIN_SCORE, get_app_index, get_process_table
+
+# 🔥 Simple alias map (expandable) — explicit paths win over the app index
 APP_ALIASES = {
     "chrome": r"C:\Program Files\Google\Chrome\Application\chrome.exe",
     "firefox": r"C:\Program Files\Mozilla Firefox\firefox.exe",
@@ -18,6 +20,9 @@ WEBSITE_ALIASES = {
     "reddit": "https://www.reddit.com",
 }
 
+CLOSE_GRACE_S = 3.0
+
+
 def open_app(target: str):
     """Opens an app or website based on the target name."""
     if not target:
@@ -35,6 +40,57 @@ def open_app(target: str):
         subprocess.Popen([APP_ALIASES[target_lower]], shell=True)
         return f"Fine, opening {target}... Jeez 🙄"
 
+    # 📇 Look it up in the installed-app index (fuzzy, survives STT spellings)
+    app = get_app_index().find(target)
+    if app is not None:
+        try:
+            app.launch()
+            return f"Fine, opening {app.name}... Jeez 🙄"
+        except OSError as e:
+            print(f"[Apps] launching {app.path} failed: {e}")
+
     # 🧠 Try using Windows `start` as a fallback
-    subprocess.Popen(["start", "", target], shell=True)
-    return f"I *guess* I'll try to open {target} for you... baka."
+    if os.name == "nt":
+        subprocess.Popen(["start", "", target], shell=True)
+        return f"I *guess* I'll try to open {target} for you... baka."
+    return f"Ugh, I can't find anything called {target}. Are you sure that's installed? 🙄"
+
+
+def close_app(target: str):
+    """Closes a running app by name/process (graceful terminate, then kill stragglers)."""
+    if not target:
+        return "Close *what*? Use your words. 😒"
+
+    import psutil
+
+    # Terminating is destructive: only a near-exact app / process name counts
+    app = get_app_index().find(target, min_score=CLOSE_MIN_SCORE)
+    exe = app.exe if app is not None else None
+    table = get_process_table()
+    matches = table.match(target, exe=exe, min_score=CLOSE_MIN_SCORE)
+    if not matches and app is not None:
+        matches = table.match(app.name, min_score=CLOSE_MIN_SCORE)
+    if not matches:
+        return f"Hmph, {target} isn't even running. 🙄"
+
+    procs = []
+    for pids in matches.values():
+        for pid in pids:
+            try:
+                p = psutil.Process(pid)
+                p.terminate()
+                procs.append(p)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    _, alive = psutil.wait_procs(procs, timeout=CLOSE_GRACE_S)
+    for p in alive:
+        try:
+            p.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    table.invalidate()
+
+    if not procs:
+        return f"{target} won't let me close it. Not my fault! 😤"
+    names = ", ".join(sorted(matches))
+    return f"Fine, closed {names}. Happy now? 😤"
@@ -0,0 +1,565 @@
+# halo_core/skills/automation.py
+"""
+Persistent task scheduler behind the schedule_task skill.
+
+- One daemon thread sleeps on a Condition until the earliest deadline in a
+  heap; adding/cancelling a task wakes it to re-arm. No polling loop.
+- Tasks live in SQLite (WAL), are reloaded at startup, and each firing is
+  committed (next run / disabled) before delivery, so a crash can't replay a
+  reminder or lose a recurring schedule.
+- Schedules: "once" (timestamp), "interval" (every N seconds) and "cron"
+  (5-field minute hour day-of-month month day-of-week).
+- "what/when" text is parsed once, when the task is created.
+
+Firing calls the subscribed callbacks (the HUD/TTS notifier in main.py) on the
+scheduler thread, so callbacks must hand off anything slow.
+"""
+from __future__ import annotations
+import calendar
+import datetime as dt
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DB_PATH = Path(os.getenv("HALO_SCHEDULE_DB", str(PROJECT_ROOT / "data" / "schedule.db")))
+
+# Re-check the wall clock at least this often (covers suspend/resume and clock changes)
+MAX_SLEEP_S = float(os.getenv("HALO_SCHEDULE_MAX_SLEEP_S", "300"))
+MIN_INTERVAL_S = 10.0
+DEFAULT_HOUR = 9  # "tomorrow" with no time
+
+
+# ───────────────────────────────────────────────────────────
+# Cron expressions
+# ───────────────────────────────────────────────────────────
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+_DOW_NAMES = {d: i for i, d in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+
+def _cron_field(text: str, lo: int, hi: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in text.lower().split(","):
+        step = 1
+        if "/" in part:
+            part, step_s = part.split("/", 1)
+            step = int(step_s)
+            if step < 1:
+                raise ValueError("cron step must be >= 1")
+        if part in ("*", ""):
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = int(_DOW_NAMES.get(a, a)), int(_DOW_NAMES.get(b, b))
+        else:
+            start = int(_DOW_NAMES.get(part, part))
+            end = hi if step > 1 else start
+        if hi == 6 and end == 7:  # cron allows 7 for Sunday
+            values.add(0)
+            end = 6
+        if not (lo <= start <= hi and lo <= end <= hi and start <= end):
+            raise ValueError(f"cron value out of range: {text!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Cron:
+    """Minimal 5-field cron (minute hour dom month dow), local time."""
+
+    def __init__(self, expr: str):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron needs 5 fields, got {expr!r}")
+        self.expr = " ".join(parts)
+        self.minutes, self.hours, self.days, self.months, self.dows = (
+            _cron_field(p, lo, hi) for p, (lo, hi) in zip(parts, _CRON_FIELDS)
+        )
+        self._any_day = parts[2] == "*"
+        self._any_dow = parts[4] == "*"
+
+    def _day_ok(self, d: dt.datetime) -> bool:
+        dom = d.day in self.days
+        dow = (d.weekday() + 1) % 7 in self.dows
+        if self._any_day:
+            return dow
+        if self._any_dow:
+            return dom
+        return dom or dow  # classic cron: either restriction matches
+
+    def next_after(self, ts: float) -> float:
+        t = dt.datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + dt.timedelta(minutes=1)
+        for _ in range(2000):  # each step jumps a month/day/hour/minute; bounded for safety
+            if t.month not in self.months:
+                year, month = (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+                t = t.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_ok(t):
+                t = (t + dt.timedelta(days=1)).replace(hour=0, minute=0)
+            elif t.hour not in self.hours:
+                t = (t + dt.timedelta(hours=1)).replace(minute=0)
+            elif t.minute not in self.minutes:
+                t += dt.timedelta(minutes=1)
+            else:
+                return t.timestamp()
+        raise ValueError(f"cron {self.expr!r} never fires")
+
+
+# ───────────────────────────────────────────────────────────
+# Natural-language what/when
+# ───────────────────────────────────────────────────────────
+@dataclass
+class Schedule:
+    kind: str          # once | interval | cron
+    spec: str          # "" | seconds | cron expression
+    next_run: float
+
+    def advance(self, after: float) -> Optional[float]:
+        """Next run strictly after `after` (None for one-shot tasks)."""
+        if self.kind == "interval":
+            step = float(self.spec)
+            missed = max(0, int((after - self.next_run) // step) + 1)
+            return self.next_run + missed * step
+        if self.kind == "cron":
+            return Cron(self.spec).next_after(after)
+        return None
+
+
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "fifteen": 15, "twenty": 20, "thirty": 30, "forty": 40, "forty-five": 45, "sixty": 60,
+    "couple": 2, "few": 3,
+}
+_UNITS = {
+    "s": 1, "sec": 1, "second": 1, "min": 60, "minute": 60, "h": 3600, "hr": 3600, "hour": 3600,
+    "day": 86400, "week": 604800,
+}
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_NUM = r"(\d+(?:\.\d+)?|" + "|".join(sorted(map(re.escape, _NUMBER_WORDS), key=len, reverse=True)) + r")"
+_UNIT = r"(sec(?:ond)?s?|s|min(?:ute)?s?|h(?:ou)?rs?|hours?|h|days?|weeks?)"
+_TIME = r"(noon|midnight|\d{1,2}(?::\d{2})?\s*(?:a\.?m\.?|p\.?m\.?)?)"
+
+_RE_CRON = re.compile(r"\bcron[:\s]+((?:\S+\s+){4}\S+)", re.I)
+_RE_IN = re.compile(rf"\bin\s+(?:a\s+)?(half\s+an?\s+hour|{_NUM}\s*{_UNIT})(?:\s+and\s+{_NUM}\s*{_UNIT})?\b", re.I)
+_RE_EVERY = re.compile(rf"\bevery\s+(?:{_NUM}\s*)?{_UNIT}\b", re.I)
+_RE_EVERY_DAY = re.compile(r"\b(every\s*day|daily|every\s+morning|every\s+evening|every\s+night)\b", re.I)
+_RE_WEEKDAYS = re.compile(r"\b(?:every\s+)?(weekdays?|weekends?)\b", re.I)
+_RE_EVERY_DOW = re.compile(
+    r"\bevery\s+((?:(?:" + "|".join(_WEEKDAYS) + r")s?(?:\s*,\s*|\s+and\s+|\s+)?)+)", re.I)
+_RE_ON_DOW = re.compile(r"\b(?:on\s+|next\s+)?(" + "|".join(_WEEKDAYS) + r")\b", re.I)
+_RE_AT = re.compile(rf"\b(?:at\s+{_TIME}|({_TIME[1:-1]}))(?=\s|$|[,.!?])", re.I)
+_RE_TOMORROW = re.compile(r"\btomorrow\b", re.I)
+_RE_TONIGHT = re.compile(r"\b(tonight|this evening)\b", re.I)
+_RE_LEAD = re.compile(r"^\s*(?:please\s+)?(?:(?:remind|tell|ping)\s+me\s+(?:to\s+|about\s+|that\s+)?|"
+                      r"set\s+(?:a\s+)?(?:reminder|timer|alarm)\s+(?:to\s+|for\s+)?)", re.I)
+
+
+def _number(text: str) -> float:
+    text = text.lower()
+    return float(_NUMBER_WORDS.get(text, text))
+
+
+def _unit_seconds(unit: str) -> int:
+    unit = unit.lower().rstrip("s") or "s"
+    if unit in ("hr", "hour", "h", "hou"):
+        return 3600
+    return _UNITS.get(unit, _UNITS.get(unit[:3], 60))
+
+
+def _parse_clock(text: str) -> Optional[Tuple[int, int]]:
+    t = text.lower().replace(".", "").strip()
+    if t == "noon":
+        return 12, 0
+    if t == "midnight":
+        return 0, 0
+    m = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", t)
+    if not m:
+        return None
+    hour, minute, ampm = int(m.group(1)), int(m.group(2) or 0), m.group(3)
+    if ampm == "pm" and hour < 12:
+        hour += 12
+    elif ampm == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def _find_clock(text: str) -> Tuple[Optional[Tuple[int, int]], Optional[re.Match]]:
+    for m in _RE_AT.finditer(text):
+        raw = m.group(1) or m.group(2)
+        # a bare number only counts as a time with "at" or am/pm ("in 5 minutes" is not 5:00)
+        if m.group(2) and not re.search(r"(am|pm|a\.m|p\.m|:|noon|midnight)", raw, re.I):
+            continue
+        clock = _parse_clock(raw)
+        if clock:
+            return clock, m
+    return None, None
+
+
+def parse_schedule(text: str, now: Optional[float] = None) -> Tuple[str, Schedule]:
+    """
+    Split free text (or {"what": .., "when": ..} JSON) into (what, Schedule).
+    Raises ValueError when no time can be found.
+    """
+    now = time.time() if now is None else now
+    what, when = _split_structured(text)
+    source = when if when is not None else what
+    spans: List[Tuple[int, int]] = []
+
+    def used(m: re.Match):
+        spans.append(m.span())
+
+    schedule = None
+    clock, clock_m = _find_clock(source)
+    base = dt.datetime.fromtimestamp(now)
+
+    if (m := _RE_CRON.search(source)):
+        used(m)
+        cron = Cron(m.group(1))
+        schedule = Schedule("cron", cron.expr, cron.next_after(now))
+    elif (m := _RE_IN.search(source)):
+        used(m)
+        if m.group(1).lower().startswith("half"):
+            seconds = 1800.0
+        else:
+            seconds = _number(m.group(2)) * _unit_seconds(m.group(3))
+            if m.group(4):
+                seconds += _number(m.group(4)) * _unit_seconds(m.group(5))
+        schedule = Schedule("once", "", now + seconds)
+    elif (m := _RE_EVERY_DOW.search(source)) or (m := _RE_WEEKDAYS.search(source)) \
+            or (m := _RE_EVERY_DAY.search(source)):
+        used(m)
+        word = m.group(1).lower()
+        if word.startswith("weekday"):
+            dows = "1-5"
+        elif word.startswith("weekend"):
+            dows = "0,6"
+        elif any(d in word for d in _WEEKDAYS):
+            dows = ",".join(str((_WEEKDAYS.index(d) + 1) % 7) for d in _WEEKDAYS if d in word)
+        else:
+            dows = "*"
+        if clock is None:
+            clock = {"morning": (8, 0), "evening": (18, 0), "night": (21, 0)}.get(word.split()[-1], (DEFAULT_HOUR, 0))
+        else:
+            used(clock_m)
+        cron = Cron(f"{clock[1]} {clock[0]} * * {dows}")
+        schedule = Schedule("cron", cron.expr, cron.next_after(now))
+    elif (m := _RE_EVERY.search(source)):
+        used(m)
+        count = _number(m.group(1)) if m.group(1) else 1
+        seconds = max(MIN_INTERVAL_S, count * _unit_seconds(m.group(2)))
+        if clock is not None and seconds % 86400 == 0:
+            used(clock_m)
+            cron = Cron(f"{clock[1]} {clock[0]} */{int(seconds // 86400)} * *" if seconds > 86400
+                        else f"{clock[1]} {clock[0]} * * *")
+            schedule = Schedule("cron", cron.expr, cron.next_after(now))
+        else:
+            schedule = Schedule("interval", str(int(seconds)), now + seconds)
+    else:
+        day = base.date()
+        day_words = False
+        if (m := _RE_TOMORROW.search(source)):
+            used(m)
+            day = day + dt.timedelta(days=1)
+            day_words = True
+        elif (m := _RE_ON_DOW.search(source)):
+            used(m)
+            target = _WEEKDAYS.index(m.group(1).lower())
+            ahead = (target - base.weekday()) % 7 or 7
+            day = day + dt.timedelta(days=ahead)
+            day_words = True
+        elif (m := _RE_TONIGHT.search(source)):
+            used(m)
+            if clock is None:
+                clock = (20, 0)
+            elif clock[0] < 12:
+                clock = (clock[0] + 12, clock[1])
+            day_words = True
+        if clock is None and not day_words:
+            raise ValueError(f"no time found in {source!r}")
+        if clock_m is not None:
+            used(clock_m)
+        hour, minute = clock if clock else (DEFAULT_HOUR, 0)
+        when_dt = dt.datetime.combine(day, dt.time(hour, minute))
+        if clock_m is not None and 1 <= hour < 12 and not re.search(r"[ap]\.?m|:", clock_m.group(0), re.I):
+            # "at 3" with no am/pm: whichever 3 o'clock comes first
+            candidates = [when_dt + dt.timedelta(hours=h) for h in (0, 12, 24)]
+            when_dt = next(c for c in candidates if c.timestamp() > now or c is candidates[-1])
+        if when_dt.timestamp() <= now:
+            when_dt += dt.timedelta(days=1)  # "at 7am" after 7am means tomorrow
+        schedule = Schedule("once", "", when_dt.timestamp())
+
+    if when is None:
+        for start, end in sorted(spans, reverse=True):
+            what = what[:start] + " " + what[end:]
+    what = _RE_LEAD.sub("", what)
+    what = re.sub(r"\s+", " ", what).strip(" ,.;:-")
+    what = re.sub(r"\s+(?:at|on|in|every)$", "", what, flags=re.I)
+    return what or "your reminder", schedule
+
+
+def _split_structured(text: str) -> Tuple[str, Optional[str]]:
+    text = (text or "").strip()
+    if text.startswith("{"):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            what = data.get("what") or data.get("task") or data.get("message") or ""
+            when = data.get("when") or data.get("time") or data.get("schedule")
+            if when:
+                return str(what), str(when)
+            text = str(what)
+    m = re.match(r"^\s*what\s*[:=]\s*(.+?)\s*[;,|]\s*when\s*[:=]\s*(.+)$", text, re.I)
+    if m:
+        return m.group(1), m.group(2)
+    return text, None
+
+
+def describe_when(ts: float, now: Optional[float] = None) -> str:
+    now = time.time() if now is None else now
+    when = dt.datetime.fromtimestamp(ts)
+    today = dt.datetime.fromtimestamp(now).date()
+    clock = when.strftime("%I:%M %p").lstrip("0")
+    if when.date() == today:
+        if ts - now < 3600:
+            mins = max(1, round((ts - now) / 60))
+            return f"in {mins} minute{'s' if mins != 1 else ''}"
+        return f"at {clock}"
+    if when.date() == today + dt.timedelta(days=1):
+        return f"tomorrow at {clock}"
+    return f"on {calendar.day_name[when.weekday()]} {when.strftime('%b %d')} at {clock}"
+
+
+def describe_schedule(schedule: Schedule) -> str:
+    if schedule.kind == "interval":
+        secs = int(schedule.spec)
+        for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+            if secs % size == 0:
+                n = secs // size
+                return f"every {unit}" if n == 1 else f"every {n} {unit}s"
+        return f"every {secs} seconds"
+    if schedule.kind == "cron":
+        return f"on schedule '{schedule.spec}' (next {describe_when(schedule.next_run)})"
+    return describe_when(schedule.next_run)
+
+
+# ───────────────────────────────────────────────────────────
+# Store + scheduler thread
+# ───────────────────────────────────────────────────────────
+@dataclass
+class Task:
+    id: int
+    what: str
+    schedule: Schedule
+    created: float
+    last_run: Optional[float] = None
+    runs: int = 0
+    late: bool = False   # fired after a restart, past its deadline
+
+
+class Scheduler:
+    _instance: Optional["Scheduler"] = None
+
+    def __init__(self, db_path: Optional[Path] = DB_PATH):
+        self.db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._tasks: Dict[int, Task] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._cond = threading.Condition()
+        self._callbacks: List[Callable[[Task], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+
+    @classmethod
+    def get_instance(cls) -> "Scheduler":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # ---------- lifecycle ----------
+    def start(self) -> "Scheduler":
+        with self._cond:
+            if self._thread is not None:
+                return self
+            self._open()
+            self._load()
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="halo-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def subscribe(self, callback: Callable[[Task], None]):
+        """callback(task) on every firing; runs on the scheduler thread, keep it short."""
+        self._callbacks.append(callback)
+
+    # ---------- public API ----------
+    def add(self, what: str, schedule: Schedule) -> Task:
+        with self._cond:
+            self._open()
+            now = time.time()
+            cur = self._db.execute(
+                "INSERT INTO tasks (what, kind, spec, next_run, created) VALUES (?, ?, ?, ?, ?)",
+                (what, schedule.kind, schedule.spec, schedule.next_run, now),
+            )
+            self._db.commit()
+            task = Task(id=cur.lastrowid, what=what, schedule=schedule, created=now)
+            self._arm(task)
+            self._cond.notify()
+        return task
+
+    def cancel(self, task_id: int) -> bool:
+        with self._cond:
+            self._open()
+            if self._tasks.pop(task_id, None) is None:
+                return False
+            self._db.execute("UPDATE tasks SET enabled = 0 WHERE id = ?", (task_id,))
+            self._db.commit()
+            self._cond.notify()  # stale heap entry is skipped lazily
+            return True
+
+    def tasks(self) -> List[Task]:
+        with self._cond:
+            return sorted(self._tasks.values(), key=lambda t: t.schedule.next_run)
+
+    def next_deadline(self) -> Optional[float]:
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    # ---------- internals ----------
+    def _open(self):
+        if self._db is not None:
+            return
+        path = ":memory:" if self.db_path is None else str(self.db_path)
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " what TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " spec TEXT NOT NULL DEFAULT '',"
+            " next_run REAL NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_run REAL,"
+            " runs INTEGER NOT NULL DEFAULT 0,"
+            " enabled INTEGER NOT NULL DEFAULT 1)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_due ON tasks (enabled, next_run)")
+        self._db.commit()
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT id, what, kind, spec, next_run, created, last_run, runs FROM tasks WHERE enabled = 1"
+        ).fetchall()
+        now = time.time()
+        for tid, what, kind, spec, next_run, created, last_run, runs in rows:
+            task = Task(tid, what, Schedule(kind, spec, next_run), created, last_run, runs, late=next_run < now)
+            self._arm(task)
+        if rows:
+            print(f"[Scheduler] loaded {len(rows)} task(s) from {self.db_path}")
+
+    def _arm(self, task: Task):
+        self._tasks[task.id] = task
+        heapq.heappush(self._heap, (task.schedule.next_run, task.id))
+
+    def _drop_stale(self):
+        while self._heap:
+            when, tid = self._heap[0]
+            task = self._tasks.get(tid)
+            if task is not None and task.schedule.next_run == when:
+                return
+            heapq.heappop(self._heap)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stop:
+                    return
+                self._drop_stale()
+                now = time.time()
+                if not self._heap or self._heap[0][0] > now:
+                    timeout = MAX_SLEEP_S if not self._heap else min(MAX_SLEEP_S, self._heap[0][0] - now)
+                    self._cond.wait(timeout)
+                    continue
+                _, tid = heapq.heappop(self._heap)
+                fired = self._commit_fired(self._tasks[tid], now)
+            self._deliver(fired)
+
+    def _commit_fired(self, task: Task, now: float) -> Task:
+        """Record the firing (and the next run) before delivering it; returns the fired copy."""
+        fired = Task(task.id, task.what, Schedule(task.schedule.kind, task.schedule.spec, task.schedule.next_run),
+                     task.created, now, task.runs + 1, task.late)
+        following = task.schedule.advance(now)
+        if following is None:
+            self._tasks.pop(task.id, None)
+            self._db.execute("UPDATE tasks SET enabled = 0, last_run = ?, runs = ? WHERE id = ?",
+                             (now, fired.runs, task.id))
+        else:
+            self._db.execute("UPDATE tasks SET next_run = ?, last_run = ?, runs = ? WHERE id = ?",
+                             (following, now, fired.runs, task.id))
+        self._db.commit()
+        task.last_run, task.runs, task.late = now, fired.runs, False
+        if following is not None:
+            task.schedule.next_run = following
+            heapq.heappush(self._heap, (following, task.id))
+        return fired
+
+    def _deliver(self, fired: Task):
+        if not self._callbacks:
+            print(f"[Scheduler] ⏰ {fired.what}")
+        for cb in list(self._callbacks):
+            try:
+                cb(fired)
+            except Exception as e:
+                print(f"[Scheduler] reminder callback failed: {e}")
+
+
+def get_scheduler(start: bool = True) -> Scheduler:
+    scheduler = Scheduler.get_instance()
+    return scheduler.start() if start else scheduler
+
+
+def reminder_text(task: Task) -> str:
+    """What Halo says when a task fires."""
+    if task.late:
+        return f"Hmph, you missed this while I was off: {task.what}. Don't blame me! 😤"
+    return f"Hey! It's time to {task.what}. Don't make me remind you twice! 😤"
+
+
+# ───────────────────────────────────────────────────────────
+# Skill
+# ───────────────────────────────────────────────────────────
+def schedule_task(target: str):
+    """Schedule a reminder from "what/when" text, e.g. "stretch in 20 minutes"."""
+    if not target:
+        return "Schedule *what*, and *when*? I'm not a mind reader. 🙄"
+    try:
+        what, schedule = parse_schedule(target)
+    except ValueError:
+        return f"Ugh, *when* should I remind you about '{target}'? Give me a time. 😒"
+    task = get_scheduler().add(what, schedule)
+    return f"Fine, I'll remind you to {what} {describe_schedule(schedule)}. Task #{task.id}. 😤"
@@ -0,0 +1,211 @@
+# halo_core/skills/cache.py
+"""
+TTL result cache for idempotent, read-only skills.
+
+An action opts in from action_map.json:
+
+    "check_status": { ..., "cache": {"ttl": 5, "key": "none"} }
+
+- ttl:  seconds a result stays fresh
+- key:  how the target maps to a cache key ("none", "target", "lower")
+
+Mutating actions declare what they make stale:
+
+    "close_all_apps": { ..., "invalidates": ["check_status"] }   ("*" = everything)
+
+Concurrent callers for the same key share one computation (single-flight), so an
+LLM that emits the same action twice in one command only pays for it once. The
+cache is a bounded LRU and keeps hit/miss/coalesce/eviction counters.
+aget_or_call is the same for `async def` skills on the executor's asyncio lane;
+waiting on another caller's computation never blocks the event loop.
+"""
+from __future__ import annotations
+import asyncio
+import collections
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+MAX_ENTRIES = 256
+HIT, WAIT, COMPUTE = "hit", "wait", "compute"
+
+
+def _key_none(target: Any) -> Hashable:
+    return None
+
+
+def _key_target(target: Any) -> Hashable:
+    return target if isinstance(target, (str, int, float, bool, type(None))) else repr(target)
+
+
+def _key_lower(target: Any) -> Hashable:
+    return " ".join(str(target).lower().split()) if target is not None else None
+
+
+KEY_FUNCS: Dict[str, Callable[[Any], Hashable]] = {
+    "none": _key_none,
+    "target": _key_target,
+    "lower": _key_lower,
+}
+
+
+@dataclass
+class CachePolicy:
+    ttl: float
+    key: Callable[[Any], Hashable] = _key_target
+
+    @classmethod
+    def from_entry(cls, spec: Any) -> Optional["CachePolicy"]:
+        """Parse an action_map "cache" value: a number (ttl) or {"ttl": .., "key": ..}."""
+        if spec is None or spec is False:
+            return None
+        if isinstance(spec, (int, float)):
+            return cls(ttl=float(spec))
+        if isinstance(spec, dict) and spec.get("ttl"):
+            key_name = spec.get("key", "target")
+            if not isinstance(key_name, str) or key_name not in KEY_FUNCS:
+                raise ValueError(f"unknown cache key function '{key_name}'")
+            try:
+                ttl = float(spec["ttl"])
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid cache ttl {spec['ttl']!r}") from None
+            return cls(ttl=ttl, key=KEY_FUNCS[key_name])
+        raise ValueError(f"invalid cache spec {spec!r}")
+
+
+class _Inflight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResultCache:
+    _instance: Optional["ResultCache"] = None
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._entries: "collections.OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = collections.OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], _Inflight] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+
+    @classmethod
+    def get_instance(cls) -> "ResultCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # ---------- public API ----------
+    def get_or_call(self, action: str, target: Any, policy: CachePolicy, compute: Callable[[], Any]) -> Any:
+        """Return a fresh cached result for (action, key(target)) or compute and store it."""
+        key = (action, policy.key(target))
+        state, slot = self._lookup(action, key)
+        if state == HIT:
+            return slot
+        if state == WAIT:
+            slot.event.wait()
+            return self._shared(slot)
+
+        mine = slot
+        try:
+            mine.value = compute()
+        except BaseException as e:
+            mine.error = e
+            raise
+        else:
+            self._store(key, mine.value, policy.ttl)
+            return mine.value
+        finally:
+            self._release(key, mine)
+
+    async def aget_or_call(self, action: str, target: Any, policy: CachePolicy,
+                           compute: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_call for coroutine skills: `compute()` returns an awaitable."""
+        key = (action, policy.key(target))
+        state, slot = self._lookup(action, key)
+        if state == HIT:
+            return slot
+        if state == WAIT:
+            await asyncio.to_thread(slot.event.wait)
+            return self._shared(slot)
+
+        mine = slot
+        try:
+            mine.value = await compute()
+        except BaseException as e:
+            mine.error = e
+            raise
+        else:
+            self._store(key, mine.value, policy.ttl)
+            return mine.value
+        finally:
+            self._release(key, mine)
+
+    def invalidate(self, actions: Iterable[str] = ("*",)):
+        """Drop cached results for the given actions ("*" clears everything)."""
+        actions = set(actions)
+        with self._lock:
+            if "*" in actions:
+                dropped = list(self._entries)
+                self._entries.clear()
+            else:
+                dropped = [k for k in self._entries if k[0] in actions]
+                for k in dropped:
+                    del self._entries[k]
+            for action, _ in dropped:
+                self._stats[action]["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-action counters plus a hit rate: {action: {hits, misses, coalesced, ..., hit_rate}}."""
+        with self._lock:
+            out = {a: dict(c) for a, c in self._stats.items()}
+            out_size = len(self._entries)
+        for c in out.values():
+            lookups = c.get("hits", 0) + c.get("misses", 0) + c.get("coalesced", 0)
+            c["hit_rate"] = (c.get("hits", 0) + c.get("coalesced", 0)) / lookups if lookups else 0.0
+        out["_size"] = {"entries": out_size, "max_entries": self.max_entries}
+        return out
+
+    # ---------- internals ----------
+    def _lookup(self, action: str, key: Tuple[str, Hashable]) -> Tuple[str, Any]:
+        """(HIT, value), (WAIT, another caller's inflight) or (COMPUTE, our new inflight)."""
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats[action]["hits"] += 1
+                return HIT, hit[1]
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                self._inflight[key] = mine = _Inflight()
+                self._stats[action]["misses"] += 1
+                return COMPUTE, mine
+            self._stats[action]["coalesced"] += 1
+            return WAIT, waiting
+
+    @staticmethod
+    def _shared(slot: _Inflight) -> Any:
+        if slot.error is not None:
+            raise slot.error
+        return slot.value
+
+    def _release(self, key: Tuple[str, Hashable], slot: _Inflight):
+        with self._lock:
+            self._inflight.pop(key, None)
+        slot.event.set()
+
+    def _store(self, key: Tuple[str, Hashable], value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                (action, _), _ = self._entries.popitem(last=False)
+                self._stats[action]["evictions"] += 1
+
+
+def get_result_cache() -> ResultCache:
+    return ResultCache.get_instance()
@@ -0,0 +1,253 @@
+# halo_core/skills/dom_diff.py
+"""
+Incremental DOM snapshots for the browser agent.
+
+With vision off, browser-use serializes the page's element tree into every
+step's prompt, one line per node, nested with tabs, interactive nodes
+prefixed with their index ("[12]<button>Search />"). Between steps on the
+same page most of that tree is identical, so resending it repeats the
+prompt eval for the whole page.
+
+DomDiffer hashes every subtree of the serialized tree (ignoring the element
+indices, which shift when nodes are inserted above them) and compares each
+step against the previous one:
+
+  - subtrees seen last step collapse into a compact index of their
+    interactive elements ("[3]<a>Home"), so they can still be clicked by index;
+  - new or changed subtrees are sent in full, with their parent lines for context;
+  - after navigation (URL change), on the first step, or when most of the
+    page changed, the full tree is sent unchanged.
+
+install(agent, differ) wires this into an Agent by wrapping its message
+manager's state-message method; it supports the method names used by the
+browser-use versions web.py knows and is a no-op on anything else.
+Per-step token estimates (full vs sent) are kept in differ.steps.
+"""
+from __future__ import annotations
+import functools
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urldefrag
+
+from .summarize import estimate_tokens
+
+DOM_DIFF_ENABLED = os.getenv("HALO_WEB_DOM_DIFF", "1") != "0"
+# Send the full tree when more than this share of it changed
+DOM_DIFF_MAX_CHANGED = float(os.getenv("HALO_WEB_DOM_DIFF_MAX_CHANGED", "0.6"))
+LABEL_CHARS = 32
+
+_INDEX = re.compile(r"^\*?\[(\d+)\]\*?")
+_TAG = re.compile(r"<(\w[\w-]*)")
+
+
+@dataclass
+class _Node:
+    line: str
+    depth: int
+    children: List["_Node"] = field(default_factory=list)
+    digest: str = ""
+
+    @property
+    def index(self) -> Optional[str]:
+        m = _INDEX.match(self.line.strip())
+        return m.group(1) if m else None
+
+    def signature(self) -> str:
+        """The line without its (unstable) element index."""
+        return _INDEX.sub("[]", self.line.strip(), count=1)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def _depth(line: str) -> int:
+    tabs = len(line) - len(line.lstrip("\t"))
+    return tabs if tabs else (len(line) - len(line.lstrip(" "))) // 2
+
+
+def parse_tree(text: str) -> List[_Node]:
+    """Serialized element tree -> root nodes, with subtree hashes filled in."""
+    roots: List[_Node] = []
+    stack: List[_Node] = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        node = _Node(line, _depth(line))
+        while stack and stack[-1].depth >= node.depth:
+            stack.pop()
+        (stack[-1].children if stack else roots).append(node)
+        stack.append(node)
+    for root in roots:
+        _hash(root)
+    return roots
+
+
+def _hash(node: _Node) -> str:
+    h = hashlib.blake2b(node.signature().encode("utf-8"), digest_size=12)
+    for child in node.children:
+        h.update(_hash(child).encode("ascii"))
+    node.digest = h.hexdigest()
+    return node.digest
+
+
+def _label(node: _Node) -> str:
+    """'[12]<button>Search' — index, tag and a short text label."""
+    sig = node.line.strip()
+    tag = _TAG.search(sig)
+    text = re.sub(r"<[^>]*>|/>|\s+", " ", sig[sig.find(">") + 1:] if ">" in sig else "").strip()
+    return f"[{node.index}]<{tag.group(1) if tag else '?'}>{text[:LABEL_CHARS]}"
+
+
+def _page_key(url: Optional[str]) -> str:
+    return urldefrag(url or "")[0].rstrip("/")
+
+
+class DomDiffer:
+    """Per-task state: the previous step's subtree hashes and the page they belong to."""
+
+    def __init__(self, max_changed: float = DOM_DIFF_MAX_CHANGED):
+        self.max_changed = max_changed
+        self.steps: List[Dict[str, Any]] = []
+        self._page: Optional[str] = None
+        self._seen: Set[str] = set()
+        self._elements: Set[str] = set()
+        self.last_digest: Optional[str] = None  # whole-tree hash of the latest step (page fingerprint)
+
+    def render(self, url: Optional[str], text: str) -> str:
+        """Text to send for this step's element tree (full or diff)."""
+        roots = parse_tree(text)
+        seen = {n.digest for root in roots for n in root.walk()}
+        elements = {n.signature() for root in roots for n in root.walk() if n.index is not None}
+        page = _page_key(url)
+        mode, out = "full", text
+        if self._seen and page == self._page:
+            changed: List[str] = []
+            unchanged: List[str] = []
+            omitted = 0
+            for root in roots:
+                omitted += self._split(root, changed, unchanged)
+            total = sum(1 for root in roots for _ in root.walk())
+            if len(changed) <= total * self.max_changed:
+                removed = len(self._elements - elements)
+                mode, out = "diff", self._format(changed, unchanged, omitted, removed)
+        self._page, self._seen = page, seen
+        self._elements = elements
+        self.last_digest = hashlib.blake2b("".join(r.digest for r in roots).encode("ascii"),
+                                           digest_size=12).hexdigest()
+        self.steps.append({
+            "step": len(self.steps) + 1, "url": url, "mode": mode,
+            "full_tokens": estimate_tokens(text), "sent_tokens": estimate_tokens(out),
+        })
+        return out
+
+    def _split(self, node: _Node, changed: List[str], unchanged: List[str]) -> int:
+        """Sort a subtree into changed lines / compact labels; returns omitted text nodes."""
+        if node.digest in self._seen:
+            omitted = 0
+            for n in node.walk():
+                if n.index is not None:
+                    unchanged.append(_label(n))
+                else:
+                    omitted += 1
+            return omitted
+        changed.append(node.line)
+        return sum(self._split(child, changed, unchanged) for child in node.children)
+
+    @staticmethod
+    def _format(changed: List[str], unchanged: List[str], omitted: int, removed: int) -> str:
+        parts = ["[Same page as the previous step. Only new or changed elements are shown in full.]"]
+        parts.append("Changed / new:" if changed else "Changed / new: (nothing)")
+        parts.extend(changed)
+        if unchanged:
+            parts.append("Unchanged interactive elements (same indices, still usable):")
+            parts.append(" ".join(unchanged))
+        notes = []
+        if omitted:
+            notes.append(f"{omitted} unchanged text nodes omitted")
+        if removed:
+            notes.append(f"{removed} interactive elements gone since the last step")
+        if notes:
+            parts.append("(" + "; ".join(notes) + ")")
+        return "\n".join(parts)
+
+    def totals(self) -> Dict[str, Any]:
+        full = sum(s["full_tokens"] for s in self.steps)
+        sent = sum(s["sent_tokens"] for s in self.steps)
+        return {
+            "steps": len(self.steps), "diff_steps": sum(1 for s in self.steps if s["mode"] == "diff"),
+            "full_tokens": full, "sent_tokens": sent,
+            "saved_pct": round(100.0 * (full - sent) / full, 1) if full else 0.0,
+        }
+
+
+# ───────────────────────────────────────────────────────────
+# browser-use hook
+# ───────────────────────────────────────────────────────────
+_STATE_METHODS = ("add_state_message", "create_state_messages")
+_TREE_ATTRS = ("element_tree", "dom_state")
+_SERIALIZERS = ("clickable_elements_to_string", "llm_representation")
+
+
+def _state_arg(args, kwargs) -> Any:
+    for key in ("browser_state_summary", "state", "browser_state"):
+        if key in kwargs:
+            return kwargs[key]
+    return args[0] if args else None
+
+
+def _patch_state(state: Any, differ: DomDiffer) -> bool:
+    """Make the state's tree serializer return the differ's output (once per state)."""
+    for attr in _TREE_ATTRS:
+        tree = getattr(state, attr, None)
+        if tree is None:
+            continue
+        for name in _SERIALIZERS:
+            original = getattr(tree, name, None)
+            if not callable(original) or getattr(original, "_halo_dom_diff", False):
+                continue
+            rendered: Dict[Any, str] = {}
+
+            @functools.wraps(original)
+            def serialize(*args, _original=original, _rendered=rendered, **kwargs):
+                key = repr((args, sorted(kwargs.items())))
+                if key not in _rendered:  # the agent may serialize the same state twice
+                    _rendered[key] = differ.render(getattr(state, "url", None), _original(*args, **kwargs))
+                return _rendered[key]
+
+            serialize._halo_dom_diff = True
+            try:
+                object.__setattr__(tree, name, serialize)
+            except Exception:
+                return False
+            return True
+    return False
+
+
+def install(agent: Any, differ: DomDiffer) -> bool:
+    """Route the agent's per-step element tree through `differ`. False if unsupported."""
+    manager = getattr(agent, "message_manager", None) or getattr(agent, "_message_manager", None)
+    if manager is None:
+        return False
+    for name in _STATE_METHODS:
+        original = getattr(manager, name, None)
+        if not callable(original):
+            continue
+
+        @functools.wraps(original)
+        def add_state(*args, _original=original, **kwargs):
+            state = _state_arg(args, kwargs)
+            if state is not None:
+                _patch_state(state, differ)
+            return _original(*args, **kwargs)
+
+        try:
+            object.__setattr__(manager, name, add_state)
+        except Exception:
+            return False
+        return True
+    return False
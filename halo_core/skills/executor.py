@@ -0,0 +1,297 @@
+# halo_core/skills/executor.py
+"""
+Background skill executor.
+
+Blocking skills run on a small thread pool; `async def` skills run on a single
+asyncio loop that lives on its own daemon thread. Every submission becomes a Job
+with an ID, a hard timeout and a status. Callers wait a short "inline" budget so
+quick skills still answer in the same turn; anything slower keeps running in the
+background and reports progress/completion to subscribers (HUD, TTS, logs).
+
+Env knobs:
+  HALO_SKILL_WORKERS    thread pool size                           (default: 4)
+  HALO_SKILL_TIMEOUT    default hard timeout per job, seconds      (default: 120)
+  HALO_SKILL_INLINE_S   default inline wait before backgrounding   (default: 2.0)
+  HALO_SKILL_KEEP_JOBS  finished jobs kept for get()/jobs()        (default: 200)
+
+Per-action overrides live in action_map.json as "timeout" and "inline".
+"""
+from __future__ import annotations
+import asyncio
+import collections
+import concurrent.futures
+import contextvars
+import inspect
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from halo_core.tracing import current_trace, get_tracer
+
+MAX_WORKERS = int(os.getenv("HALO_SKILL_WORKERS", "4"))
+DEFAULT_TIMEOUT = float(os.getenv("HALO_SKILL_TIMEOUT", "120"))
+DEFAULT_INLINE = float(os.getenv("HALO_SKILL_INLINE_S", "2.0"))
+KEEP_FINISHED = max(0, int(os.getenv("HALO_SKILL_KEEP_JOBS", "200")))
+
+# Terminal job states
+FINAL_STATES = ("done", "failed", "timeout", "cancelled")
+
+_current_job: contextvars.ContextVar[Optional["Job"]] = contextvars.ContextVar("halo_current_job", default=None)
+
+
+@dataclass
+class Job:
+    id: str
+    action: str
+    timeout: Optional[float]
+    status: str = "queued"
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Any = None
+    error: Optional[BaseException] = None
+    progress: Optional[str] = None
+    # Trace (command id) the job was submitted under, for skill spans
+    trace: Any = None
+    # True once the caller stopped waiting inline; completion is then announced via events
+    background: bool = False
+    _future: Optional[concurrent.futures.Future] = field(default=None, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    _callbacks: Optional[List[Callable[["Job"], None]]] = field(default_factory=list, repr=False)
+    _cb_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback: Callable[["Job"], None]):
+        """Run `callback(job)` once the job reaches a final state (immediately if it already has)."""
+        with self._cb_lock:
+            if self._callbacks is not None:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _fire_callbacks(self):
+        with self._cb_lock:
+            callbacks, self._callbacks = self._callbacks or [], None
+        for cb in callbacks:
+            try:
+                cb(self)
+            except Exception as e:
+                print(f"[Skills] {self.id} done-callback error: {e}")
+
+    def duration(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+
+@dataclass
+class JobEvent:
+    kind: str  # "progress" | "done" | "failed" | "timeout" | "cancelled"
+    job: Job
+    message: Optional[str] = None
+
+
+class SkillExecutor:
+    _instance: Optional["SkillExecutor"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = MAX_WORKERS, keep_finished: int = KEEP_FINISHED):
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="halo-skill"
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._jobs: Dict[str, Job] = {}
+        # Finished job ids, oldest first; only the newest `keep_finished` stay in _jobs
+        self._finished: Deque[str] = collections.deque()
+        self._keep_finished = keep_finished
+        self._listeners: List[Callable[[JobEvent], None]] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    # ---------- public API ----------
+    @classmethod
+    def get_instance(cls) -> "SkillExecutor":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def subscribe(self, callback: Callable[[JobEvent], None]):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[JobEvent], None]):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def submit(self, action: str, func: Callable[..., Any], *args: Any,
+               timeout: Optional[float] = DEFAULT_TIMEOUT, background: bool = False) -> Job:
+        """Schedule `func(*args)` on the thread pool (or the asyncio lane for coroutines)."""
+        job = Job(id=f"job-{next(self._ids)}", action=action, timeout=timeout,
+                  trace=current_trace(), background=background)
+        with self._lock:
+            self._jobs[job.id] = job
+
+        if inspect.iscoroutinefunction(func):
+            fut = asyncio.run_coroutine_threadsafe(self._run_async(job, func, args), self._ensure_loop())
+        else:
+            ctx = contextvars.copy_context()
+            fut = self._pool.submit(ctx.run, self._run_sync, job, func, args)
+            if timeout:
+                # Threads can't be interrupted; the watchdog just abandons the job
+                watchdog = threading.Timer(timeout, self._expire, args=(job,))
+                watchdog.daemon = True
+                watchdog.start()
+
+        job._future = fut
+        fut.add_done_callback(lambda f: self._complete(job, f))
+        return job
+
+    def wait_inline(self, job: Job, budget: Optional[float] = DEFAULT_INLINE) -> bool:
+        """
+        Wait up to `budget` seconds for `job`. Returns True if it finished inline;
+        otherwise flags it as a background job and returns False.
+        """
+        if job.wait(budget):
+            return True
+        with self._lock:
+            if job.done:
+                return True
+            job.background = True
+        print(f"[Skills] {job.id} ({job.action}) continues in the background")
+        return False
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return False
+            self._finalize(job, "cancelled")
+            if job._future is not None:
+                job._future.cancel()
+        self._emit(JobEvent("cancelled", job))
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, active_only: bool = False) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j for j in jobs if not j.done] if active_only else jobs
+
+    def report_progress(self, job: Job, message: str):
+        job.progress = message
+        self._emit(JobEvent("progress", job, message))
+
+    def shutdown(self, wait: bool = False):
+        for job in self.jobs(active_only=True):
+            self.cancel(job.id)
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # ---------- internals ----------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                t = threading.Thread(target=loop.run_forever, name="halo-skill-loop", daemon=True)
+                t.start()
+                self._loop, self._loop_thread = loop, t
+            return self._loop
+
+    def _run_sync(self, job: Job, func: Callable[..., Any], args: tuple):
+        if job.done:  # expired or cancelled while queued
+            return None
+        _current_job.set(job)
+        job.status, job.started = "running", time.time()
+        with get_tracer().span(f"skill.{job.action}", trace=job.trace, action=job.action, job=job.id):
+            return func(*args)
+
+    async def _run_async(self, job: Job, func: Callable[..., Any], args: tuple):
+        _current_job.set(job)
+        job.status, job.started = "running", time.time()
+        with get_tracer().span(f"skill.{job.action}", trace=job.trace, action=job.action, job=job.id):
+            if job.timeout:
+                return await asyncio.wait_for(func(*args), job.timeout)
+            return await func(*args)
+
+    def _finalize(self, job: Job, status: str, result: Any = None, error: Optional[BaseException] = None):
+        # Called with self._lock held
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished = time.time()
+        job._done.set()
+        self._finished.append(job.id)
+        while len(self._finished) > self._keep_finished:
+            self._jobs.pop(self._finished.popleft(), None)
+
+    def _complete(self, job: Job, fut: concurrent.futures.Future):
+        with self._lock:
+            if job.done:
+                if job.status == "timeout":
+                    print(f"[Skills] {job.id} ({job.action}) finished after its timeout; result discarded")
+                return
+            if fut.cancelled():
+                self._finalize(job, "cancelled")
+            else:
+                exc = fut.exception()
+                if isinstance(exc, (asyncio.TimeoutError, concurrent.futures.TimeoutError)):
+                    self._finalize(job, "timeout", error=exc)
+                elif exc is not None:
+                    self._finalize(job, "failed", error=exc)
+                else:
+                    self._finalize(job, "done", result=fut.result())
+        self._emit(JobEvent(job.status, job))
+
+    def _expire(self, job: Job):
+        with self._lock:
+            if job.done:
+                return
+            self._finalize(job, "timeout", error=TimeoutError(f"{job.action} exceeded {job.timeout}s"))
+            if job._future is not None:
+                job._future.cancel()
+        print(f"[Skills] {job.id} ({job.action}) timed out after {job.timeout}s")
+        self._emit(JobEvent("timeout", job))
+
+    def _emit(self, event: JobEvent):
+        with self._lock:
+            listeners = list(self._listeners)
+        for cb in listeners:
+            try:
+                cb(event)
+            except Exception as e:
+                print(f"[Skills] job listener error: {e}")
+        if event.kind in FINAL_STATES:
+            event.job._fire_callbacks()
+
+
+def get_executor() -> SkillExecutor:
+    return SkillExecutor.get_instance()
+
+
+def current_job() -> Optional[Job]:
+    """The Job the calling skill is running under (None outside the executor)."""
+    return _current_job.get()
+
+
+def report_progress(message: str):
+    """Called from inside a skill to publish a progress line for its job."""
+    job = _current_job.get()
+    if job is not None:
+        get_executor().report_progress(job, message)
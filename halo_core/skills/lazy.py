@@ -0,0 +1,104 @@
+# halo_core/skills/lazy.py
+"""
+Deferred resolution of heavy skill dependencies.
+
+Skill modules declare what they need (e.g. browser-use's Agent/Browser/LLM
+adapter) as HeavyDependency objects at import time, which costs nothing. The
+actual imports happen the first time an action that needs them runs, via the
+@requires decorator. A missing package turns into a MissingDependency for that
+action only, instead of breaking `import halo_core.skills.<module>`.
+"""
+from __future__ import annotations
+import functools
+import importlib
+import inspect
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+class MissingDependency(RuntimeError):
+    """A heavy dependency declared by a skill could not be imported."""
+
+
+def _load_symbol(pathspec: str) -> Tuple[Any, Optional[str]]:
+    """Load a symbol given 'pkg.mod.Class'. Returns (object or None, error_string_or_None)."""
+    try:
+        mod_path, sym = pathspec.rsplit(".", 1)
+        mod = importlib.import_module(mod_path)
+        obj = getattr(mod, sym, None)
+        return obj, None if obj is not None else f"{pathspec}: no attribute '{sym}'"
+    except Exception as e:
+        return None, f"{pathspec}: {e}"
+
+
+class HeavyDependency:
+    """
+    A symbol that may live at several dotted paths (library versions move things).
+    Resolved once, on first use; the import trace is kept for error messages.
+    """
+
+    def __init__(self, name: str, candidates: Iterable[str], *, optional: bool = False, hint: str = ""):
+        self.name = name
+        self.candidates: List[str] = list(candidates)
+        self.optional = optional
+        self.hint = hint
+        self.trace: List[str] = []
+        self._value: Any = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+    @property
+    def resolved(self) -> bool:
+        return self._resolved
+
+    def resolve(self) -> Any:
+        """Return the symbol (None for a missing optional one); raise MissingDependency otherwise."""
+        if not self._resolved:
+            with self._lock:
+                if not self._resolved:
+                    for path in self.candidates:
+                        obj, err = _load_symbol(path)
+                        if obj is not None:
+                            self.trace.append(f"OK {path}")
+                            self._value = obj
+                            break
+                        self.trace.append(f"FAIL {path} -> {err}")
+                    self._resolved = True
+        if self._value is None and not self.optional:
+            raise MissingDependency(
+                f"{self.name} is not available.\n"
+                + (f"Fix:\n  {self.hint}\n\n" if self.hint else "")
+                + "Import attempts:\n  " + "\n  ".join(self.trace)
+            )
+        return self._value
+
+    def available(self) -> bool:
+        try:
+            return self.resolve() is not None
+        except MissingDependency:
+            return False
+
+
+def requires(*deps: HeavyDependency) -> Callable:
+    """
+    Resolve `deps` before the decorated skill runs. Works for sync and async skills;
+    the first call pays the imports, later calls only check a flag.
+    """
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for d in deps:
+                    d.resolve()
+                return await func(*args, **kwargs)
+            async_wrapper.__heavy_dependencies__ = deps
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for d in deps:
+                d.resolve()
+            return func(*args, **kwargs)
+        wrapper.__heavy_dependencies__ = deps
+        return wrapper
+    return decorate
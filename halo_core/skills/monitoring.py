@@ -1,7 +1,19 @@
 # halo_core/skills/monitoring.py
-import psutil
-import shutil
 import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import psutil
+
+# Background sampler knobs
+SAMPLE_INTERVAL = float(os.getenv("HALO_MONITOR_INTERVAL", "2.0"))   # seconds between samples
+HISTORY_SECONDS = int(os.getenv("HALO_MONITOR_HISTORY", "900"))      # keep 15 minutes
+DISK_EVERY = 15                                                        # disk usage every N samples
+
+TREND_WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
 
 def _format_bytes(n: int) -> str:
     # Friendly bytes formatter
@@ -11,34 +23,234 @@ def _format_bytes(n: int) -> str:
         n /= 1024.0
     return f"{n:.1f} PB"
 
+
+def _system_drive() -> str:
+    drive = os.path.splitdrive(os.getcwd())[0]
+    if drive:
+        return drive
+    return "C:" if os.name == "nt" else ""
+
+
+class RingBuffer:
+    """Fixed-size NumPy ring of rows (width columns); oldest rows are overwritten."""
+
+    def __init__(self, capacity: int, width: int = 1, dtype=np.float32):
+        self.capacity = max(1, capacity)
+        self.width = width
+        self._data = np.zeros((self.capacity, width), dtype=dtype)
+        self._head = 0      # next write position
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, row):
+        self._data[self._head] = row
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def latest(self):
+        if not self._count:
+            return None
+        return self._data[(self._head - 1) % self.capacity]
+
+    def last(self, n: int) -> np.ndarray:
+        """The most recent `n` rows, oldest first (a copy)."""
+        n = min(max(0, n), self._count)
+        if n == 0:
+            return self._data[:0].copy()
+        idx = (np.arange(self._head - n, self._head)) % self.capacity
+        return self._data[idx]
+
+
+class MetricsSampler:
+    """
+    Low-overhead background sampler. Every `interval` seconds it records CPU
+    (total + per core), RAM, disk and process count into ring buffers, so status
+    queries answer instantly and other subsystems can ask "is the machine busy?".
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, history_s: int = HISTORY_SECONDS):
+        self.interval = max(0.2, interval)
+        capacity = int(history_s / self.interval) + 1
+        self.cores = psutil.cpu_count(logical=True) or 1
+        self.drive = _system_drive()
+        # columns: ts, cpu, mem, disk, procs
+        self._rows = RingBuffer(capacity, width=5, dtype=np.float64)
+        self._per_core = RingBuffer(capacity, width=self.cores, dtype=np.float32)
+        self._lock = threading.Lock()           # ring buffers / latest values
+        self._sample_lock = threading.Lock()    # one sample at a time (sampler thread vs check_status)
+        self._stop = threading.Event()
+        self._thread = None
+        self._disk_pct = 0.0
+        self._disk_usage = None
+        self._ticks = 0
+        self.last_vm = None
+
+    # ---------- lifecycle ----------
+    def start(self):
+        if self._thread is not None:
+            return self
+        # Prime psutil's CPU counters so the first real sample covers a full interval
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+        self._thread = threading.Thread(target=self._run, name="halo-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def samples(self) -> int:
+        return len(self._rows)
+
+    # ---------- sampling ----------
+    def sample(self, cpu_interval=None):
+        """Take one sample now (cpu_interval=None uses the time since the last sample)."""
+        with self._sample_lock:
+            cpu = psutil.cpu_percent(interval=cpu_interval)
+            per_core = psutil.cpu_percent(interval=None, percpu=True)
+            vm = psutil.virtual_memory()
+            disk = self._disk_usage
+            if self._ticks % DISK_EVERY == 0 or disk is None:
+                disk = shutil.disk_usage(self.drive + os.sep)
+                self._disk_pct = 100.0 * disk.used / max(1, disk.total)
+            procs = len(psutil.pids())
+            self._ticks += 1
+            with self._lock:
+                self.last_vm = vm
+                self._disk_usage = disk
+                self._rows.append((time.time(), cpu, vm.percent, self._disk_pct, procs))
+                if len(per_core) == self.cores:
+                    self._per_core.append(per_core)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"[Monitor] sample failed: {e}")
+
+    # ---------- queries ----------
+    def latest(self):
+        """Latest sample as a dict, or None if nothing has been sampled yet."""
+        with self._lock:
+            row = self._rows.latest()
+            core = self._per_core.latest()
+            vm = self.last_vm
+            disk = self._disk_usage
+        if row is None:
+            return None
+        return {
+            "ts": float(row[0]),
+            "cpu_percent": float(row[1]),
+            "mem_percent": float(row[2]),
+            "disk_percent": float(row[3]),
+            "processes": int(row[4]),
+            "per_core": [round(float(c), 1) for c in core] if core is not None else [],
+            "vm": vm,
+            "disk": disk,
+        }
+
+    def _window(self, seconds: float) -> np.ndarray:
+        with self._lock:
+            rows = self._rows.last(int(seconds / self.interval) + 1)
+        if rows.size:
+            rows = rows[rows[:, 0] >= time.time() - seconds]
+        return rows
+
+    def trend(self, column: str = "cpu"):
+        """{"1m": avg, "5m": avg, "15m": avg, "peak_15m": max} for cpu | mem | disk | procs."""
+        col = {"cpu": 1, "mem": 2, "disk": 3, "procs": 4}[column]
+        out = {}
+        for label, seconds in TREND_WINDOWS.items():
+            rows = self._window(seconds)
+            out[label] = round(float(rows[:, col].mean()), 1) if rows.size else None
+        rows = self._window(max(TREND_WINDOWS.values()))
+        out["peak_15m"] = round(float(rows[:, col].max()), 1) if rows.size else None
+        return out
+
+    def average(self, column: str = "cpu", seconds: float = 60.0):
+        col = {"cpu": 1, "mem": 2, "disk": 3, "procs": 4}[column]
+        rows = self._window(seconds)
+        return float(rows[:, col].mean()) if rows.size else None
+
+    def is_busy(self, cpu_threshold: float = 85.0, mem_threshold: float = 90.0, seconds: float = 30.0) -> bool:
+        """True when recent CPU or RAM load is high — use to defer heavy background work."""
+        cpu = self.average("cpu", seconds)
+        mem = self.average("mem", seconds)
+        return (cpu is not None and cpu >= cpu_threshold) or (mem is not None and mem >= mem_threshold)
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler(start: bool = True) -> MetricsSampler:
+    """Process-wide sampler (started on first request unless start=False)."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MetricsSampler()
+        if start:
+            _sampler.start()
+        return _sampler
+
+
+def machine_busy(**thresholds) -> bool:
+    """is_busy() on the process-wide sampler; False while it isn't running (never starts it)."""
+    sampler = _sampler
+    return sampler is not None and sampler.running and sampler.is_busy(**thresholds)
+
+
 def check_status(target=None):
     """
-    Returns a snapshot of CPU, RAM, Disk usage.
-    Extend with GPU/temps later if you want (e.g., nvidia-ml-py or wmi).
+    Returns a snapshot of CPU, RAM, Disk usage plus 1/5/15-minute trends.
+    Answers from the background sampler; extend with GPU/temps later if you want
+    (e.g., nvidia-ml-py or wmi).
     """
-    cpu = psutil.cpu_percent(interval=0.4)
-    vm = psutil.virtual_memory()
+    sampler = get_sampler()
+    snap = sampler.latest()
+    if snap is None:
+        # Sampler just started: one short blocking sample so we have something to say
+        sampler.sample(cpu_interval=0.2)
+        snap = sampler.latest()
+
+    cpu = snap["cpu_percent"]
+    vm = snap["vm"]
     total = _format_bytes(vm.total)
     used = _format_bytes(vm.used)
     avail = _format_bytes(vm.available)
 
-    # Disk: pick system drive
-    system_drive = os.path.splitdrive(os.getcwd())[0] or "C:"
-    total_d, used_d, free_d = shutil.disk_usage(system_drive + os.sep)
+    system_drive = sampler.drive or os.sep
+    total_d, used_d, free_d = snap["disk"]
     disk_total = _format_bytes(total_d)
     disk_used = _format_bytes(used_d)
     disk_free = _format_bytes(free_d)
 
-    procs = len(psutil.pids())
+    procs = snap["processes"]
+    cpu_trend = sampler.trend("cpu")
+    mem_trend = sampler.trend("mem")
 
     status = {
         "cpu_percent": cpu,
+        "per_core": snap["per_core"],
         "mem": {"total": total, "used": used, "available": avail, "percent": vm.percent},
         "disk": {"drive": system_drive, "total": disk_total, "used": disk_used, "free": disk_free},
-        "processes": procs
+        "processes": procs,
+        "trend": {"cpu": cpu_trend, "mem": mem_trend},
+        "sampled_at": snap["ts"],
     }
     # Return a concise string for TTS + HUD
     summary = (f"CPU {cpu:.0f}% • RAM {vm.percent:.0f}% "
                f"({used}/{total}) • Disk {system_drive} {disk_used}/{disk_total} "
                f"free {disk_free} • {procs} processes")
+    if cpu_trend["5m"] is not None and sampler.samples > 1:
+        summary += (f" • CPU avg {cpu_trend['1m']:.0f}/{cpu_trend['5m']:.0f}/{cpu_trend['15m']:.0f}% "
+                    f"(1/5/15m), peak {cpu_trend['peak_15m']:.0f}%")
     return {"status": status, "summary": summary}
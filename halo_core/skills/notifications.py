@@ -0,0 +1,318 @@
+# halo_core/skills/notifications.py
+"""
+Notification service behind the `notify` skill and every background producer
+(scheduler reminders, background skill jobs, monitoring alerts).
+
+- Bounded priority queue: when full, the lowest-priority pending item is dropped
+  (or the newcomer, if it's the lowest).
+- Coalescing: the same (source, key) within COALESCE_S updates the pending item
+  instead of queueing another ("… ×3"); an explicit key replaces the message
+  (progress updates).
+- Per-source token-bucket rate limit; HIGH/URGENT bypass it.
+- One delivery thread hands batches to the registered sinks (HUD, TTS) and to
+  native desktop notifications, spacing batches MIN_GAP_S apart so the HUD
+  isn't re-laid out for every message. HIGH/URGENT preempt: they skip the
+  batch window and the gap.
+- stats(): submitted / delivered / coalesced / dropped / rate-limited counters.
+"""
+from __future__ import annotations
+import heapq
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+LOW, NORMAL, HIGH, URGENT = 0, 1, 2, 3
+PRIORITY_NAMES = {"low": LOW, "normal": NORMAL, "high": HIGH, "urgent": URGENT}
+
+QUEUE_SIZE = int(os.getenv("HALO_NOTIFY_QUEUE", "32"))
+COALESCE_S = float(os.getenv("HALO_NOTIFY_COALESCE_S", "10"))
+BATCH_WINDOW_S = float(os.getenv("HALO_NOTIFY_BATCH_MS", "250")) / 1000.0
+BATCH_SIZE = int(os.getenv("HALO_NOTIFY_BATCH", "3"))
+MIN_GAP_S = float(os.getenv("HALO_NOTIFY_MIN_GAP_S", "1.5"))
+RATE_PER_MIN = float(os.getenv("HALO_NOTIFY_RATE", "6"))   # per source
+RATE_BURST = float(os.getenv("HALO_NOTIFY_BURST", "3"))
+NATIVE = os.getenv("HALO_NOTIFY_NATIVE", "1") == "1"
+
+Sink = Callable[[List["Notification"], int], None]   # (batch, still pending)
+
+
+@dataclass
+class Notification:
+    message: str
+    source: str = "halo"
+    priority: int = NORMAL
+    title: str = "Halo"
+    speak: bool = False
+    key: Optional[str] = None       # explicit key: newer message replaces the pending one
+    created: float = field(default_factory=time.monotonic)
+    count: int = 1
+
+    @property
+    def coalesce_key(self) -> Tuple[str, str]:
+        return self.source, self.key if self.key is not None else " ".join(self.message.lower().split())
+
+    def text(self) -> str:
+        return f"{self.message} ×{self.count}" if self.count > 1 and self.key is None else self.message
+
+
+class _Bucket:
+    __slots__ = ("tokens", "stamp")
+
+    def __init__(self):
+        self.tokens = RATE_BURST
+        self.stamp = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(RATE_BURST, self.tokens + (now - self.stamp) * RATE_PER_MIN / 60.0)
+        self.stamp = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+def render_batch(batch: List[Notification], pending: int = 0) -> str:
+    """HUD text for one batch: one line per notification, urgent first."""
+    icon = {LOW: "💤", NORMAL: "🔔", HIGH: "⚡", URGENT: "🚨"}
+    lines = [f"{icon.get(n.priority, '🔔')} {n.text()}" for n in batch]
+    if pending:
+        lines.append(f"(+{pending} more)")
+    return "\n".join(lines)
+
+
+class NotificationService:
+    _instance: Optional["NotificationService"] = None
+
+    def __init__(self, max_pending: int = QUEUE_SIZE, native: bool = NATIVE):
+        self.max_pending = max(1, max_pending)
+        self._heap: List[Tuple[int, int, Notification]] = []   # (-priority, seq, note)
+        self._pending: Dict[Tuple[str, str], Notification] = {}
+        self._recent: Dict[Tuple[str, str], Tuple[float, Notification]] = {}  # delivered within COALESCE_S
+        self._buckets: Dict[str, _Bucket] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._sinks: Dict[str, Sink] = {}
+        self._counters: Counter = Counter()
+        self._last_delivery = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        if native:
+            self._sinks["native"] = native_sink
+
+    @classmethod
+    def get_instance(cls) -> "NotificationService":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # ---------- sinks / lifecycle ----------
+    def add_sink(self, name: str, sink: Sink):
+        """sink(batch, pending) on the delivery thread; hand off anything slow (TTS)."""
+        self._sinks[name] = sink
+
+    def remove_sink(self, name: str):
+        self._sinks.pop(name, None)
+
+    def start(self) -> "NotificationService":
+        with self._cond:
+            if self._thread is None:
+                self._stop = False
+                self._thread = threading.Thread(target=self._run, name="halo-notify", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # ---------- producers ----------
+    def notify(self, message: str, *, source: str = "halo", priority: int = NORMAL,
+               title: str = "Halo", speak: bool = False, key: Optional[str] = None) -> bool:
+        """Queue a notification. Returns False if it was rate-limited or dropped."""
+        note = Notification(message=message, source=source, priority=priority, title=title, speak=speak, key=key)
+        ck = note.coalesce_key
+        with self._cond:
+            self._counters["submitted"] += 1
+            pending = self._pending.get(ck)
+            if pending is not None:
+                self._merge(pending, note)
+                return True
+            recent = self._recent.get(ck)
+            if recent is not None and time.monotonic() - recent[0] < COALESCE_S and key is None:
+                recent[1].count += 1  # just shown; don't show it again
+                self._counters["coalesced"] += 1
+                return True
+            if priority < HIGH:
+                bucket = self._buckets.setdefault(source, _Bucket())
+                if not bucket.take():
+                    self._counters["rate_limited"] += 1
+                    return False
+            if len(self._pending) >= self.max_pending and not self._evict_for(note):
+                self._counters["dropped"] += 1
+                return False
+            self._pending[ck] = note
+            heapq.heappush(self._heap, (-priority, next(self._seq), note))
+            self._counters["max_depth"] = max(self._counters["max_depth"], len(self._pending))
+            self._cond.notify()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            out = {k: self._counters.get(k, 0) for k in
+                   ("submitted", "delivered", "batches", "coalesced", "dropped", "rate_limited", "preempted",
+                    "max_depth")}
+            out["queue_depth"] = len(self._pending)
+            return out
+
+    # ---------- internals ----------
+    def _merge(self, pending: Notification, note: Notification):
+        self._counters["coalesced"] += 1
+        pending.count += 1
+        if note.key is not None:
+            pending.message = note.message
+        pending.speak = pending.speak or note.speak
+        if note.priority > pending.priority:
+            # re-queue at the higher priority; the old heap entry is skipped
+            pending.priority = note.priority
+            heapq.heappush(self._heap, (-note.priority, next(self._seq), pending))
+            self._cond.notify()
+
+    def _evict_for(self, note: Notification) -> bool:
+        """Make room by dropping the lowest-priority, newest pending item (if lower than `note`)."""
+        victim = min(self._pending.values(), key=lambda n: (n.priority, -n.created))
+        if victim.priority >= note.priority:
+            return False
+        del self._pending[victim.coalesce_key]
+        self._counters["dropped"] += 1
+        return True
+
+    def _pop_batch(self) -> List[Notification]:
+        batch: List[Notification] = []
+        while self._heap and len(batch) < BATCH_SIZE:
+            neg_prio, _, note = heapq.heappop(self._heap)
+            ck = note.coalesce_key
+            if self._pending.get(ck) is not note or note.priority != -neg_prio:
+                continue  # evicted or re-queued at another priority
+            del self._pending[ck]
+            batch.append(note)
+            if note.priority == URGENT:
+                break  # urgent goes out alone
+        return batch
+
+    def _heap_max(self) -> int:
+        return -self._heap[0][0] if self._heap else -1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stop and not self._pending:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                urgent = self._heap_max() >= HIGH
+                if not urgent:
+                    # Gather a batch, and keep normal traffic MIN_GAP_S apart
+                    deadline = max(time.monotonic() + BATCH_WINDOW_S, self._last_delivery + MIN_GAP_S)
+                    while not self._stop and self._heap_max() < HIGH:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if self._stop:
+                        return
+                    if self._heap_max() >= HIGH and time.monotonic() < deadline:
+                        self._counters["preempted"] += 1
+                batch = self._pop_batch()
+                pending = len(self._pending)
+                now = time.monotonic()
+                self._last_delivery = now
+                for note in batch:
+                    self._recent[note.coalesce_key] = (now, note)
+                self._recent = {k: v for k, v in self._recent.items() if now - v[0] < COALESCE_S}
+                self._counters["delivered"] += len(batch)
+                self._counters["batches"] += 1 if batch else 0
+            if batch:
+                self._deliver(batch, pending)
+
+    def _deliver(self, batch: List[Notification], pending: int):
+        for name, sink in list(self._sinks.items()):
+            try:
+                sink(batch, pending)
+            except Exception as e:
+                print(f"[Notify] sink '{name}' failed: {e}")
+
+
+def get_notifier(start: bool = True) -> NotificationService:
+    service = NotificationService.get_instance()
+    return service.start() if start else service
+
+
+def notify(message: str, **kwargs) -> bool:
+    """Shortcut for get_notifier().notify(...)."""
+    return get_notifier().notify(message, **kwargs)
+
+
+# ───────────────────────────────────────────────────────────
+# Native desktop notifications
+# ───────────────────────────────────────────────────────────
+_TOAST_APP_ID = r"{1AC14E77-02E7-4E5D-B744-2EB1AE5198B7}\WindowsPowerShell\v1.0\powershell.exe"
+_TOAST_PS = (
+    "[Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] > $null; "
+    "$x = [Windows.UI.Notifications.ToastNotificationManager]::GetTemplateContent("
+    "[Windows.UI.Notifications.ToastTemplateType]::ToastText02); "
+    "$t = $x.GetElementsByTagName('text'); "
+    "$t.Item(0).AppendChild($x.CreateTextNode('{title}')) > $null; "
+    "$t.Item(1).AppendChild($x.CreateTextNode('{body}')) > $null; "
+    "[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier('{app}').Show("
+    "[Windows.UI.Notifications.ToastNotification]::new($x))"
+)
+
+
+def native_sink(batch: List[Notification], pending: int = 0):
+    """One OS notification per batch (title of the top item, all messages in the body); LOW stays on the HUD."""
+    batch = [n for n in batch if n.priority > LOW]
+    if not batch:
+        return
+    title = batch[0].title
+    body = "\n".join(n.text() for n in batch)
+    if os.name == "nt":
+        from .shell_host import WindowsMixer, get_mixer
+        mixer = get_mixer()
+        if isinstance(mixer, WindowsMixer):  # reuse the warm PowerShell host
+            q = lambda s: s.replace("'", "''")
+            mixer.host.run(_TOAST_PS.format(title=q(title), body=q(body), app=_TOAST_APP_ID))
+    elif sys.platform == "darwin":
+        q = lambda s: s.replace("\\", "\\\\").replace('"', '\\"')
+        subprocess.Popen(["osascript", "-e", f'display notification "{q(body)}" with title "{q(title)}"'])
+    elif shutil.which("notify-send"):
+        urgency = "critical" if batch[0].priority >= URGENT else "normal"
+        subprocess.Popen(["notify-send", "-a", "Halo", "-u", urgency, title, body])
+
+
+# ───────────────────────────────────────────────────────────
+# Skill
+# ───────────────────────────────────────────────────────────
+def send_notification(target: str):
+    """Show a desktop/HUD notification. Prefix with "urgent:" / "important:" to raise priority."""
+    if not target:
+        return "Notify you about *what*? Hmph. 🙄"
+    message, priority = target.strip(), NORMAL
+    head, sep, rest = message.partition(":")
+    if sep and head.strip().lower() in ("urgent", "important", "high", "low"):
+        priority = {"urgent": URGENT, "important": HIGH, "high": HIGH, "low": LOW}[head.strip().lower()]
+        message = rest.strip() or message
+    if not get_notifier().notify(message, source="skill", priority=priority):
+        return "Ugh, that's way too many notifications. I'm ignoring that one. 😤"
+    return f"Fine, notification sent: {message} 😤"
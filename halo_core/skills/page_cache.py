@@ -0,0 +1,398 @@
+# halo_core/skills/page_cache.py
+"""
+Disk-backed cache of fetched pages, their visible text, and their summaries.
+
+- Key: normalized URL (lowercase scheme/host, default port, fragment and
+  tracking params dropped, query sorted).
+- Freshness follows HTTP: Cache-Control max-age / no-cache / no-store,
+  Expires, and a heuristic (10% of the Last-Modified age, capped) otherwise.
+  Stale entries with an ETag / Last-Modified are revalidated with a
+  conditional GET; a 304 costs no body download and no re-extraction.
+- Bodies and extracted text are zlib-compressed in SQLite
+  (HALO_CACHE_DIR/pages.db). When the stored size passes the cap, least
+  recently used pages are evicted.
+- Downloads are streamed and stop at MAX_PAGE_BYTES; the charset comes from
+  the Content-Type header or a <meta> tag before any guessing.
+- Summaries are memoized per (content hash, model, kind), so an unchanged page
+  is never summarized twice, even if its URL changes.
+"""
+from __future__ import annotations
+import codecs
+import email.utils
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = Path(os.getenv("HALO_CACHE_DIR", str(PROJECT_ROOT / "cache")))
+DB_PATH = Path(os.getenv("HALO_PAGE_CACHE_DB", str(CACHE_DIR / "pages.db")))
+MAX_BYTES = int(float(os.getenv("HALO_PAGE_CACHE_MB", "64")) * 1024 * 1024)
+DEFAULT_TTL_S = float(os.getenv("HALO_PAGE_CACHE_TTL_S", "300"))
+HEURISTIC_MAX_S = 86400.0
+FETCH_TIMEOUT_S = float(os.getenv("HALO_PAGE_FETCH_TIMEOUT", "10"))
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+READ_CHUNK = 64 * 1024
+
+_TRACKING = re.compile(r"^(utm_\w+|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|igshid|ref_src|_hsenc|_hsmi)$", re.I)
+
+
+def normalize_url(url: str) -> str:
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _TRACKING.match(k)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+# ───────────────────────────────────────────────────────────
+# Visible text extraction
+# ───────────────────────────────────────────────────────────
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head", "iframe", "canvas"}
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "header", "footer", "nav", "aside", "li", "ul", "ol",
+               "h1", "h2", "h3", "h4", "h5", "h6", "br", "tr", "table", "blockquote", "pre", "hr", "dd", "dt",
+               "figcaption", "title"}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.title = ""
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        if tag == "title":
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        if tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.parts.append(data)
+
+
+def extract_visible_text(html: str) -> Tuple[str, str]:
+    """(title, visible text) with one line per block element."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    text = "\n".join(line for line in lines if line)
+    return " ".join(parser.title.split()), text
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# ───────────────────────────────────────────────────────────
+# Body reading / charset
+# ───────────────────────────────────────────────────────────
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+META_SNIFF_BYTES = 4096
+
+
+def read_capped(resp, limit: int = MAX_PAGE_BYTES) -> bytes:
+    """Body of a stream=True response, downloading at most `limit` bytes."""
+    buf = bytearray()
+    try:
+        for chunk in resp.iter_content(READ_CHUNK):
+            buf += chunk
+            if len(buf) >= limit:
+                break
+    finally:
+        resp.close()
+    return bytes(buf[:limit])
+
+
+def _codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def decode_body(raw: bytes, content_type: Optional[str]) -> str:
+    """
+    Decode an HTML body: Content-Type charset, then <meta charset> / http-equiv,
+    then UTF-8 if it decodes cleanly, then a detector guess. requests' own
+    resp.encoding is not used: it is ISO-8859-1 for any text/html without a charset.
+    """
+    declared = _HEADER_CHARSET.search(content_type or "")
+    meta = _META_CHARSET.search(raw[:META_SNIFF_BYTES])
+    for name in (declared and declared.group(1), meta and meta.group(1).decode("ascii", "ignore")):
+        codec = _codec(name)
+        if codec is not None:
+            return raw.decode(codec, errors="replace")
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    from requests.compat import chardet   # what resp.apparent_encoding uses
+    guess = _codec(chardet.detect(raw).get("encoding")) if chardet is not None else None
+    return raw.decode(guess or "utf-8", errors="replace")
+
+
+# ───────────────────────────────────────────────────────────
+# HTTP freshness
+# ───────────────────────────────────────────────────────────
+def _cache_control(headers) -> Dict[str, Optional[str]]:
+    out: Dict[str, Optional[str]] = {}
+    for part in (headers.get("Cache-Control") or "").split(","):
+        if part.strip():
+            k, _, v = part.strip().partition("=")
+            out[k.lower()] = v.strip('"') or None
+    return out
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness(headers, now: float) -> Tuple[bool, float]:
+    """(storable, expires_at) from response headers."""
+    cc = _cache_control(headers)
+    if "no-store" in cc:
+        return False, now
+    if "no-cache" in cc:
+        return True, now  # store, but always revalidate
+    for key in ("s-maxage", "max-age"):
+        if cc.get(key):
+            try:
+                return True, now + max(0.0, float(cc[key]))
+            except ValueError:
+                pass
+    expires = _http_date(headers.get("Expires"))
+    if expires is not None:
+        return True, expires
+    modified = _http_date(headers.get("Last-Modified"))
+    if modified is not None:
+        return True, now + min(HEURISTIC_MAX_S, max(0.0, (now - modified) * 0.1))
+    return True, now + DEFAULT_TTL_S
+
+
+@dataclass
+class CachedPage:
+    url: str
+    final_url: str
+    title: str
+    text: str
+    html: str
+    content_hash: str
+    fetched: float
+    source: str = "network"     # network | cache | revalidated
+
+
+class PageCache:
+    _instance: Optional["PageCache"] = None
+
+    def __init__(self, db_path: Optional[Path] = DB_PATH, max_bytes: int = MAX_BYTES, session=None):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._session = session
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0,
+                      "summary_hits": 0, "summary_misses": 0, "bytes_saved": 0}
+
+    @classmethod
+    def get_instance(cls) -> "PageCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def current(cls) -> Optional["PageCache"]:
+        """The cache if one was ever created (doesn't create one)."""
+        return cls._instance
+
+    # ---------- storage ----------
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.db_path is not None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(":memory:" if self.db_path is None else str(self.db_path),
+                                       check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY, final_url TEXT, etag TEXT, last_modified TEXT,"
+                " expires REAL, fetched REAL, last_access REAL, title TEXT,"
+                " body BLOB, text BLOB, content_hash TEXT, size INTEGER);"
+                "CREATE INDEX IF NOT EXISTS pages_lru ON pages (last_access);"
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " content_hash TEXT, model TEXT, kind TEXT, summary TEXT, created REAL,"
+                " PRIMARY KEY (content_hash, model, kind));"
+            )
+        return self._db
+
+    def _http(self):
+        if self._session is None:
+            from .web_search import _http
+            return _http()
+        return self._session
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ---------- pages ----------
+    def fetch(self, url: str, timeout: float = FETCH_TIMEOUT_S) -> CachedPage:
+        """Page for `url`: fresh from cache, revalidated with a conditional GET, or downloaded."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT final_url, etag, last_modified, expires, fetched, title, body, text, content_hash, size"
+                " FROM pages WHERE url = ?", (key,)).fetchone()
+        if row is not None and row[3] > now:
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += row[9]
+            self._touch(key, now)
+            return self._page(key, row, "cache")
+
+        headers = {}
+        if row is not None:
+            if row[1]:
+                headers["If-None-Match"] = row[1]
+            if row[2]:
+                headers["If-Modified-Since"] = row[2]
+        resp = self._http().get(key, headers=headers, timeout=timeout, stream=True)
+        if resp.status_code == 304 and row is not None:
+            resp.close()
+            storable, expires = freshness(resp.headers, now)
+            with self._lock:
+                self._conn().execute(
+                    "UPDATE pages SET expires = ?, last_access = ?, etag = COALESCE(?, etag),"
+                    " last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                    (expires, now, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), key))
+                self._conn().commit()
+            self.stats["revalidated"] += 1
+            self.stats["bytes_saved"] += row[9]
+            return self._page(key, row, "revalidated")
+
+        if not resp.ok:
+            resp.close()
+            resp.raise_for_status()
+        html = decode_body(read_capped(resp, MAX_PAGE_BYTES), resp.headers.get("Content-Type"))
+        title, text = extract_visible_text(html)
+        digest = content_hash(text)
+        self.stats["misses"] += 1
+        storable, expires = freshness(resp.headers, now)
+        if storable:
+            body_z = zlib.compress(html.encode("utf-8"), 6)
+            text_z = zlib.compress(text.encode("utf-8"), 6)
+            with self._lock:
+                self._conn().execute(
+                    "INSERT OR REPLACE INTO pages (url, final_url, etag, last_modified, expires, fetched,"
+                    " last_access, title, body, text, content_hash, size) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                    (key, resp.url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), expires, now,
+                     now, title, body_z, text_z, digest, len(body_z) + len(text_z)))
+                self._conn().commit()
+                self._evict()
+        return CachedPage(key, resp.url, title, text, html, digest, now, "network")
+
+    def _page(self, key: str, row, source: str) -> CachedPage:
+        final_url, _, _, _, fetched, title, body_z, text_z, digest, _ = row
+        html = zlib.decompress(body_z).decode("utf-8")
+        text = zlib.decompress(text_z).decode("utf-8")
+        return CachedPage(key, final_url, title, text, html, digest, fetched, source)
+
+    def _touch(self, key: str, now: float):
+        with self._lock:
+            self._conn().execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, key))
+            self._conn().commit()
+
+    def _evict(self):
+        db = self._conn()
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in db.execute("SELECT url, size FROM pages ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            self.stats["evictions"] += 1
+        db.commit()
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn().execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    # ---------- summaries ----------
+    def summary(self, digest: str, model: str, kind: str = "bullets") -> Optional[str]:
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT summary FROM summaries WHERE content_hash = ? AND model = ? AND kind = ?",
+                (digest, model, kind)).fetchone()
+        return row[0] if row else None
+
+    def put_summary(self, digest: str, model: str, summary: str, kind: str = "bullets"):
+        with self._lock:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO summaries (content_hash, model, kind, summary, created) VALUES (?,?,?,?,?)",
+                (digest, model, kind, summary, time.time()))
+            self._conn().commit()
+
+    def summarize(self, page: CachedPage, model: str, summarize_fn: Callable[[CachedPage], Optional[str]],
+                  kind: str = "bullets") -> Optional[str]:
+        """
+        Memoized summary for the page's content (summarize_fn only runs on a miss).
+
+        summarize_fn signals failure by raising (propagated) or returning None/"";
+        either way nothing is stored, so an LLM error is never replayed as the answer.
+        """
+        cached = self.summary(page.content_hash, model, kind)
+        if cached is not None:
+            self.stats["summary_hits"] += 1
+            return cached
+        self.stats["summary_misses"] += 1
+        result = summarize_fn(page)
+        if result:
+            self.put_summary(page.content_hash, model, result, kind)
+        return result
+
+
+def get_page_cache() -> PageCache:
+    return PageCache.get_instance()
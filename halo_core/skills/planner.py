@@ -0,0 +1,155 @@
+# halo_core/skills/planner.py
+"""
+Dependency planning for multi-intent commands.
+
+Each action declares the resources it touches via "resources" in action_map.json
+(e.g. ["audio"], ["agent_browser"]). Two intents conflict when they share a tag,
+or when either one is tagged "*" (exclusive). Actions without a "resources" key
+are treated as exclusive so that unknown side effects stay ordered.
+
+An intent depends on every earlier intent it conflicts with, so order-sensitive
+pairs (open_webpage → click_element, mute → unmute) stay serialized while
+unrelated ones (open chrome / mute / check status) run concurrently.
+
+A step only launches once every dependency finished with status "done". If a
+dependency failed, timed out, was cancelled or was itself skipped, the step is
+skipped (`skipped` holds the reason): click_element never runs against a page
+that open_webpage couldn't open.
+"""
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence
+
+from .executor import Job, SkillExecutor
+
+EXCLUSIVE = "*"
+_OUTCOME = {"failed": "failed", "timeout": "timed out", "cancelled": "was cancelled"}
+
+
+@dataclass
+class Step:
+    index: int
+    action: str
+    target: Any
+    entry: Any
+    # Callable that submits this step to the executor and returns its Job
+    launch: Callable[[bool], Job]
+    inline: Optional[float]
+    resources: Sequence[str] = (EXCLUSIVE,)
+    deps: List["Step"] = field(default_factory=list)
+    job: Optional[Job] = None
+    deadline: Optional[float] = None
+    # True when the caller stopped waiting; the step finishes in the background
+    background: bool = False
+    # Why the step never ran (a dependency didn't succeed); final like a finished job
+    skipped: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.skipped is not None or (self.job is not None and self.job.done)
+
+    @property
+    def succeeded(self) -> bool:
+        return self.job is not None and self.job.done and self.job.status == "done"
+
+
+def entry_resources(entry: Any) -> List[str]:
+    """Resource tags declared for an action map entry (exclusive when undeclared)."""
+    if isinstance(entry, dict) and "resources" in entry:
+        tags = entry.get("resources") or []
+        if isinstance(tags, str):
+            tags = [tags]
+        if not isinstance(tags, (list, tuple)):
+            raise ValueError(f"'resources' must be a tag or a list of tags, got {tags!r}")
+        return [str(t) for t in tags]
+    return [EXCLUSIVE]
+
+
+def conflicts(a: Sequence[str], b: Sequence[str]) -> bool:
+    if EXCLUSIVE in a or EXCLUSIVE in b:
+        return True
+    return bool(set(a) & set(b))
+
+
+def plan_dependencies(steps: List[Step]) -> List[Step]:
+    """Fill in `deps` for each step: every earlier step it conflicts with."""
+    for i, step in enumerate(steps):
+        step.deps = [prev for prev in steps[:i] if conflicts(prev.resources, step.resources)]
+    return steps
+
+
+class PlanRunner:
+    """
+    Launch steps as soon as their dependencies finish and wait until every step
+    has either completed or exhausted its inline budget. Steps still running (or
+    still waiting on a backgrounded dependency) then continue in the background.
+    """
+
+    def __init__(self, steps: List[Step], executor: SkillExecutor):
+        self.steps = steps
+        self.executor = executor
+        self._cond = threading.Condition(threading.RLock())
+        self._detached = False
+
+    def run(self) -> List[Step]:
+        with self._cond:
+            self._launch_ready()
+            while True:
+                now = time.monotonic()
+                unsettled = [s for s in self.steps if not self._settled(s, now)]
+                if not unsettled:
+                    break
+                deadlines = [s.deadline for s in unsettled if s.job is not None and s.deadline is not None]
+                self._cond.wait(max(0.0, min(deadlines) - now) if deadlines else None)
+
+            self._detached = True
+            for step in self.steps:
+                if step.skipped is not None:
+                    continue
+                if step.job is None:
+                    step.background = True
+                elif not step.job.done:
+                    step.background = not self.executor.wait_inline(step.job, 0)
+        return self.steps
+
+    # ---------- internals ----------
+    def _settled(self, step: Step, now: float) -> bool:
+        if step.skipped is not None:
+            return True
+        if step.job is not None:
+            return step.job.done or (step.deadline is not None and now >= step.deadline)
+        # Not launched yet: settled only if it's stuck behind a step that went past its budget
+        return any(self._stalled(d, now) for d in step.deps)
+
+    def _stalled(self, step: Step, now: float) -> bool:
+        if step.skipped is not None:
+            return False
+        if step.job is None:
+            return any(self._stalled(d, now) for d in step.deps)
+        return not step.job.done and step.deadline is not None and now >= step.deadline
+
+    def _launch_ready(self):
+        with self._cond:
+            # Deps always come earlier in the list, so one pass also propagates skips
+            for step in self.steps:
+                if step.job is not None or step.skipped is not None:
+                    continue
+                if not all(d.finished for d in step.deps):
+                    continue
+                failed = next((d for d in step.deps if not d.succeeded), None)
+                if failed is not None:
+                    why = "was skipped" if failed.skipped is not None else _OUTCOME.get(failed.job.status, "failed")
+                    step.skipped = f"{failed.action} {why}"
+                    print(f"[Skills] skipping {step.action}: {step.skipped}")
+                else:
+                    step.job = step.launch(self._detached)
+                    step.background = self._detached
+                    step.deadline = time.monotonic() + (step.inline or 0.0) if step.inline is not None else None
+                    step.job.add_done_callback(self._on_done)
+
+    def _on_done(self, job: Job):
+        with self._cond:
+            self._launch_ready()
+            self._cond.notify_all()
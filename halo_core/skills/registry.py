@@ -0,0 +1,312 @@
+# halo_core/skills/registry.py
+"""
+Precompiled skill dispatch table.
+
+The registry turns action_map.json into SkillSpec records once: module/function
+names, per-action options (timeout, inline budget, resource tags, coercer) and,
+on first use of each action, the resolved callable plus how it wants to be
+called. Dispatch is then a dict lookup and a single call — no re-parsing of
+entries, no per-call imports, and no "call with target, retry without on
+TypeError" guessing that could run a skill twice or swallow real bugs.
+
+validate() checks every entry up front without importing skill modules (it
+parses their source), so bad entries are reported at startup instead of when
+the user first says the command.
+"""
+from __future__ import annotations
+import ast
+import importlib
+import importlib.util
+import inspect
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import CachePolicy, get_result_cache
+from .executor import DEFAULT_INLINE, DEFAULT_TIMEOUT
+from .planner import entry_resources
+
+SKILLS_PACKAGE = "halo_core.skills"
+
+
+# ───────────────────────────────────────────────────────────
+# Argument coercers (declared per action as "coerce": "<name>")
+# ───────────────────────────────────────────────────────────
+def _coerce_text(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        import json
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _coerce_int(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = re.sub(r"[^\d-]", "", str(value))
+    try:
+        return int(digits)
+    except ValueError:
+        return None
+
+
+def _coerce_percent(value: Any) -> Optional[int]:
+    n = _coerce_int(value)
+    return None if n is None else max(0, min(100, n))
+
+
+COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "text": _coerce_text,
+    "int": _coerce_int,
+    "percent": _coerce_percent,
+}
+
+
+def register_coercer(name: str, func: Callable[[Any], Any]):
+    COERCERS[name] = func
+
+
+# ───────────────────────────────────────────────────────────
+# Specs
+# ───────────────────────────────────────────────────────────
+@dataclass
+class SkillSpec:
+    action: str
+    module: str
+    function: str
+    entry: Any
+    timeout: Optional[float] = DEFAULT_TIMEOUT
+    inline: Optional[float] = DEFAULT_INLINE
+    resources: List[str] = field(default_factory=list)
+    coerce: Optional[Callable[[Any], Any]] = None
+    cache: Optional[CachePolicy] = None
+    invalidates: List[str] = field(default_factory=list)
+    # Filled in on first use
+    func: Optional[Callable[..., Any]] = None
+    is_async: bool = False
+    accepts_target: bool = False
+    target_required: bool = False
+
+    def args_for(self, target: Any) -> Tuple[Any, ...]:
+        """Positional args for one call, according to the inspected signature."""
+        if self.coerce is not None:
+            target = self.coerce(target)
+        if not self.accepts_target:
+            return ()
+        if target is None and not self.target_required:
+            return ()  # let the skill's own default apply
+        return (target,)
+
+    def call(self, target: Any) -> Any:
+        """Invoke the skill, going through the result cache / invalidation hooks if declared."""
+        try:
+            if self.cache is not None:
+                return get_result_cache().get_or_call(
+                    self.action, target, self.cache, lambda: self.func(*self.args_for(target))
+                )
+            return self.func(*self.args_for(target))
+        finally:
+            # Also on failure: a mutating skill that raised halfway may still have changed things
+            if self.invalidates:
+                get_result_cache().invalidate(self.invalidates)
+
+    async def acall(self, target: Any) -> Any:
+        """call() for `async def` skills (runs on the executor's asyncio lane)."""
+        try:
+            if self.cache is not None:
+                return await get_result_cache().aget_or_call(
+                    self.action, target, self.cache, lambda: self.func(*self.args_for(target))
+                )
+            return await self.func(*self.args_for(target))
+        finally:
+            if self.invalidates:
+                get_result_cache().invalidate(self.invalidates)
+
+    @property
+    def runner(self) -> Callable[[Any], Any]:
+        """What the executor runs for one call: acall for coroutine skills, call otherwise."""
+        return self.acall if self.is_async else self.call
+
+
+def resolve_entry(entry: Any) -> Optional[Tuple[str, str]]:
+    """
+    Normalize different mapping styles into (module_name, func_name).
+
+    Supported shapes in action_map.json:
+      - ["module_name", "function_name"]
+      - {"module": "module_name", "function": "function_name"}
+      - "module_name.function_name"   (string dotted path)
+    """
+    if isinstance(entry, list) and len(entry) == 2:
+        module_name, func_name = entry
+        return str(module_name), str(func_name)
+
+    if isinstance(entry, dict):
+        module_name = entry.get("module")
+        func_name = entry.get("function")
+        if module_name and func_name:
+            return str(module_name), str(func_name)
+
+    if isinstance(entry, str) and "." in entry:
+        module_name, func_name = entry.rsplit(".", 1)
+        return module_name, func_name
+
+    return None
+
+
+def _option(entry: Any, key: str, default: Optional[float]) -> Optional[float]:
+    if isinstance(entry, dict) and key in entry:
+        value = entry.get(key)
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            raise ValueError(f"'{key}' must be a number of seconds, got {value!r}")
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{key}' must be a number of seconds, got {value!r}") from None
+    return default
+
+
+def _inspect_signature(func: Callable[..., Any]) -> Tuple[bool, bool]:
+    """(accepts a positional target, target has no default)."""
+    try:
+        sig = inspect.signature(func)
+    except (TypeError, ValueError):
+        return True, False  # builtins etc.: assume a single optional arg
+    for p in sig.parameters.values():
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD):
+            return True, p.default is p.empty
+        if p.kind == p.VAR_POSITIONAL:
+            return True, False
+    return False, False
+
+
+def _module_names(module: str) -> Optional[set]:
+    """Top-level names defined by a skill module, read from its source (no import)."""
+    spec = importlib.util.find_spec(f"{SKILLS_PACKAGE}.{module}")
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    with open(spec.origin, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=spec.origin)
+    names = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)) and isinstance(node.target, ast.Name):
+            names.add(node.target.id)
+        elif isinstance(node, ast.ImportFrom):
+            names.update(a.asname or a.name for a in node.names)
+        elif isinstance(node, ast.Import):
+            names.update((a.asname or a.name).split(".")[0] for a in node.names)
+    return names
+
+
+class SkillRegistry:
+    def __init__(self, action_map: Dict[str, Any]):
+        self.action_map = action_map
+        self._specs: Dict[str, SkillSpec] = {}
+        self._invalid: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._build()
+
+    # ---------- public API ----------
+    def get(self, action: str) -> Optional[SkillSpec]:
+        """Spec with a resolved callable, or None (unknown/invalid/unimportable action)."""
+        spec = self._specs.get(action)
+        if spec is None:
+            if action in self._invalid:
+                print(f"[Skills] invalid map entry for '{action}': {self._invalid[action]}")
+            return None
+        if spec.func is None:
+            self._resolve(spec)
+        return spec if spec.func is not None else None
+
+    def actions(self) -> List[str]:
+        return list(self._specs)
+
+    def validate(self) -> List[str]:
+        """
+        Check every entry without importing skill modules: shape, coercer name,
+        module exists, function defined at module top level. Returns problems.
+        """
+        problems = [f"{a}: {why}" for a, why in self._invalid.items()]
+        sources: Dict[str, Optional[set]] = {}
+        for spec in self._specs.values():
+            if spec.module not in sources:
+                try:
+                    sources[spec.module] = _module_names(spec.module)
+                except SyntaxError as e:
+                    problems.append(f"{spec.action}: module '{spec.module}' has a syntax error: {e}")
+                    sources[spec.module] = set()
+                    continue
+            names = sources[spec.module]
+            if names is None:
+                problems.append(f"{spec.action}: module '{spec.module}' not found")
+            elif spec.function not in names:
+                problems.append(f"{spec.action}: '{spec.function}' not defined in '{spec.module}'")
+            for other in spec.invalidates:
+                if other != "*" and other not in self.action_map:
+                    problems.append(f"{spec.action}: invalidates unknown action '{other}'")
+        for p in problems:
+            print(f"[Skills] ⚠️ action_map: {p}")
+        return problems
+
+    # ---------- internals ----------
+    def _build(self):
+        for action, entry in self.action_map.items():
+            resolved = resolve_entry(entry)
+            if not resolved:
+                self._invalid[action] = f"unrecognized entry {entry!r}"
+                continue
+            coerce = None
+            if isinstance(entry, dict) and entry.get("coerce"):
+                coerce = COERCERS.get(entry["coerce"])
+                if coerce is None:
+                    self._invalid[action] = f"unknown coercer '{entry['coerce']}'"
+                    continue
+            invalidates = entry.get("invalidates", []) if isinstance(entry, dict) else []
+            if isinstance(invalidates, str):
+                invalidates = [invalidates]
+            module_name, func_name = resolved
+            try:
+                # A bad option is reported by validate(); it must not crash `import halo_core.skills`
+                if not isinstance(invalidates, (list, tuple)):
+                    raise ValueError(f"'invalidates' must be an action or a list of actions, got {invalidates!r}")
+                self._specs[action] = SkillSpec(
+                    action=action,
+                    module=module_name,
+                    function=func_name,
+                    entry=entry,
+                    timeout=_option(entry, "timeout", DEFAULT_TIMEOUT),
+                    inline=_option(entry, "inline", DEFAULT_INLINE),
+                    resources=entry_resources(entry),
+                    coerce=coerce,
+                    cache=CachePolicy.from_entry(entry.get("cache")) if isinstance(entry, dict) else None,
+                    invalidates=list(invalidates),
+                )
+            except ValueError as e:
+                self._invalid[action] = str(e)
+
+    def _resolve(self, spec: SkillSpec):
+        with self._lock:
+            if spec.func is not None:
+                return
+            try:
+                module = importlib.import_module(f"{SKILLS_PACKAGE}.{spec.module}")
+            except Exception as e:
+                print(f"[Skills] failed to import skill module '{spec.module}': {e}")
+                return
+            func = getattr(module, spec.function, None)
+            if not callable(func):
+                print(f"[Skills] function '{spec.function}' not found in module '{spec.module}'.")
+                return
+            spec.is_async = inspect.iscoroutinefunction(func)
+            spec.accepts_target, spec.target_required = _inspect_signature(func)
+            spec.func = func
@@ -0,0 +1,137 @@
+# halo_core/skills/research.py
+"""
+Research mode: answer "compare X and Y" style questions from several pages at once.
+
+1. Search (the HTTP fast path) for the top-K result URLs.
+2. Fetch and extract every page concurrently, at most HALO_RESEARCH_CONCURRENCY
+   at a time. Each page has its own timeout (HALO_RESEARCH_PAGE_TIMEOUT), and
+   the whole batch has a deadline derived from it, so one slow site is dropped
+   instead of stalling the answer.
+3. Pages that fetched cleanly but whose static HTML has no usable text
+   (JS-rendered, blocked) are handed to an optional renderer, which opens
+   them in parallel browser tabs (see web.py). Pages that failed or timed out
+   are not retried in the browser; that would stall the answer all over again.
+4. merge_prompt() builds one prompt over the per-page excerpts for the final answer.
+
+Nothing here touches the network directly; the search/fetch/render callables
+are injected, which keeps this module import-cheap and testable against a stub site.
+"""
+from __future__ import annotations
+import concurrent.futures
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .executor import report_progress
+
+RESEARCH_PAGES = int(os.getenv("HALO_RESEARCH_PAGES", "4"))
+RESEARCH_CONCURRENCY = int(os.getenv("HALO_RESEARCH_CONCURRENCY", "4"))
+PAGE_TIMEOUT_S = float(os.getenv("HALO_RESEARCH_PAGE_TIMEOUT", "6"))
+PAGE_EXCERPT_CHARS = int(os.getenv("HALO_RESEARCH_EXCERPT_CHARS", "2500"))
+MIN_PAGE_TEXT = 200
+
+# fetch(url, timeout) -> (final_url, title, text, source)
+Fetch = Callable[[str, float], Tuple[str, str, str, str]]
+# render(urls, timeout) -> {url: (title, text)} for the pages it managed to open
+Render = Callable[[List[str], float], Dict[str, Tuple[str, str]]]
+
+
+@dataclass
+class SourcePage:
+    url: str
+    title: str = ""
+    text: str = ""
+    source: str = ""          # network | cache | revalidated | browser
+    elapsed_s: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def usable(self) -> bool:
+        return self.error is None and len(self.text) >= MIN_PAGE_TEXT
+
+
+@dataclass
+class ResearchResult:
+    query: str
+    pages: List[SourcePage] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    @property
+    def usable(self) -> List[SourcePage]:
+        return [p for p in self.pages if p.usable]
+
+
+def _fetch_one(fetch: Fetch, url: str, timeout: float) -> SourcePage:
+    t0 = time.perf_counter()
+    try:
+        final_url, title, text, source = fetch(url, timeout)
+        return SourcePage(final_url or url, title, text, source, time.perf_counter() - t0)
+    except Exception as e:
+        return SourcePage(url, elapsed_s=time.perf_counter() - t0, error=f"{type(e).__name__}: {e}")
+
+
+def gather_pages(urls: Sequence[str], fetch: Fetch, concurrency: int = RESEARCH_CONCURRENCY,
+                 page_timeout: float = PAGE_TIMEOUT_S,
+                 progress: Callable[[str], None] = report_progress) -> List[SourcePage]:
+    """Fetch `urls` concurrently; pages that miss the deadline come back with error='timed out'."""
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return []
+    concurrency = max(1, min(concurrency, len(urls)))
+    # Every page gets page_timeout once it starts; the batch gets one slot per wave (+ slack)
+    deadline = page_timeout * math.ceil(len(urls) / concurrency) + 1.0
+    pool = concurrent.futures.ThreadPoolExecutor(concurrency, thread_name_prefix="halo-research")
+    futures = {pool.submit(_fetch_one, fetch, url, page_timeout): url for url in urls}
+    pages: Dict[str, SourcePage] = {}
+    try:
+        for fut in concurrent.futures.as_completed(futures, timeout=deadline):
+            page = fut.result()
+            pages[futures[fut]] = page
+            progress(f"read {len(pages)}/{len(urls)} pages")
+    except concurrent.futures.TimeoutError:
+        pass
+    finally:
+        # Don't wait for stragglers; their threads finish (and are ignored) on their own timeouts
+        pool.shutdown(wait=False, cancel_futures=True)
+    return [pages.get(url) or SourcePage(url, error="timed out") for url in urls]
+
+
+def research(query: str, search: Callable[[str, int], List[Any]], fetch: Fetch,
+             render: Optional[Render] = None, k: int = RESEARCH_PAGES,
+             concurrency: int = RESEARCH_CONCURRENCY, page_timeout: float = PAGE_TIMEOUT_S,
+             progress: Callable[[str], None] = report_progress) -> ResearchResult:
+    """Search, read the top-k pages in parallel, and fill JS-only pages in through `render`."""
+    t0 = time.perf_counter()
+    progress(f"searching for '{query}'")
+    urls = [r.url for r in search(query, k)][:k]
+    pages = gather_pages(urls, fetch, concurrency, page_timeout, progress)
+
+    thin = [p.url for p in pages if p.error is None and not p.usable]
+    if thin and render is not None:
+        progress(f"opening {len(thin)} pages in the browser")
+        try:
+            rendered = render(thin, page_timeout)
+        except Exception as e:
+            print(f"[Research] browser rendering failed: {e}")
+            rendered = {}
+        for page in pages:
+            if page.url in rendered:
+                page.title, page.text = rendered[page.url]
+                page.source, page.error = "browser", None
+
+    return ResearchResult(query, pages, time.perf_counter() - t0)
+
+
+def merge_prompt(query: str, pages: Sequence[SourcePage], excerpt_chars: int = PAGE_EXCERPT_CHARS) -> str:
+    """One prompt over all usable pages, each cut to an excerpt and numbered for citation."""
+    sources = "\n\n".join(
+        f"[{i}] {p.title or p.url} ({p.url})\n{p.text[:excerpt_chars]}" for i, p in enumerate(pages, 1)
+    )
+    return (
+        f"Question: {query}\n\n"
+        "Answer the question using only the sources below. Compare them where they differ. "
+        "Keep it to 3-5 short sentences in plain text and cite sources as [n].\n\n"
+        f"{sources}"
+    )
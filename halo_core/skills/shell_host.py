@@ -0,0 +1,430 @@
+# halo_core/skills/shell_host.py
+"""
+Long-lived shell host + pluggable mixer backends for system_control.
+
+Instead of spawning a fresh `powershell` for every mute/volume/media key, a
+single shell process stays warm and takes requests over stdin. Each request is
+framed with a sentinel line carrying a request id and exit status, so responses
+are matched to requests and stray output from a timed-out request is discarded.
+A dead or hung host is killed and restarted on the next request.
+
+Backends (HALO_MIXER_BACKEND = windows | pactl | amixer | fake, auto-detected by default):
+  - WindowsMixer: Core Audio (IAudioEndpointVolume) via one Add-Type prelude,
+                  so volume is set in a single call instead of 50 + N key presses
+  - PulseMixer:   pactl on a persistent /bin/sh host
+  - AlsaMixer:    amixer on a persistent /bin/sh host
+  - FakeHost can stand in for any host in tests
+"""
+from __future__ import annotations
+import base64
+import itertools
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from typing import Callable, Dict, List, Optional, Union
+
+END_MARK = "__HALO_END__"
+DEFAULT_TIMEOUT = float(os.getenv("HALO_SHELL_TIMEOUT", "10"))
+MIXER_BACKEND = os.getenv("HALO_MIXER_BACKEND", "").lower().strip()
+
+
+class HostError(RuntimeError):
+    """A host command failed, timed out, or the host process could not be (re)started."""
+
+
+# ───────────────────────────────────────────────────────────
+# Hosts
+# ───────────────────────────────────────────────────────────
+class CommandHost:
+    """Request/response interface: run one command, get its combined output."""
+
+    def run(self, command: str, timeout: float = DEFAULT_TIMEOUT) -> str:
+        raise NotImplementedError
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _ProcessHost(CommandHost):
+    argv: List[str] = []
+    prelude: str = ""
+
+    def __init__(self):
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._spawned = False
+        self.restarts = 0
+        self.requests = 0
+
+    # ---------- public API ----------
+    def start(self):
+        with self._lock:
+            self._ensure_started()
+
+    def run(self, command: str, timeout: float = DEFAULT_TIMEOUT) -> str:
+        with self._lock:
+            self.requests += 1
+            for attempt in (1, 2):
+                self._ensure_started()
+                rid = next(self._ids)
+                try:
+                    self._proc.stdin.write(self._frame(command, rid))
+                    self._proc.stdin.flush()
+                except (BrokenPipeError, OSError, ValueError):
+                    # Host died between requests: restart once and resend
+                    self._kill()
+                    if attempt == 2:
+                        raise HostError("shell host is not accepting commands")
+                    continue
+                return self._read_response(rid, timeout)
+        raise HostError("unreachable")
+
+    def close(self):
+        with self._lock:
+            self._kill()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._proc.pid if self._proc is not None else None
+
+    # ---------- framing (per shell) ----------
+    def _frame(self, command: str, rid: int) -> str:
+        raise NotImplementedError
+
+    # ---------- internals ----------
+    def _ensure_started(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return
+        if self._spawned:
+            self.restarts += 1
+            print(f"[Shell] ⚠️ {self.argv[0]} host is gone; restarting")
+        self._spawned = True
+        try:
+            self._proc = subprocess.Popen(
+                self.argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            )
+        except OSError as e:
+            self._proc = None
+            raise HostError(f"cannot start {self.argv[0]}: {e}") from e
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self._proc, self._lines),
+                         name="halo-shell-reader", daemon=True).start()
+        if self.prelude:
+            rid = next(self._ids)
+            try:
+                self._proc.stdin.write(self._frame(self.prelude, rid))
+                self._proc.stdin.flush()
+                self._read_response(rid, 60.0)
+            except (HostError, BrokenPipeError, OSError, ValueError) as e:
+                # A live host without its prelude would fail every later command; start clean next time
+                self._kill()
+                raise HostError(f"{self.argv[0]} host setup failed: {e}") from e
+
+    @staticmethod
+    def _pump(proc: subprocess.Popen, lines: "queue.Queue[Optional[str]]"):
+        for line in proc.stdout:
+            lines.put(line.rstrip("\r\n"))
+        lines.put(None)
+
+    def _read_response(self, rid: int, timeout: float) -> str:
+        out: List[str] = []
+        mark = f"{END_MARK} {rid} "
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                self._kill()
+                raise HostError(f"shell host timed out after {timeout}s")
+            if line is None:
+                self._kill()
+                raise HostError("shell host exited mid-request: " + " | ".join(out[-5:]))
+            if line.startswith(mark):
+                status = line[len(mark):].strip()
+                text = "\n".join(out).strip()
+                if status != "0":
+                    raise HostError(text or f"command failed (status {status})")
+                return text
+            if line.startswith(END_MARK):
+                out.clear()  # tail of an abandoned request
+                continue
+            out.append(line)
+
+    def _kill(self):
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=2)
+        except Exception:
+            pass
+
+
+class PowerShellHost(_ProcessHost):
+    argv = ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive",
+            "-ExecutionPolicy", "Bypass", "-Command", "-"]
+
+    def __init__(self, prelude: str = ""):
+        super().__init__()
+        self.prelude = prelude
+
+    def _frame(self, command: str, rid: int) -> str:
+        # One line per request: the script travels base64-encoded, so multi-line
+        # scripts (Add-Type blocks) don't trip PowerShell's stdin line parser.
+        b64 = base64.b64encode(command.encode("utf-8")).decode("ascii")
+        return (
+            "$__ok = 0; try { & ([ScriptBlock]::Create([Text.Encoding]::UTF8.GetString("
+            f"[Convert]::FromBase64String('{b64}')))) 2>&1 | Out-String -Stream }} "
+            "catch { Write-Output $_.Exception.Message; $__ok = 1 }; "
+            f"Write-Output \"{END_MARK} {rid} $__ok\"; [Console]::Out.Flush()\n"
+        )
+
+
+class PosixShellHost(_ProcessHost):
+    argv = ["/bin/sh"]
+
+    def __init__(self, prelude: str = ""):
+        super().__init__()
+        self.prelude = prelude
+
+    def _frame(self, command: str, rid: int) -> str:
+        return f"{{ {command}\n}} </dev/null 2>&1; echo \"{END_MARK} {rid} $?\"\n"
+
+
+class FakeHost(CommandHost):
+    """
+    In-memory host for tests: records commands and answers from `responses`
+    (exact command → output, or a callable(command) → output).
+    """
+
+    def __init__(self, responses: Optional[Union[Dict[str, str], Callable[[str], str]]] = None):
+        self.responses = responses or {}
+        self.commands: List[str] = []
+        self.closed = False
+
+    def run(self, command: str, timeout: float = DEFAULT_TIMEOUT) -> str:
+        self.commands.append(command)
+        if callable(self.responses):
+            return self.responses(command)
+        return self.responses.get(command, "")
+
+    def close(self):
+        self.closed = True
+
+
+# ───────────────────────────────────────────────────────────
+# Mixer backends
+# ───────────────────────────────────────────────────────────
+class Mixer:
+    name = "base"
+
+    def __init__(self, host: CommandHost):
+        self.host = host
+
+    def warm_up(self):
+        self.host.start()
+        return self
+
+    def mute(self):
+        raise NotImplementedError
+
+    def unmute(self):
+        raise NotImplementedError
+
+    def set_volume(self, percent: int):
+        raise NotImplementedError
+
+    def get_volume(self) -> Optional[int]:
+        raise NotImplementedError
+
+    def play_pause(self):
+        raise NotImplementedError
+
+    def close(self):
+        self.host.close()
+
+
+_WINDOWS_AUDIO_PRELUDE = r'''
+Add-Type -TypeDefinition @"
+using System;
+using System.Runtime.InteropServices;
+
+[Guid("5CDF2C82-841E-4546-9722-0CF74078229A"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
+interface IAudioEndpointVolume {
+    int f(); int g(); int h(); int i();
+    int SetMasterVolumeLevelScalar(float fLevel, Guid pguidEventContext);
+    int j();
+    int GetMasterVolumeLevelScalar(out float pfLevel);
+    int k(); int l(); int m(); int n();
+    int SetMute([MarshalAs(UnmanagedType.Bool)] bool bMute, Guid pguidEventContext);
+    int GetMute(out bool pbMute);
+}
+[Guid("D666063F-1587-4E43-81F1-B948E807363F"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
+interface IMMDevice {
+    int Activate(ref Guid id, int clsCtx, int activationParams, out IAudioEndpointVolume aev);
+}
+[Guid("A95664D2-9614-4F35-A746-DE8DB63617E6"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
+interface IMMDeviceEnumerator {
+    int f();
+    int GetDefaultAudioEndpoint(int dataFlow, int role, out IMMDevice endpoint);
+}
+[ComImport, Guid("BCDE0395-E52F-467C-8E3D-C4579291692E")] class MMDeviceEnumeratorComObject { }
+
+public class HaloAudio {
+    static IAudioEndpointVolume Endpoint() {
+        var enumerator = new MMDeviceEnumeratorComObject() as IMMDeviceEnumerator;
+        IMMDevice dev = null;
+        Marshal.ThrowExceptionForHR(enumerator.GetDefaultAudioEndpoint(0, 1, out dev));
+        IAudioEndpointVolume epv = null;
+        var epvid = typeof(IAudioEndpointVolume).GUID;
+        Marshal.ThrowExceptionForHR(dev.Activate(ref epvid, 23, 0, out epv));
+        return epv;
+    }
+    public static float Volume {
+        get { float v = -1; Marshal.ThrowExceptionForHR(Endpoint().GetMasterVolumeLevelScalar(out v)); return v; }
+        set { Marshal.ThrowExceptionForHR(Endpoint().SetMasterVolumeLevelScalar(value, Guid.Empty)); }
+    }
+    public static bool Mute {
+        get { bool mute; Marshal.ThrowExceptionForHR(Endpoint().GetMute(out mute)); return mute; }
+        set { Marshal.ThrowExceptionForHR(Endpoint().SetMute(value, Guid.Empty)); }
+    }
+}
+
+public class HaloKeys {
+    [DllImport("user32.dll")]
+    static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, UIntPtr dwExtraInfo);
+    public static void Tap(byte vk) {
+        keybd_event(vk, 0, 1, UIntPtr.Zero);
+        keybd_event(vk, 0, 3, UIntPtr.Zero);
+    }
+}
+"@
+'''
+
+
+class WindowsMixer(Mixer):
+    name = "windows"
+
+    def __init__(self, host: Optional[CommandHost] = None):
+        super().__init__(host or PowerShellHost(prelude=_WINDOWS_AUDIO_PRELUDE))
+
+    def mute(self):
+        self.host.run("[HaloAudio]::Mute = $true")
+
+    def unmute(self):
+        self.host.run("[HaloAudio]::Mute = $false")
+
+    def set_volume(self, percent: int):
+        self.host.run(f"[HaloAudio]::Mute = $false; [HaloAudio]::Volume = {percent / 100.0:.2f}")
+
+    def get_volume(self) -> Optional[int]:
+        out = self.host.run("[math]::Round([HaloAudio]::Volume * 100)")
+        return int(out) if out.strip().isdigit() else None
+
+    def play_pause(self):
+        self.host.run("[HaloKeys]::Tap(0xB3)")  # VK_MEDIA_PLAY_PAUSE
+
+    def close_windowed_apps(self):
+        self.host.run('Get-Process | Where-Object {$_.MainWindowTitle -ne ""} | ForEach-Object {Stop-Process $_.Id -Force}')
+
+
+class PulseMixer(Mixer):
+    name = "pactl"
+
+    def __init__(self, host: Optional[CommandHost] = None):
+        super().__init__(host or PosixShellHost())
+
+    def mute(self):
+        self.host.run("pactl set-sink-mute @DEFAULT_SINK@ 1")
+
+    def unmute(self):
+        self.host.run("pactl set-sink-mute @DEFAULT_SINK@ 0")
+
+    def set_volume(self, percent: int):
+        self.host.run(f"pactl set-sink-mute @DEFAULT_SINK@ 0 && pactl set-sink-volume @DEFAULT_SINK@ {percent}%")
+
+    def get_volume(self) -> Optional[int]:
+        m = re.search(r"(\d+)%", self.host.run("pactl get-sink-volume @DEFAULT_SINK@"))
+        return int(m.group(1)) if m else None
+
+    def play_pause(self):
+        self.host.run("playerctl play-pause")
+
+
+class AlsaMixer(Mixer):
+    name = "amixer"
+
+    def __init__(self, host: Optional[CommandHost] = None, control: str = "Master"):
+        super().__init__(host or PosixShellHost())
+        self.control = control
+
+    def mute(self):
+        self.host.run(f"amixer -q sset {self.control} mute")
+
+    def unmute(self):
+        self.host.run(f"amixer -q sset {self.control} unmute")
+
+    def set_volume(self, percent: int):
+        self.host.run(f"amixer -q sset {self.control} {percent}% unmute")
+
+    def get_volume(self) -> Optional[int]:
+        m = re.search(r"\[(\d+)%\]", self.host.run(f"amixer sget {self.control}"))
+        return int(m.group(1)) if m else None
+
+    def play_pause(self):
+        self.host.run("playerctl play-pause")
+
+
+_BACKENDS = {"windows": WindowsMixer, "pactl": PulseMixer, "amixer": AlsaMixer}
+_mixer: Optional[Mixer] = None
+_mixer_lock = threading.Lock()
+
+
+def _detect_backend() -> Optional[str]:
+    if MIXER_BACKEND:
+        return MIXER_BACKEND
+    if os.name == "nt":
+        return "windows"
+    if shutil.which("pactl"):
+        return "pactl"
+    if shutil.which("amixer"):
+        return "amixer"
+    return None
+
+
+def get_mixer() -> Optional[Mixer]:
+    """The process-wide mixer (None when no backend is available on this machine)."""
+    global _mixer
+    with _mixer_lock:
+        if _mixer is None:
+            backend = _detect_backend()
+            if backend == "fake":
+                _mixer = WindowsMixer(FakeHost())
+            elif backend in _BACKENDS:
+                _mixer = _BACKENDS[backend]()
+        return _mixer
+
+
+def set_mixer(mixer: Optional[Mixer]):
+    """Swap the mixer (tests, or a custom backend). Closes the previous one."""
+    global _mixer
+    with _mixer_lock:
+        if _mixer is not None and _mixer is not mixer:
+            _mixer.close()
+        _mixer = mixer
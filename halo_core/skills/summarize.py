@@ -0,0 +1,205 @@
+# halo_core/skills/summarize.py
+"""
+Map-reduce summarization for long pages.
+
+1. chunk_text() splits extracted text into token-bounded chunks on structural
+   boundaries: block lines first, then sentences, then words as a last resort.
+2. Map: chunks are summarized concurrently, at most HALO_SUMMARY_CONCURRENCY
+   Ollama calls at a time. Each partial summary is memoized by the chunk's
+   content hash, so when a page changes only the edited chunks are re-run.
+3. Reduce: partial summaries are merged into the final 3 bullets. If the
+   partials themselves exceed the budget they are reduced in rounds.
+
+Progress ("part 3/7") is published through the executor, so a background
+summarize job streams to the HUD.
+
+A failed model call (generate raises or returns None) aborts the summary with
+SummaryError. Nothing from that run is memoized, so the next attempt calls the
+model again instead of replaying an error.
+"""
+from __future__ import annotations
+import concurrent.futures
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .executor import report_progress
+
+CHUNK_TOKENS = int(os.getenv("HALO_SUMMARY_CHUNK_TOKENS", "1500"))
+CONCURRENCY = int(os.getenv("HALO_SUMMARY_CONCURRENCY", "2"))
+CHARS_PER_TOKEN = 4.0  # rough estimate for English prose; no tokenizer on this path
+
+Generate = Callable[[str], Optional[str]]
+
+MAP_PROMPT = (
+    "You are summarizing part {part} of {total} of a web page titled \"{title}\".\n"
+    "Write 2-4 terse bullet points with the key facts from this part only. Plain text, no preamble.\n\n{text}"
+)
+REDUCE_PROMPT = (
+    "These are notes from consecutive parts of a web page titled \"{title}\".\n"
+    "Summarize the whole page in exactly 3 short bullet points. Plain text, no preamble.\n\n{text}"
+)
+DIRECT_PROMPT = (
+    "Summarize this web page in exactly 3 short bullet points. Plain text, no preamble.\n\n"
+    "Title: {title}\n\n{text}"
+)
+
+
+class SummaryError(RuntimeError):
+    """A map or reduce model call failed; the summary is incomplete."""
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+@dataclass
+class Chunk:
+    index: int
+    text: str
+    tokens: int
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+
+
+def _pieces(block: str, max_tokens: int) -> List[str]:
+    """Split one oversize block into sentence runs, then word runs."""
+    if estimate_tokens(block) <= max_tokens:
+        return [block]
+    out: List[str] = []
+    for sentence in _SENTENCE.split(block):
+        if estimate_tokens(sentence) <= max_tokens:
+            out.append(sentence)
+            continue
+        words, cur = sentence.split(), []
+        budget = int(max_tokens * CHARS_PER_TOKEN)
+        size = 0
+        for w in words:
+            if cur and size + len(w) + 1 > budget:
+                out.append(" ".join(cur))
+                cur, size = [], 0
+            cur.append(w)
+            size += len(w) + 1
+        if cur:
+            out.append(" ".join(cur))
+    return out
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS) -> List[Chunk]:
+    """Token-bounded chunks that break between blocks (lines) whenever possible."""
+    chunks: List[Chunk] = []
+    cur: List[str] = []
+    cur_tokens = 0
+
+    def flush():
+        nonlocal cur, cur_tokens
+        if cur:
+            body = "\n".join(cur)
+            chunks.append(Chunk(len(chunks), body, estimate_tokens(body)))
+            cur, cur_tokens = [], 0
+
+    for block in (b.strip() for b in text.splitlines()):
+        if not block:
+            continue
+        for piece in _pieces(block, max_tokens):
+            t = estimate_tokens(piece)
+            # a heading-like short line starts a new chunk if the current one is mostly full
+            if cur and (cur_tokens + t > max_tokens or (t < 20 and cur_tokens > max_tokens * 0.8)):
+                flush()
+            cur.append(piece)
+            cur_tokens += t
+    flush()
+    return chunks
+
+
+class Summarizer:
+    """
+    generate(prompt) -> text is the model call (one Ollama request). memo_get /
+    memo_put store partial summaries by chunk hash (PageCache.summary/put_summary).
+    """
+
+    def __init__(self, generate: Generate, model: str, *, concurrency: int = CONCURRENCY,
+                 chunk_tokens: int = CHUNK_TOKENS,
+                 memo_get: Optional[Callable[[str, str, str], Optional[str]]] = None,
+                 memo_put: Optional[Callable[[str, str, str, str], None]] = None,
+                 progress: Callable[[str], None] = report_progress):
+        self.generate = generate
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.chunk_tokens = chunk_tokens
+        self.memo_get = memo_get
+        self.memo_put = memo_put
+        self.progress = progress
+        self.stats = {"chunks": 0, "reused": 0, "model_calls": 0, "reduce_rounds": 0}
+
+    @property
+    def _kind(self) -> str:
+        return f"chunk:{self.chunk_tokens}"
+
+    def summarize(self, text: str, title: str = "") -> str:
+        chunks = chunk_text(text, self.chunk_tokens)
+        self.stats["chunks"] = len(chunks)
+        if not chunks:
+            return ""
+        if len(chunks) == 1:
+            return self._call(DIRECT_PROMPT.format(title=title, text=chunks[0].text))
+        partials = self._map(chunks, title)
+        return self._reduce(partials, title)
+
+    # ---------- internals ----------
+    def _call(self, prompt: str) -> str:
+        self.stats["model_calls"] += 1
+        try:
+            text = self.generate(prompt)
+        except Exception as e:
+            raise SummaryError(f"model call failed: {type(e).__name__}: {e}") from e
+        if text is None:
+            raise SummaryError("model call failed")
+        return text.strip()
+
+    def _summarize_chunk(self, chunk: Chunk, total: int, title: str) -> str:
+        # The prompt includes part/total, but the memo key is the chunk content only
+        digest = chunk.digest
+        if self.memo_get is not None:
+            cached = self.memo_get(digest, self.model, self._kind)
+            if cached is not None:
+                self.stats["reused"] += 1
+                return cached
+        partial = self._call(MAP_PROMPT.format(part=chunk.index + 1, total=total, title=title, text=chunk.text))
+        if partial and self.memo_put is not None:
+            self.memo_put(digest, self.model, partial, self._kind)
+        return partial
+
+    def _map(self, chunks: List[Chunk], title: str) -> List[str]:
+        total = len(chunks)
+        partials: List[Optional[str]] = [None] * total
+        done = 0
+        self.progress(f"reading {total} parts")
+        with concurrent.futures.ThreadPoolExecutor(self.concurrency, thread_name_prefix="halo-summary") as pool:
+            futures = {pool.submit(self._summarize_chunk, c, total, title): c.index for c in chunks}
+            for fut in concurrent.futures.as_completed(futures):
+                partials[futures[fut]] = fut.result()
+                done += 1
+                self.progress(f"summarized part {done}/{total}")
+        return [p for p in partials if p]
+
+    def _reduce(self, partials: List[str], title: str) -> str:
+        # Reduce in rounds while the notes don't fit one prompt
+        while estimate_tokens("\n".join(partials)) > self.chunk_tokens and len(partials) > 1:
+            self.stats["reduce_rounds"] += 1
+            groups = chunk_text("\n".join(partials), self.chunk_tokens)
+            self.progress(f"condensing {len(partials)} notes into {len(groups)}")
+            with concurrent.futures.ThreadPoolExecutor(self.concurrency, thread_name_prefix="halo-summary") as pool:
+                partials = list(pool.map(
+                    lambda g: self._call(MAP_PROMPT.format(part=g.index + 1, total=len(groups), title=title,
+                                                           text=g.text)), groups))
+        self.stats["reduce_rounds"] += 1
+        self.progress("writing the final summary")
+        return self._call(REDUCE_PROMPT.format(title=title, text="\n".join(partials)))
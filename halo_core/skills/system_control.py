@@ -3,6 +3,8 @@ import subprocess
 import ctypes
 import webbrowser
 
+from .shell_host import HostError, WindowsMixer, get_mixer
+
 # 📴 --- Power Controls --- 📴
 
 def shutdown():
@@ -21,44 +23,50 @@ def sleep():
     return None
 
 # 🔈 --- Volume Controls --- 🔈
+# All mixer calls go through one warm shell host (see shell_host.py).
+
+def _mixer_or_complain():
+    mixer = get_mixer()
+    if mixer is None:
+        return None, "Hmph, I can't find a volume mixer on this machine."
+    return mixer, None
 
 def mute_system():
     """Mutes the system volume."""
-    subprocess.run(['powershell', '-Command',
-                    "(new-object -com wscript.shell).SendKeys([char]173)"])
+    mixer, err = _mixer_or_complain()
+    if err:
+        return err
+    try:
+        mixer.mute()
+    except HostError as e:
+        return f"Ugh… muting failed: {e}"
     return None
 
 def unmute_system():
     """Unmutes the system volume."""
-    subprocess.run(['powershell', '-Command',
-                    "(new-object -com wscript.shell).SendKeys([char]173)"])
+    mixer, err = _mixer_or_complain()
+    if err:
+        return err
+    try:
+        mixer.unmute()
+    except HostError as e:
+        return f"Ugh… unmuting failed: {e}"
     return None
 
 def set_volume(target: int):
     """
-    Sets the system volume to a given percentage (0–100) on Windows.
+    Sets the system volume to a given percentage (0–100) with a single mixer call.
     """
     if target is None:
         return None
 
+    mixer, err = _mixer_or_complain()
+    if err:
+        return err
+
     try:
         volume = max(0, min(100, int(target)))  # Clamp between 0–100
-
-        # 1️⃣ Set to 0 first by sending 'volume down' 50 times
-        subprocess.run(
-            ['powershell', '-Command',
-             f"for ($i=0; $i -lt 50; $i++) {{ (new-object -com wscript.shell).SendKeys([char]174) }}"],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-        )
-
-        # 2️⃣ Raise volume to target by sending 'volume up'
-        presses = int(volume / 2)  # each press ≈ 2%
-        subprocess.run(
-            ['powershell', '-Command',
-             f"for ($i=0; $i -lt {presses}; $i++) {{ (new-object -com wscript.shell).SendKeys([char]175) }}"],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-        )
-
+        mixer.set_volume(volume)
         return None
 
     except Exception as e:
@@ -68,6 +76,14 @@ def set_volume(target: int):
 
 def close_all_apps():
     """Closes all open windows/apps except system essentials."""
+    mixer = get_mixer()
+    if isinstance(mixer, WindowsMixer):
+        # Reuse the warm PowerShell host instead of spawning one
+        try:
+            mixer.close_windowed_apps()
+        except HostError as e:
+            return f"Ugh… closing apps failed: {e}"
+        return None
     subprocess.run(['powershell', '-Command',
                     'Get-Process | Where-Object {$_.MainWindowTitle -ne ""} | ForEach-Object {Stop-Process $_.Id -Force}'],
                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -98,6 +114,11 @@ def open_website(target):
 
 def play_pause_media():
     """Toggles play/pause of current media using media key simulation."""
-    subprocess.run(['powershell', '-Command',
-                    '(new-object -com wscript.shell).SendKeys([char]179)'])
+    mixer, err = _mixer_or_complain()
+    if err:
+        return err
+    try:
+        mixer.play_pause()
+    except HostError as e:
+        return f"Ugh… the media key didn't go through: {e}"
     return None
@@ -1,102 +1,60 @@
 import os
+import re
 import json
 import asyncio
-from typing import Union, List
-import importlib
+import threading
+from typing import List, Optional, Union
 from pathlib import Path
 
-# ───────────────────────────────────────────────────────────
-# Utility: lazy import by dotted path with nice error traces
-# ───────────────────────────────────────────────────────────
-def _load_symbol(pathspec: str):
-    """Load a symbol given 'pkg.mod.Class'. Returns (object or None, error_string_or_None)."""
-    try:
-        mod_path, sym = pathspec.rsplit(".", 1)
-        mod = importlib.import_module(mod_path)
-        return getattr(mod, sym, None), None
-    except Exception as e:
-        return None, f"{pathspec}: {e}"
-
-def _first_present(candidates):
-    """Try multiple dotted paths; return (obj, trace_list)."""
-    trace = []
-    for p in candidates:
-        obj, err = _load_symbol(p)
-        if obj is not None:
-            trace.append(f"OK {p}")
-            return obj, trace
-        trace.append(f"FAIL {p} -> {err}")
-    return None, trace
+from .lazy import HeavyDependency, requires
+from .agent_monitor import BUDGET_GRACE_S, BUDGET_S, AgentMonitor, action_budget
+from .dom_diff import DOM_DIFF_ENABLED, DomDiffer, install as install_dom_diff
+from .executor import current_job, report_progress
+from .web_session import TASK_TIMEOUT_S, WebSession, get_web_session
 
 # ───────────────────────────────────────────────────────────
-# Resolve Agent / Browser / LLM adapter across versions
+# Heavy dependencies: browser-use (+ Playwright, LLM adapters).
+# Declared here, imported on the first web action — not at import time.
+# Paths differ across browser-use versions, so each has several candidates.
 # ───────────────────────────────────────────────────────────
-_IMPORT_TRACE = []
+_BROWSER_USE_HINT = "pip install -U browser-use playwright\n  python -m playwright install chromium"
 
-# Agent
-_Agent, tr = _first_present([
+_AGENT = HeavyDependency("browser_use Agent", [
     "browser_use.Agent",
     "browser_use.agent.Agent",
     "browser_use.agent.agent.Agent",
-])
-_IMPORT_TRACE += tr
+], hint=_BROWSER_USE_HINT)
 
-# Browser
-_Browser, tr = _first_present([
+_BROWSER = HeavyDependency("browser_use Browser", [
     "browser_use.Browser",
     "browser_use.browser.Browser",
     "browser_use.browser.browser.Browser",
-])
-_IMPORT_TRACE += tr
+], hint=_BROWSER_USE_HINT)
 
 # BrowserConfig (legacy/new, optional)
-_BrowserConfig, tr = _first_present([
+_BROWSER_CONFIG = HeavyDependency("browser_use BrowserConfig", [
     "browser_use.BrowserConfig",
     "browser_use.browser.BrowserConfig",
     "browser_use.browser.browser.BrowserConfig",
-])
-_IMPORT_TRACE += tr
+], optional=True)
 
 # BrowserProfile (compat layer in some versions)
-_BrowserProfile, tr = _first_present([
+_BROWSER_PROFILE = HeavyDependency("browser_use BrowserProfile", [
     "browser_use.BrowserProfile",
     "browser_use.browser.BrowserProfile",
-])
-_IMPORT_TRACE += tr
+], optional=True)
 
-# Ollama chat adapter (name & path differ by version)
-_ChatOllama, tr = _first_present([
+# Ollama chat adapter (name & path differ by version), OpenAI adapter as fallback
+_CHAT_LLM = HeavyDependency("browser_use LLM adapter", [
     "browser_use.ChatOllama",
     "browser_use.llm.ollama.ChatOllama",
     "browser_use.llms.ollama.ChatOllama",
     "browser_use.llms.ollama.Ollama",
-])
-_IMPORT_TRACE += tr
-
-if _ChatOllama is None:
-    # Fallback to OpenAI adapter
-    _ChatOllama, tr2 = _first_present([
-        "browser_use.llm.openai.ChatOpenAI",
-        "browser_use.llms.openai.ChatOpenAI",
-    ])
-    _IMPORT_TRACE += tr2
-
-# Final check (BrowserConfig optional)
-if not (_Agent and _Browser and _ChatOllama):
-    trace = "\n  ".join(_IMPORT_TRACE)
-    raise RuntimeError(
-        "browser_use import mismatch: missing required core classes (Agent/Browser/LLM).\n"
-        "Fix:\n"
-        "  pip install -U browser-use playwright\n"
-        "  python -m playwright install chromium\n\n"
-        f"Import attempts:\n  {trace}"
-    )
+    "browser_use.llm.openai.ChatOpenAI",
+    "browser_use.llms.openai.ChatOpenAI",
+], hint=_BROWSER_USE_HINT)
 
-Agent = _Agent
-Browser = _Browser
-BrowserConfig = _BrowserConfig
-BrowserProfile = _BrowserProfile
-ChatOllama = _ChatOllama
+HEAVY_DEPENDENCIES = (_AGENT, _BROWSER, _BROWSER_CONFIG, _BROWSER_PROFILE, _CHAT_LLM)
 
 # ───────────────────────────────────────────────────────────
 # 🌿 Environment & config
@@ -152,8 +110,7 @@ USE_VISION = os.getenv("HALO_WEB_VISION", "0") == "1"
 
 # Downloads directory (explicit so files don't vanish)
 DEFAULT_DL_DIR = os.getenv("HALO_WEB_DOWNLOADS_DIR", str((PROJECT_ROOT / "downloads").resolve()))
-DOWNLOADS_DIR = Path(DEFAULT_DL_DIR)
-DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
+DOWNLOADS_DIR = Path(DEFAULT_DL_DIR)  # created on first browser launch
 
 # Session/profile & misc
 PROXY_SERVER   = os.getenv("HALO_WEB_PROXY", "").strip() or None
@@ -182,13 +139,6 @@ ACTION_WHITELIST: List[str] = [a.strip() for a in os.getenv("HALO_WEB_ACTION_WHI
 ACTION_BLACKLIST: List[str] = [a.strip() for a in os.getenv("HALO_WEB_ACTION_BLACKLIST", DEFAULT_BLACKLIST).split(",") if a.strip()]
 MAX_RESULT_LINKS = int(os.getenv("HALO_WEB_MAX_RESULT_LINKS", "10"))
 
-# On Windows, Playwright + asyncio behaves best with Proactor
-if os.name == "nt":
-    try:
-        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())  # type: ignore[attr-defined]
-    except Exception:
-        pass
-
 # ───────────────────────────────────────────────────────────
 # 🔧 Helpers
 # ───────────────────────────────────────────────────────────
@@ -250,18 +200,25 @@ def _build_llm_loop_task(user_task: str, force_search_open: str = "") -> str:
         + "Constraints:\n- " + "\n- ".join(constraints)
     )
 
-async def _browser_task(task_text: str) -> str:
+def _build_llm():
+    """LLM adapter for the agent (support both constructor signatures)."""
+    ChatOllama = _CHAT_LLM.resolve()
+    try:
+        return ChatOllama(model=OLLAMA_MODEL, base_url=OLLAMA_URL)
+    except TypeError:
+        return ChatOllama(model=OLLAMA_MODEL)
+
+def _build_browser():
     """
-    Core runner for browser-use Agent.
-    Returns a final result string for logging only.
+    Construct the shared Browser (runs on the web session loop).
+    keep_alive=True goes to every constructor that takes it so agents don't close the shared browser.
     """
-    _log(f"Launching agent: headless={HEADLESS}, model={OLLAMA_MODEL}, base={OLLAMA_URL}, vision={USE_VISION}")
+    _log(f"Launching browser: headless={HEADLESS}, model={OLLAMA_MODEL}, base={OLLAMA_URL}, vision={USE_VISION}")
 
-    # LLM init (support both signatures)
-    try:
-        llm = ChatOllama(model=OLLAMA_MODEL, base_url=OLLAMA_URL)
-    except TypeError:
-        llm = ChatOllama(model=OLLAMA_MODEL)
+    Browser = _BROWSER.resolve()
+    BrowserConfig = _BROWSER_CONFIG.resolve()
+    BrowserProfile = _BROWSER_PROFILE.resolve()
+    DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
 
     # Build Browser with max compatibility
     browser = None
@@ -269,7 +226,7 @@ async def _browser_task(task_text: str) -> str:
     # Preferred: BrowserConfig if available
     if BrowserConfig is not None:
         try:
-            kwargs = dict(headless=HEADLESS)
+            kwargs = dict(headless=HEADLESS, keep_alive=True)
             # Downloads / acceptance
             try:
                 kwargs["downloads_path"] = str(DOWNLOADS_DIR)
@@ -338,18 +295,26 @@ async def _browser_task(task_text: str) -> str:
     if browser is None:
         # Newer versions: direct kwargs on Browser
         try:
-            browser = Browser(headless=HEADLESS)
+            browser = Browser(headless=HEADLESS, keep_alive=True)
         except TypeError:
             # Legacy fallback via BrowserProfile
             if BrowserProfile is not None:
                 try:
-                    profile = BrowserProfile(headless=HEADLESS)
+                    profile = BrowserProfile(headless=HEADLESS, keep_alive=True)
                     browser = Browser(browser_profile=profile)
                 except Exception:
                     browser = Browser()
             else:
                 browser = Browser()
 
+    return browser
+
+async def _browser_task(task_text: str, browser, llm, budget_s: float = BUDGET_S) -> str:
+    """
+    Core runner for browser-use Agent on the shared browser.
+    Returns a final result string for logging only.
+    """
+    Agent = _AGENT.resolve()
     agent = Agent(
         task=task_text,
         llm=llm,
@@ -359,35 +324,134 @@ async def _browser_task(task_text: str) -> str:
         max_steps=AGENT_MAX_STEPS,
     )
 
-    _log(f"Agent task: {task_text}")
-    history = await agent.run()
+    # Send only changed DOM subtrees on steps that stay on the same page
+    differ = DomDiffer() if DOM_DIFF_ENABLED and not USE_VISION else None
+    if differ is not None and not install_dom_diff(agent, differ):
+        _log("DOM diffing not supported by this browser-use version; sending full snapshots")
+        differ = None
 
+    # Per-step timing/actions/tokens, loop detection and the wall-clock budget
+    monitor = AgentMonitor(budget_s, fingerprint=(lambda: differ.last_digest) if differ is not None else None)
+
+    _log(f"Agent task: {task_text} (budget {budget_s:g}s)")
+    history = None
     try:
-        result = history.final_result()
-    except Exception:
-        result = "done"
+        try:
+            run = agent.run(on_step_start=monitor.on_step_start, on_step_end=monitor.on_step_end)
+        except TypeError:
+            _log("Agent.run() has no step hooks in this browser-use version; budget only")
+            run = agent.run()
+        history = await asyncio.wait_for(run, timeout=monitor.hard_timeout)
+    except asyncio.TimeoutError:
+        monitor.stop_reason = monitor.stop_reason or f"hard timeout after {monitor.hard_timeout:g}s"
+        print(f"[WEB] Agent {monitor.stop_reason}")
+        if monitor.best_result() is None:
+            raise TimeoutError(f"web task exceeded its {budget_s:g}s budget")
+    finally:
+        _report_steps(monitor)
+        if differ is not None and differ.steps:
+            _report_dom_tokens(differ)
+
+    result = None
+    if history is not None:
+        try:
+            result = history.final_result()
+        except Exception:
+            result = "done"
+    if not result and monitor.stop_reason:
+        result = monitor.best_result() or result  # stopped early: keep what it found so far
+    urls = [s.url for s in monitor.steps if s.url]
+    if history is not None:
+        try:
+            urls = list(history.urls())
+        except Exception:
+            pass
+    urls = [u for u in urls if u and u.startswith(("http://", "https://"))]
+    if urls:
+        _session().current_url = urls[-1]
 
     _log(f"Agent final_result: {result}")
-    return result
+    return result if result is not None else "done"
+
+def _report_steps(monitor: AgentMonitor):
+    for step in monitor.steps:
+        actions = ", ".join(step.actions) or "(none)"
+        _log(f"  step {step.step}: {step.duration_s:.1f}s tokens={step.tokens} url={step.url} actions={actions}")
+    s = monitor.summary()
+    if s["steps"]:
+        stopped = f", stopped: {s['stop_reason']}" if s["stop_reason"] else ""
+        print(f"[WEB] Agent ran {s['steps']} steps in {s['elapsed_s']}s "
+              f"(slowest: step {s['slowest_step']} at {s['slowest_s']}s{stopped})")
+
+def _report_dom_tokens(differ: DomDiffer):
+    for step in differ.steps:
+        _log(f"  step {step['step']}: DOM {step['mode']:<4} ~{step['full_tokens']} -> ~{step['sent_tokens']} tokens")
+    t = differ.totals()
+    print(f"[WEB] DOM tokens over {t['steps']} steps: ~{t['full_tokens']} full -> ~{t['sent_tokens']} sent "
+          f"({t['saved_pct']}% saved, {t['diff_steps']} diffed)")
+
+def _session():
+    return get_web_session(launch=_build_browser, make_llm=_build_llm)
 
 def _run_async_task(task_text: str) -> str:
     """
-    Safe async runner that works whether an event loop exists or not.
+    Run an agent task on the long-lived web session (warm browser, same page
+    as the previous command). Blocks the calling executor thread until done.
     """
+    job = current_job()
+    budget_s = action_budget(job.action if job is not None else None)
+    return _session().run(lambda browser, llm: _browser_task(task_text, browser, llm, budget_s),
+                          timeout=max(TASK_TIMEOUT_S, budget_s + BUDGET_GRACE_S + 10))
+
+# ───────────────────────────────────────────────────────────
+# 📄 Page cache fast paths (plain HTTP; the agent only when a page needs it)
+# ───────────────────────────────────────────────────────────
+# Below this much visible text the page is probably JS-rendered / behind a login
+MIN_STATIC_TEXT = int(os.getenv("HALO_WEB_MIN_STATIC_TEXT", "200"))
+# Upper bound on text fed to map-reduce summarization (long pages are chunked, not truncated)
+SUMMARY_INPUT_CHARS = int(os.getenv("HALO_WEB_SUMMARY_CHARS", "120000"))
+
+def _looks_like_url(text: str) -> bool:
+    return bool(re.match(r"^(https?://)?[\w-]+(\.[\w-]+)+(/\S*)?$", text.strip()))
+
+def _page_url(target: str) -> Optional[str]:
+    """URL to act on: the target itself if it's a URL, else the page the agent is on."""
+    if target and _looks_like_url(target):
+        return target if target.lower().startswith(("http://", "https://")) else "https://" + target
+    session = WebSession.current()
+    return session.current_url if session is not None else None
+
+def _cached_page(url: Optional[str]):
+    """Fetch through the page cache; None if it's not usable as a static page."""
+    if not url:
+        return None
+    from .page_cache import get_page_cache
     try:
-        return asyncio.run(_browser_task(task_text))
-    except RuntimeError:
-        _log("Existing event loop detected; creating a new loop for browser task.")
-        loop = asyncio.new_event_loop()
-        try:
-            asyncio.set_event_loop(loop)
-            return loop.run_until_complete(_browser_task(task_text))
-        finally:
-            loop.close()
+        page = get_page_cache().fetch(url)
+    except Exception as e:
+        _log(f"Static fetch of {url} failed: {e}")
+        return None
+    _log(f"Page {page.url}: {page.source}, {len(page.text)} chars")
+    return page if len(page.text) >= MIN_STATIC_TEXT else None
+
+def _summarize_text(page) -> str:
+    """3 bullets for a cached page: chunked map-reduce, partials memoized per chunk hash."""
+    from halo_core.llm.local_llm import LocalLLM
+    from .page_cache import get_page_cache
+    from .summarize import Summarizer
+    llm = LocalLLM(model=OLLAMA_MODEL, api_url=OLLAMA_URL.rstrip("/") + "/api/generate")
+    cache = get_page_cache()
+    summarizer = Summarizer(lambda prompt: llm.generate(prompt, raise_errors=True), OLLAMA_MODEL,
+                            memo_get=cache.summary, memo_put=cache.put_summary)
+    summary = summarizer.summarize(page.text[:SUMMARY_INPUT_CHARS], page.title)
+    _log(f"Summary of {page.url}: {summarizer.stats}")
+    return summary
+
 
 # ───────────────────────────────────────────────────────────
 # 🌐 Skills (return None so LLM handles TTS)
 # ───────────────────────────────────────────────────────────
+@requires(*HEAVY_DEPENDENCIES)
 def web_browse(target: Union[str, dict, list, None] = None):
     """
     Primary LLM-in-the-loop web automation.
@@ -409,18 +473,47 @@ def web_browse(target: Union[str, dict, list, None] = None):
 
     return None
 
+# Queries that need a real page (forms, logins, carts, clicks) go straight to the agent
+_INTERACTIVE_HINTS = re.compile(
+    r"\b(log ?in|sign ?in|sign ?up|click|fill|submit|checkout|add to cart|buy|order|book|reserve|"
+    r"download|upload|play|watch|subscribe|comment|post|reply|message)\b", re.I)
+
+def _needs_interaction(query: str) -> bool:
+    return bool(_INTERACTIVE_HINTS.search(query))
+
 def search_web(target: Union[str, dict, list, None] = None):
     """
-    LLM-driven search skill (no deterministic scripting).
-    - Opens DuckDuckGo results
-    - Uses DOM extraction to perceive results
-    - LLM chooses best link and action (navigate/scroll/extract), within the whitelist
+    Search the web.
+    - Fast path: DDG HTML endpoint over HTTP, top results parsed while streaming (no browser/LLM)
+    - Agent path: only when the query needs interaction, or the fast path is empty/blocked
     """
     q = _ensure_text(target).strip()
     if not q:
         _log("search_web with empty query; ignoring.")
         return None
 
+    if not _needs_interaction(q):
+        from .web_search import SearchBlocked, timed_search
+        try:
+            payload = timed_search(q)
+            _log(f"Fast search '{q}': {len(payload['results'])} results in {payload['elapsed_ms']} ms")
+            if payload["results"]:
+                return payload
+        except SearchBlocked:
+            print("[WEB] Search endpoint served a challenge page; falling back to the agent.")
+        except Exception as e:
+            print(f"[WEB] Fast search failed ({e}); falling back to the agent.")
+
+    return _agent_search(q)
+
+@requires(*HEAVY_DEPENDENCIES)
+def _agent_search(q: str):
+    """
+    LLM-driven search (no deterministic scripting).
+    - Opens DuckDuckGo results
+    - Uses DOM extraction to perceive results
+    - LLM chooses best link and action (navigate/scroll/extract), within the whitelist
+    """
     if SEARCH_ENGINE == "ddg":
         search_url = f"Open https://duckduckgo.com/?q={q.replace(' ', '+')}&ia=web first."
     else:
@@ -438,6 +531,7 @@ def search_web(target: Union[str, dict, list, None] = None):
         print(f"[WEB] Task failed: {e}")
     return None
 
+@requires(*HEAVY_DEPENDENCIES)
 def open_webpage(target: Union[str, dict, list, None] = None):
     """
     Opens a specific URL directly via agent (lets agent verify navigation) —
@@ -449,6 +543,9 @@ def open_webpage(target: Union[str, dict, list, None] = None):
         return None
     if not url.lower().startswith(("http://", "https://")):
         url = "https://" + url
+    _session().current_url = url
+    # Prefetch in the background so extract/summarize follow-ups are served from the cache
+    threading.Thread(target=_cached_page, args=(url,), name="halo-web-prefetch", daemon=True).start()
     task = f"Open {url} first. Then use the perceive→decide→act loop to achieve a minimal summary of the page purpose and main CTA."
     full_task = _build_llm_loop_task(task)
     try:
@@ -458,6 +555,7 @@ def open_webpage(target: Union[str, dict, list, None] = None):
         print(f"[WEB] Task failed: {e}")
     return None
 
+@requires(*HEAVY_DEPENDENCIES)
 def click_element(target: Union[str, dict, list, None] = None):
     """
     Click an element specified by a selector/description —
@@ -483,9 +581,25 @@ def click_element(target: Union[str, dict, list, None] = None):
 def extract_text(target: Union[str, dict, list, None] = None):
     """
     Extract visible text from a selector (defaults to body).
-    Logs the result via history.final_result().
+    Whole-page extraction of a URL / the current page comes from the page cache;
+    specific selectors still go through the agent.
     """
     sel = _ensure_text(target).strip() or "body"
+    if sel in ("body", "page", "html") or _looks_like_url(sel):
+        page = _cached_page(_page_url("" if sel in ("body", "page", "html") else sel))
+        if page is not None:
+            words = len(page.text.split())
+            return {
+                "url": page.final_url,
+                "title": page.title,
+                "text": page.text,
+                "cache": page.source,
+                "summary": f"Got {words} words from {page.title or page.final_url}.",
+            }
+    return _agent_extract_text(sel)
+
+@requires(*HEAVY_DEPENDENCIES)
+def _agent_extract_text(sel: str):
     task = f"Extract visible text from: {sel}. If too long, summarize key points for the user."
     full_task = _build_llm_loop_task(task)
     try:
@@ -497,8 +611,25 @@ def extract_text(target: Union[str, dict, list, None] = None):
 
 def summarize_page(target: Union[str, dict, list, None] = None):
     """
-    Summarize the current page briefly.
+    Summarize the current page (or a given URL) briefly.
+    Static pages: cached fetch + memoized summary per content hash and model.
     """
+    page = _cached_page(_page_url(_ensure_text(target).strip()))
+    if page is not None:
+        from .page_cache import get_page_cache
+        from .summarize import SummaryError
+        try:
+            summary = get_page_cache().summarize(page, OLLAMA_MODEL, _summarize_text)
+        except SummaryError as e:
+            _log(f"Summary of {page.url} failed: {e}")
+            return {"url": page.final_url, "title": page.title, "error": str(e),
+                    "summary": "(...ugh, my brain froze halfway through that page. Try again?)"}
+        if summary:
+            return {"url": page.final_url, "title": page.title, "summary": summary}
+    return _agent_summarize_page()
+
+@requires(*HEAVY_DEPENDENCIES)
+def _agent_summarize_page():
     task = "Summarize the current page in 3 bullet points."
     full_task = _build_llm_loop_task(task)
     try:
@@ -508,9 +639,103 @@ def summarize_page(target: Union[str, dict, list, None] = None):
         print(f"[WEB] Task failed: {e}")
     return None
 
+# ───────────────────────────────────────────────────────────
+# 🔬 Research mode: top-K pages in parallel, merged into one answer
+# ───────────────────────────────────────────────────────────
+def _research_fetch(url: str, timeout: float):
+    from .page_cache import get_page_cache
+    page = get_page_cache().fetch(url, timeout=timeout)
+    return page.final_url, page.title, page.text, page.source
+
+async def _playwright_browser(browser):
+    """The underlying Playwright Browser of a browser-use Browser (attribute names vary by version)."""
+    for name in ("playwright_browser", "_playwright_browser"):
+        pw = getattr(browser, name, None)
+        if pw is not None:
+            return pw
+    getter = getattr(browser, "get_playwright_browser", None)
+    return await getter() if callable(getter) else None
+
+async def _render_in_tabs(urls: List[str], browser, timeout_s: float, concurrency: int):
+    """Open `urls` in isolated contexts (or tabs) of the shared browser, a few at a time."""
+    pw = await _playwright_browser(browser)
+    shared = getattr(browser, "browser_context", None) or getattr(browser, "context", None)
+    if pw is None and shared is None:
+        raise RuntimeError("no Playwright browser/context exposed by this browser-use version")
+    gate = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(url: str):
+        async with gate:
+            context = await pw.new_context() if pw is not None else None
+            page = await (context or shared).new_page()
+            try:
+                await asyncio.wait_for(page.goto(url, wait_until="domcontentloaded"), timeout_s)
+                return url, await page.title(), await page.inner_text("body")
+            finally:
+                await (context.close() if context is not None else page.close())
+
+    rendered = {}
+    for outcome in await asyncio.gather(*(one(u) for u in urls), return_exceptions=True):
+        if isinstance(outcome, BaseException):
+            _log(f"Tab render failed: {outcome}")
+        else:
+            url, title, text = outcome
+            rendered[url] = (title, " ".join(text.split()))
+    return rendered
+
+def _research_render(urls: List[str], timeout_s: float):
+    from .research import RESEARCH_CONCURRENCY
+    return _session().run(lambda browser, llm: _render_in_tabs(urls, browser, timeout_s, RESEARCH_CONCURRENCY),
+                          timeout=timeout_s * len(urls) + 30)
+
+def research_web(target: Union[str, dict, list, None] = None):
+    """
+    Research a question across several pages at once ("compare X and Y").
+    Top results are read in parallel (HTTP first, browser tabs for JS-only pages),
+    then merged into one short answer with numbered sources.
+    """
+    q = _ensure_text(target).strip()
+    if not q:
+        _log("research_web with empty query; ignoring.")
+        return None
+
+    from halo_core.llm.local_llm import LocalLLM
+    from .research import merge_prompt, research
+    from .web_search import search
+
+    render = _research_render if _BROWSER.available() and _CHAT_LLM.available() else None
+    result = research(q, lambda query, n: search(query, n=n), _research_fetch, render)
+    pages = result.usable
+    print(f"[WEB] Research '{q}': {len(pages)}/{len(result.pages)} pages usable in {result.elapsed_s:.2f}s")
+    for p in result.pages:
+        _log(f"  {p.url}: {p.source or '-'} {p.elapsed_s:.2f}s {p.error or str(len(p.text)) + ' chars'}")
+    if not pages:
+        return {"query": q, "sources": [], "summary": f"Hmph, I couldn't read any pages about '{q}'."}
+
+    report_progress(f"comparing {len(pages)} sources")
+    llm = LocalLLM(model=OLLAMA_MODEL, api_url=OLLAMA_URL.rstrip("/") + "/api/generate")
+    try:
+        answer = llm.generate(merge_prompt(q, pages), raise_errors=True)
+    except Exception as e:
+        _log(f"Research merge for '{q}' failed: {e}")
+        return {
+            "query": q,
+            "sources": [{"url": p.url, "title": p.title, "source": p.source} for p in pages],
+            "error": f"{type(e).__name__}: {e}",
+            "summary": f"I read {len(pages)} pages, but my brain froze comparing them... Try again?",
+        }
+    return {
+        "query": q,
+        "sources": [{"url": p.url, "title": p.title, "source": p.source} for p in pages],
+        "failed": [{"url": p.url, "error": p.error} for p in result.pages if p.error],
+        "elapsed_ms": round(result.elapsed_s * 1000, 1),
+        "summary": answer,
+    }
+
 # ───────────────────────────────────────────────────────────
 # 🎯 Convenience: Amazon orders (LLM decides next)
 # ───────────────────────────────────────────────────────────
+@requires(*HEAVY_DEPENDENCIES)
 def amazon_next_delivery():
     """
     Open Amazon Orders (order history). Requires persistent Opera GX/Chromium
@@ -0,0 +1,193 @@
+# halo_core/skills/web_search.py
+"""
+Direct HTTP search: DuckDuckGo's HTML endpoint over a pooled requests.Session,
+parsed incrementally with html.parser while the body streams in. Reading stops
+as soon as the top-N result cards are complete, so a lookup is one round trip
+and no browser/LLM — search_web only falls back to the agent when the task
+needs interaction or this path comes back empty/blocked.
+
+HALO_WEB_SEARCH_URL overrides the endpoint (tests point it at a local stub).
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urljoin, urlparse
+
+SEARCH_URL = os.getenv("HALO_WEB_SEARCH_URL", "https://html.duckduckgo.com/html/")
+SEARCH_TIMEOUT_S = float(os.getenv("HALO_WEB_SEARCH_TIMEOUT", "4"))
+SEARCH_RESULTS = int(os.getenv("HALO_WEB_SEARCH_RESULTS", "5"))
+SEARCH_REGION = os.getenv("HALO_WEB_SEARCH_REGION", "").strip()   # e.g. "us-en"
+USER_AGENT = os.getenv("HALO_WEB_USER_AGENT", "").strip() or (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0 Safari/537.36"
+)
+CHUNK_SIZE = 8192
+
+
+class SearchBlocked(RuntimeError):
+    """The endpoint answered with a CAPTCHA/anomaly page instead of results."""
+
+
+@dataclass
+class SearchResult:
+    title: str
+    url: str
+    snippet: str = ""
+
+    @property
+    def domain(self) -> str:
+        host = urlparse(self.url).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _resolve_href(href: str, base: str) -> str:
+    """DDG wraps targets as //duckduckgo.com/l/?uddg=<url>; unwrap, else absolutize."""
+    href = href.strip()
+    parsed = urlparse(href)
+    if parsed.path.endswith("/l/") or parsed.path == "/l":
+        target = parse_qs(parsed.query).get("uddg")
+        if target:
+            return target[0]
+    if href.startswith("//"):
+        return "https:" + href
+    return urljoin(base, href)
+
+
+class DDGResultParser(HTMLParser):
+    """Streams result cards out of the DDG HTML page; `complete` counts finished cards."""
+
+    def __init__(self, base_url: str = SEARCH_URL):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.results: List[SearchResult] = []
+        self.complete = 0
+        self.blocked = False
+        self._in_ad = False
+        self._field: Optional[str] = None   # "title" | "snippet"
+        self._field_tag = ""
+        self._depth = 0
+        self._buf: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs):
+        if self._field is not None:
+            if tag == self._field_tag:
+                self._depth += 1
+            return
+        a = dict(attrs)
+        classes = (a.get("class") or "").split()
+        if tag == "div" and "result" in classes:
+            self._finish_card()
+            self._in_ad = "result--ad" in classes
+        elif "anomaly-modal" in " ".join(classes) or (tag == "form" and "challenge" in (a.get("id") or "")):
+            self.blocked = True
+        elif self._in_ad:
+            return
+        elif tag == "a" and "result__a" in classes and a.get("href"):
+            self._finish_card()
+            self.results.append(SearchResult(title="", url=_resolve_href(a["href"], self.base_url)))
+            self._start("title", tag)
+        elif "result__snippet" in classes and self.results and not self.results[-1].snippet:
+            self._start("snippet", tag)
+
+    def handle_endtag(self, tag: str):
+        if self._field is None or tag != self._field_tag:
+            return
+        if self._depth:
+            self._depth -= 1
+            return
+        text = _clean("".join(self._buf))
+        if self._field == "title":
+            self.results[-1].title = text
+        else:
+            self.results[-1].snippet = text
+            self.complete = len(self.results)
+        self._field = None
+
+    def handle_data(self, data: str):
+        if self._field is not None:
+            self._buf.append(data)
+
+    def close(self):
+        super().close()
+        self._finish_card()
+        self.results = [r for r in self.results if r.title and r.url]
+
+    def _start(self, field: str, tag: str):
+        self._field, self._field_tag, self._depth, self._buf = field, tag, 0, []
+
+    def _finish_card(self):
+        # a card without a snippet is still complete once the next one starts
+        if self.results and self.results[-1].title:
+            self.complete = len(self.results)
+
+
+_local = threading.local()
+
+
+def _http():
+    """Per-thread pooled session (keep-alive, one retry on connect errors only)."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        session = requests.Session()
+        # An int max_retries would also retry read timeouts, doubling a slow GET's worst case.
+        # read=False re-raises the first read error as-is, so callers still see requests.ReadTimeout.
+        retry = Retry(total=1, connect=1, read=False, status=0)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.8"})
+        _local.session = session
+    return session
+
+
+def search(query: str, n: int = SEARCH_RESULTS, timeout: float = SEARCH_TIMEOUT_S,
+           url: Optional[str] = None) -> List[SearchResult]:
+    """Top-n results for `query`. Raises SearchBlocked on a CAPTCHA page, requests errors on I/O failure."""
+    url = url or SEARCH_URL
+    params = {"q": query}
+    if SEARCH_REGION:
+        params["kl"] = SEARCH_REGION
+    parser = DDGResultParser(base_url=url)
+    with _http().get(url, params=params, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        resp.encoding = resp.encoding or "utf-8"
+        for chunk in resp.iter_content(chunk_size=CHUNK_SIZE, decode_unicode=True):
+            parser.feed(chunk)
+            if parser.complete >= n or parser.blocked:
+                break  # don't read (or parse) the rest of the page
+    parser.close()
+    if parser.blocked and not parser.results:
+        raise SearchBlocked("search endpoint returned a challenge page")
+    return parser.results[:n]
+
+
+def results_payload(query: str, results: List[SearchResult], elapsed: float) -> Dict[str, Any]:
+    """Skill return value: records for the LLM/logs plus a short spoken summary."""
+    if results:
+        top = "; ".join(f"{i}) {r.title} ({r.domain})" for i, r in enumerate(results[:3], 1))
+        summary = f"Top results for '{query}': {top}."
+    else:
+        summary = f"Hmph, nothing came up for '{query}'."
+    return {
+        "query": query,
+        "results": [asdict(r) for r in results],
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "summary": summary,
+    }
+
+
+def timed_search(query: str, n: int = SEARCH_RESULTS) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    results = search(query, n=n)
+    return results_payload(query, results, time.perf_counter() - t0)
@@ -0,0 +1,222 @@
+# halo_core/skills/web_session.py
+"""
+Long-lived browser session for the web skills.
+
+One asyncio loop runs on a daemon thread and owns one warm browser. Skills
+(which run on executor threads) hand it coroutines via run_coroutine_threadsafe,
+so Chromium launches once and "the current page" survives across commands —
+summarize_page / click_element / extract_text act on whatever the previous
+command left open.
+
+The browser is closed after HALO_WEB_IDLE_S seconds without use (0 = never)
+and relaunched on the next command. stats() reports launches, reuses and the
+launch time saved by reusing the warm browser.
+
+This module doesn't import browser-use; web.py supplies the launch/LLM
+factories, so importing it stays cheap.
+"""
+from __future__ import annotations
+import asyncio
+import concurrent.futures
+import inspect
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..tracing import current_trace, get_tracer
+
+IDLE_SHUTDOWN_S = float(os.getenv("HALO_WEB_IDLE_S", "600"))
+TASK_TIMEOUT_S = float(os.getenv("HALO_WEB_TASK_TIMEOUT", "280"))
+
+Factory = Callable[[], Any]  # sync or async; called on the session loop
+
+
+class WebSessionError(RuntimeError):
+    pass
+
+
+async def _maybe_await(value: Any) -> Any:
+    return await value if inspect.isawaitable(value) else value
+
+
+class WebSession:
+    _instance: Optional["WebSession"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, launch: Factory, make_llm: Optional[Factory] = None, idle_s: float = IDLE_SHUTDOWN_S):
+        self._launch = launch
+        self._make_llm = make_llm
+        self.idle_s = idle_s
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._browser: Any = None
+        self._llm: Any = None
+        self._turn: Optional[asyncio.Lock] = None   # one agent drives the page at a time
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self._active = 0
+        self._last_used = time.monotonic()
+        self.current_url: Optional[str] = None  # last page the agent ended on (for "this page" follow-ups)
+        self._stats: Dict[str, float] = {
+            "launches": 0, "reuses": 0, "launch_s_total": 0.0, "idle_closes": 0, "tasks": 0, "failures": 0,
+        }
+
+    @classmethod
+    def get_instance(cls, launch: Optional[Factory] = None, make_llm: Optional[Factory] = None) -> "WebSession":
+        with cls._instance_lock:
+            if cls._instance is None:
+                if launch is None:
+                    raise WebSessionError("web session not configured (no browser launcher)")
+                cls._instance = cls(launch, make_llm)
+            return cls._instance
+
+    @classmethod
+    def current(cls) -> Optional["WebSession"]:
+        """The session if one was ever created (doesn't create one)."""
+        return cls._instance
+
+    # ---------- loop thread ----------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._thread is not None and self._thread.is_alive():
+            return self._loop
+        with self._instance_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._started.clear()
+                self._thread = threading.Thread(target=self._run_loop, name="halo-web", daemon=True)
+                self._thread.start()
+        self._started.wait()
+        return self._loop
+
+    def _run_loop(self):
+        # Playwright needs subprocess support: Proactor on Windows (the default loop elsewhere)
+        loop = asyncio.ProactorEventLoop() if os.name == "nt" else asyncio.new_event_loop()  # type: ignore[attr-defined]
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._turn = asyncio.Lock()
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    # ---------- public API ----------
+    def run(self, make_coro: Callable[[Any, Any], Awaitable[Any]], timeout: float = TASK_TIMEOUT_S) -> Any:
+        """
+        Run make_coro(browser, llm) on the session loop and wait for the result.
+        The browser is launched (or reused) first; the coroutine holds the page
+        exclusively until it finishes.
+        """
+        loop = self._ensure_loop()
+        trace = current_trace()
+        future = asyncio.run_coroutine_threadsafe(self._task(make_coro, trace), loop)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"web task exceeded {timeout:g}s")
+
+    def stats(self) -> Dict[str, float]:
+        out = dict(self._stats)
+        launches = out["launches"]
+        out["avg_launch_s"] = out["launch_s_total"] / launches if launches else 0.0
+        out["saved_s"] = out["reuses"] * out["avg_launch_s"]
+        out["warm"] = self._browser is not None
+        out["idle_for_s"] = time.monotonic() - self._last_used
+        return out
+
+    def close_browser(self, timeout: float = 15.0):
+        """Close the warm browser now (it relaunches on the next task)."""
+        if self._loop is None or not self._loop.is_running():
+            return
+        fut = asyncio.run_coroutine_threadsafe(self._close_browser(), self._loop)
+        try:
+            fut.result(timeout=timeout)
+        except Exception as e:
+            print(f"[WEB] browser close failed: {e}")
+
+    def shutdown(self, timeout: float = 15.0):
+        """Close the browser and stop the loop thread."""
+        self.close_browser(timeout)
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    # ---------- loop-side ----------
+    async def _task(self, make_coro: Callable[[Any, Any], Awaitable[Any]], trace: Any) -> Any:
+        with get_tracer().trace(trace):
+            async with self._turn:
+                self._active += 1
+                self._cancel_idle_timer()
+                try:
+                    browser = await self._get_browser()
+                    llm = await self._get_llm()
+                    self._stats["tasks"] += 1
+                    return await make_coro(browser, llm)
+                except Exception:
+                    self._stats["failures"] += 1
+                    raise
+                finally:
+                    self._active -= 1
+                    self._last_used = time.monotonic()
+                    self._arm_idle_timer()
+
+    async def _get_browser(self) -> Any:
+        if self._browser is not None:
+            self._stats["reuses"] += 1
+            avg = self._stats["launch_s_total"] / max(1, self._stats["launches"])
+            print(f"[WEB] Reusing warm browser (saved ~{avg:.1f}s; {self._stats['reuses']:.0f} reuses)")
+            return self._browser
+        t0 = time.perf_counter()
+        with get_tracer().span("web.launch"):
+            browser = await _maybe_await(self._launch())
+            starter = getattr(browser, "start", None)
+            if callable(starter):
+                await _maybe_await(starter())
+        elapsed = time.perf_counter() - t0
+        self._browser = browser
+        self._stats["launches"] += 1
+        self._stats["launch_s_total"] += elapsed
+        print(f"[WEB] Browser launched in {elapsed:.2f}s (launch #{self._stats['launches']:.0f})")
+        return browser
+
+    async def _get_llm(self) -> Any:
+        if self._llm is None and self._make_llm is not None:
+            self._llm = await _maybe_await(self._make_llm())
+        return self._llm
+
+    async def _close_browser(self):
+        self._cancel_idle_timer()
+        browser, self._browser = self._browser, None
+        if browser is None:
+            return
+        for name in ("close", "kill", "stop"):
+            closer = getattr(browser, name, None)
+            if callable(closer):
+                try:
+                    await _maybe_await(closer())
+                except Exception as e:
+                    print(f"[WEB] browser.{name}() failed: {e}")
+                break
+
+    def _arm_idle_timer(self):
+        if self.idle_s > 0 and self._browser is not None:
+            self._idle_handle = self._loop.call_later(self.idle_s, self._on_idle)
+
+    def _cancel_idle_timer(self):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    def _on_idle(self):
+        self._idle_handle = None
+        if self._active == 0 and self._browser is not None:
+            self._stats["idle_closes"] += 1
+            print(f"[WEB] Browser idle for {self.idle_s:g}s; closing it")
+            self._loop.create_task(self._close_browser())
+
+
+def get_web_session(launch: Optional[Factory] = None, make_llm: Optional[Factory] = None) -> WebSession:
+    return WebSession.get_instance(launch, make_llm)
@@ -0,0 +1,140 @@
+# halo_core/startup.py
+"""
+Parallel subsystem initialization.
+
+Each subsystem (wake word, STT, TTS, LLM, ...) is registered with a factory and
+optional warm-up. Every factory starts at once on its own init thread (a
+fixed-size pool would queue the components registered past its size behind
+slow model loads); the voice loop only blocks on what it needs right now (the
+wake word engine), and any stage that runs before its component is ready blocks
+on that component's readiness future instead of on the whole init phase.
+
+shutdown() cancels the readiness futures that are still pending, so nothing
+waiting on a half-built component hangs past shutdown.
+
+`timeline()` / `report()` describe when each component started and became ready,
+relative to the start of the init phase.
+"""
+from __future__ import annotations
+import concurrent.futures
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from halo_core.tracing import get_tracer
+
+
+@dataclass
+class Component:
+    name: str
+    factory: Callable[[], Any]
+    warm_up: Optional[Callable[[Any], Any]] = None
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future)
+    started: Optional[float] = None
+    built: Optional[float] = None
+    ready: Optional[float] = None
+    error: Optional[BaseException] = None
+
+
+class Startup:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._components: Dict[str, Component] = {}
+        self._lock = threading.Lock()
+
+    # ---------- public API ----------
+    def add(self, name: str, factory: Callable[[], Any], *,
+            warm_up: Optional[Callable[[Any], Any]] = None) -> concurrent.futures.Future:
+        """
+        Start building `name` in the background. The readiness future resolves to
+        the constructed object once `factory()` and the optional `warm_up(obj)` finish.
+        """
+        comp = Component(name, factory, warm_up)
+        with self._lock:
+            if name in self._components:
+                raise ValueError(f"Component '{name}' registered twice")
+            self._components[name] = comp
+        threading.Thread(target=self._build, args=(comp,), name=f"halo-init-{name}", daemon=True).start()
+        return comp.future
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Block until `name` is ready and return it (re-raises its init error)."""
+        comp = self._components[name]
+        if not comp.future.done():
+            print(f"[Startup] ⏳ waiting for {name}...")
+        return comp.future.result(timeout)
+
+    def is_ready(self, name: str) -> bool:
+        comp = self._components.get(name)
+        return comp is not None and comp.future.done() and not comp.future.cancelled() and comp.error is None
+
+    def wait_all(self, timeout: Optional[float] = None) -> bool:
+        futures = [c.future for c in self._components.values()]
+        done, pending = concurrent.futures.wait(futures, timeout)
+        return not pending
+
+    def timeline(self) -> List[Dict[str, Any]]:
+        """[{name, start_s, built_s, ready_s, status}] ordered by readiness."""
+        rows = []
+        for c in self._components.values():
+            rows.append({
+                "name": c.name,
+                "start_s": self._rel(c.started),
+                "built_s": self._rel(c.built),
+                "ready_s": self._rel(c.ready),
+                "status": self._status(c),
+            })
+        return sorted(rows, key=lambda r: (r["ready_s"] is None, r["ready_s"] or 0.0))
+
+    def report(self) -> str:
+        lines = ["Startup timeline (s since init):"]
+        for r in self.timeline():
+            ready = f"{r['ready_s']:.2f}" if r["ready_s"] is not None else "  -- "
+            built = f"{r['built_s']:.2f}" if r["built_s"] is not None else "  -- "
+            lines.append(f"  {r['name']:<12} start {r['start_s'] or 0.0:5.2f}  "
+                         f"built {built}  ready {ready}  [{r['status']}]")
+        return "\n".join(lines)
+
+    def shutdown(self):
+        """Cancel every readiness future that hasn't resolved (get() then raises CancelledError)."""
+        for c in list(self._components.values()):
+            if c.future.cancel():
+                c.future.set_running_or_notify_cancel()  # wakes concurrent.futures.wait() callers too
+                print(f"[Startup] {c.name} cancelled before it was ready")
+
+    # ---------- internals ----------
+    def _rel(self, t: Optional[float]) -> Optional[float]:
+        return None if t is None else round(t - self.t0, 3)
+
+    @staticmethod
+    def _status(c: Component) -> str:
+        if c.future.cancelled():
+            return "cancelled"
+        if c.error is not None:
+            return "failed"
+        return "ready" if c.future.done() else "pending"
+
+    def _build(self, comp: Component):
+        comp.started = time.perf_counter()
+        try:
+            with get_tracer().span(f"startup.{comp.name}"):
+                obj = comp.factory()
+                comp.built = time.perf_counter()
+                if comp.warm_up is not None:
+                    comp.warm_up(obj)
+        except BaseException as e:
+            comp.error = e
+            comp.ready = time.perf_counter()
+            self._resolve(comp.future.set_exception, e)
+            print(f"[Startup] ❌ {comp.name} failed: {e}")
+            return
+        comp.ready = time.perf_counter()
+        self._resolve(comp.future.set_result, obj)
+
+    @staticmethod
+    def _resolve(setter: Callable[[Any], None], value: Any):
+        try:
+            setter(value)
+        except concurrent.futures.InvalidStateError:
+            pass  # cancelled by shutdown() while this component was still building
@@ -0,0 +1,280 @@
+# halo_core/tracing.py
+"""
+Per-command latency tracing.
+
+Every stage of a command records a Span (wake, record, stt, llm, skill.<action>,
+tts.synth, tts.playback, ...). Spans carry the command id as their trace id plus
+free-form attributes (audio length, token counts, action names). Completed spans
+feed rolling per-name windows that answer p50/p95/p99 on demand, and a background
+flusher appends them to a JSONL file and rewrites a Prometheus text file.
+
+Recording a span is a deque append under a lock; all file I/O happens on the
+flusher thread, so the voice path never waits on disk.
+
+Env knobs:
+  HALO_TRACE              1 = on, 0 = off                     (default: 1)
+  HALO_TRACE_DIR          output directory                    (default: <project>/logs)
+  HALO_TRACE_WINDOW       samples kept per span name          (default: 500)
+  HALO_TRACE_FLUSH_S      flush interval, seconds             (default: 2)
+  HALO_TRACE_PROM_PORT    serve /metrics on this port, 0=off  (default: 0)
+"""
+from __future__ import annotations
+import collections
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+TRACE_ENABLED = os.getenv("HALO_TRACE", "1") != "0"
+TRACE_DIR = Path(os.getenv("HALO_TRACE_DIR", str(PROJECT_ROOT / "logs")))
+TRACE_WINDOW = int(os.getenv("HALO_TRACE_WINDOW", "500"))
+FLUSH_INTERVAL = float(os.getenv("HALO_TRACE_FLUSH_S", "2"))
+PROM_PORT = int(os.getenv("HALO_TRACE_PROM_PORT", "0"))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current_trace: contextvars.ContextVar[Optional[Any]] = contextvars.ContextVar("halo_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("halo_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace", "start", "duration", "attrs", "_t0")
+
+    def __init__(self, name: str, trace: Any = None, **attrs: Any):
+        self.name = name
+        self.trace = trace
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.attrs: Dict[str, Any] = attrs
+        self._t0 = time.perf_counter()
+
+    def set(self, **attrs: Any) -> "Span":
+        self.attrs.update(attrs)
+        return self
+
+    def finish(self) -> "Span":
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._t0
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace": self.trace,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round((self.duration or 0.0) * 1000.0, 3),
+            "attrs": self.attrs,
+        }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Tracer:
+    _instance: Optional["Tracer"] = None
+
+    def __init__(self, enabled: bool = TRACE_ENABLED, window: int = TRACE_WINDOW,
+                 out_dir: Optional[Path] = TRACE_DIR, flush_interval: float = FLUSH_INTERVAL):
+        self.enabled = enabled
+        self.window = max(1, window)
+        self.out_dir = Path(out_dir) if out_dir else None
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = collections.Counter()
+        self._sums: Dict[str, float] = collections.defaultdict(float)
+        self._pending: List[Span] = []
+        self._recent: Deque[Span] = collections.deque(maxlen=200)
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._server = None
+
+    # ---------- public API ----------
+    @classmethod
+    def get_instance(cls) -> "Tracer":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @contextlib.contextmanager
+    def trace(self, trace_id: Any) -> Iterator[None]:
+        """Make `trace_id` the default trace for spans opened in this context."""
+        token = _current_trace.set(trace_id)
+        try:
+            yield
+        finally:
+            _current_trace.reset(token)
+
+    @contextlib.contextmanager
+    def span(self, name: str, trace: Any = None, **attrs: Any) -> Iterator[Span]:
+        """Time the enclosed block as a span; attributes can be added via span.set()."""
+        sp = Span(name, trace if trace is not None else _current_trace.get(), **attrs)
+        token = _current_span.set(sp)
+        try:
+            yield sp
+        except BaseException as e:
+            sp.set(error=type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.record(sp.finish())
+
+    def add(self, name: str, start: float, end: float, trace: Any = None, **attrs: Any) -> Span:
+        """Record a span measured elsewhere (perf_counter start/end)."""
+        sp = Span(name, trace if trace is not None else _current_trace.get(), **attrs)
+        sp.start = time.time() - (time.perf_counter() - start)
+        sp.duration = max(0.0, end - start)
+        self.record(sp)
+        return sp
+
+    def record(self, span: Span):
+        if not self.enabled or span.duration is None:
+            return
+        with self._lock:
+            win = self._windows.get(span.name)
+            if win is None:
+                win = self._windows[span.name] = collections.deque(maxlen=self.window)
+            win.append(span.duration)
+            self._counts[span.name] += 1
+            self._sums[span.name] += span.duration
+            if self.out_dir:
+                self._pending.append(span)
+            self._recent.append(span)
+        self._ensure_flusher()
+
+    def percentiles(self, name: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Rolling {name: {count, mean, p50, p95, p99}} in seconds (one name or all)."""
+        with self._lock:
+            names = [name] if name else list(self._windows)
+            snap = {n: list(self._windows.get(n, ())) for n in names}
+            counts = dict(self._counts)
+        out: Dict[str, Dict[str, float]] = {}
+        for n, values in snap.items():
+            if not values:
+                continue
+            values.sort()
+            stats = {"count": counts.get(n, len(values)), "mean": sum(values) / len(values)}
+            for q in QUANTILES:
+                stats[f"p{int(q * 100)}"] = _percentile(values, q)
+            out[n] = stats
+        return out
+
+    def last(self, name: str, n: int) -> List[float]:
+        """The latest `n` durations (seconds) recorded for span `name`, oldest first."""
+        with self._lock:
+            win = self._windows.get(name)
+            return list(win)[-n:] if win else []
+
+    def recent(self, trace: Any = None) -> List[Span]:
+        """Most recent spans, optionally only those of one trace."""
+        with self._lock:
+            spans = list(self._recent)
+        return [s for s in spans if s.trace == trace] if trace is not None else spans
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# HELP halo_stage_seconds Latency of Halo pipeline stages (rolling window).",
+            "# TYPE halo_stage_seconds summary",
+        ]
+        with self._lock:
+            sums = dict(self._sums)
+        for name, stats in sorted(self.percentiles().items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'halo_stage_seconds{{stage="{label}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'halo_stage_seconds_sum{{stage="{label}"}} {sums.get(name, 0.0):.6f}')
+            lines.append(f'halo_stage_seconds_count{{stage="{label}"}} {int(stats["count"])}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Append pending spans to traces.jsonl and rewrite metrics.prom."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not self.out_dir or not self.enabled:
+            return
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            if pending:
+                with open(self.out_dir / "traces.jsonl", "a", encoding="utf-8") as f:
+                    for sp in pending:
+                        f.write(json.dumps(sp.to_dict(), ensure_ascii=False, default=str) + "\n")
+            tmp = self.out_dir / "metrics.prom.tmp"
+            tmp.write_text(self.prometheus_text(), encoding="utf-8")
+            os.replace(tmp, self.out_dir / "metrics.prom")
+        except OSError as e:
+            print(f"[Trace] ⚠️ Failed to export spans: {e}")
+
+    def serve_prometheus(self, port: int = PROM_PORT, host: str = "127.0.0.1"):
+        """Expose prometheus_text() at http://host:port/metrics on a daemon thread."""
+        if not port or self._server is not None:
+            return self._server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        tracer = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=self._server.serve_forever, name="halo-trace-http", daemon=True).start()
+        print(f"[Trace] 📈 Metrics at http://{host}:{port}/metrics")
+        return self._server
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+    # ---------- internals ----------
+    def _ensure_flusher(self):
+        if self._flusher is not None or not self.out_dir:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="halo-trace-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+def get_tracer() -> Tracer:
+    return Tracer.get_instance()
+
+
+def current_trace() -> Optional[Any]:
+    return _current_trace.get()
+
+
+def annotate(**attrs: Any):
+    """Attach attributes to the innermost open span (no-op outside a span)."""
+    sp = _current_span.get()
+    if sp is not None:
+        sp.set(**attrs)
@@ -1,15 +1,138 @@
 # halo_core/ui/hud.py
 from __future__ import annotations
+import math
+import os
 import sys
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional, Tuple
 
 from PySide6.QtWidgets import (
-    QApplication, QWidget, QLabel, QVBoxLayout, QGraphicsDropShadowEffect
+    QApplication, QWidget, QLabel, QVBoxLayout, QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect
 )
 from PySide6.QtCore import (
-    Qt, QTimer, QEasingCurve, QPropertyAnimation, QPoint, Signal, Slot, QThread
+    Qt, QTimer, QEasingCurve, QPropertyAnimation, QPoint, QRect, QRectF, QSize, Signal, Slot, QThread
 )
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtGui import QFont, QColor, QImage, QKeySequence, QPainter, QPixmap, QShortcut
+
+# Text updates are applied at most once per frame; bursts in between collapse to the latest
+FRAME_MS = max(1, round(1000 / float(os.getenv("HALO_HUD_FPS", "60"))))
+# Performance overlay: shown at startup when HALO_HUD_PERF=1, toggled with HALO_HUD_PERF_KEY
+PERF_PANEL_ON = os.getenv("HALO_HUD_PERF", "0") == "1"
+PERF_PANEL_KEY = os.getenv("HALO_HUD_PERF_KEY", "Ctrl+Shift+P")
+
+CONTENT_WIDTH = 900          # wide enough for long replies
+SHADOW_BLUR = 40
+SHADOW_OFFSET = 10
+SHADOW_MARGIN = 28           # room around the panel for the shadow to fall into
+SHADOW_COLOR = QColor(0, 0, 0, 180)
+CORNER_RADIUS = 16
+
+# autohide_ms value carried by request_set_text for a live stream frame: the UI
+# thread renders the stream's latest buffer instead of the (possibly older) text
+STREAM_FRAME = -1
+
+# Input level meter drawn over the accent bar; hidden once levels stop arriving
+LEVEL_HOLD_MS = 300
+LEVEL_FLOOR_DBFS = -60.0
+LEVEL_CLIP = 0.99
+
+
+class RenderStats:
+    """Counters for what the HUD actually did (read from the UI thread or a snapshot)."""
+
+    __slots__ = ("requests", "coalesced", "updates", "layouts", "frames", "paint_s", "shadow_renders", "levels")
+
+    def __init__(self):
+        self.requests = 0        # set_text calls that reached the UI thread
+        self.coalesced = 0       # requests replaced by a newer one before their frame
+        self.updates = 0         # label updates actually applied
+        self.layouts = 0         # window height recomputations
+        self.frames = 0          # window paint passes
+        self.paint_s = 0.0       # time spent in paintEvent (window + label)
+        self.shadow_renders = 0  # shadow pixmap (re)builds
+        self.levels = 0          # mic level updates applied
+
+    def snapshot(self) -> Dict[str, float]:
+        out = {name: getattr(self, name) for name in self.__slots__}
+        out["avg_paint_ms"] = 1000.0 * self.paint_s / self.frames if self.frames else 0.0
+        return out
+
+
+def render_shadow(size: QSize, radius: int = CORNER_RADIUS, blur: int = SHADOW_BLUR,
+                  margin: int = SHADOW_MARGIN, color: QColor = SHADOW_COLOR) -> QPixmap:
+    """Blurred rounded-rect shadow for a panel of `size`, padded by `margin` on every side."""
+    image = QImage(size.width() + 2 * margin, size.height() + 2 * margin, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    p = QPainter(image)
+    p.setRenderHint(QPainter.Antialiasing)
+    p.setPen(Qt.NoPen)
+    p.setBrush(color)
+    p.drawRoundedRect(margin, margin, size.width(), size.height(), radius, radius)
+    p.end()
+
+    # Blur once through a throwaway scene; the result is reused until the panel resizes
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(image))
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(blur)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+    scene.setSceneRect(QRectF(image.rect()))
+    out = QImage(image.size(), QImage.Format_ARGB32_Premultiplied)
+    out.fill(Qt.transparent)
+    p = QPainter(out)
+    scene.render(p, QRectF(out.rect()), QRectF(image.rect()))
+    p.end()
+    return QPixmap.fromImage(out)
+
+
+class _TimedLabel(QLabel):
+    """QLabel that adds its paint time to the HUD's render stats."""
+
+    def __init__(self, text: str, stats: RenderStats):
+        super().__init__(text)
+        self._stats = stats
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        super().paintEvent(event)
+        self._stats.paint_s += time.perf_counter() - t0
+
+
+class _LevelBar(QWidget):
+    """Mic level drawn over the accent bar: RMS fill grows from the center, peak ticks at the ends."""
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.rms = 0.0
+        self.peak = 0.0
+        self._fill = QColor(255, 255, 255, 200)
+        self._clip = QColor(255, 107, 107)
+
+    @staticmethod
+    def _fraction(level: float) -> float:
+        if level <= 0:
+            return 0.0
+        db = 20.0 * math.log10(level)
+        return min(1.0, max(0.0, 1.0 - db / LEVEL_FLOOR_DBFS))
+
+    def set_level(self, rms: float, peak: float):
+        self.rms, self.peak = rms, peak
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        w, h = self.width(), self.height()
+        mid = w / 2
+        half = self._fraction(self.rms) * mid
+        clipping = self.peak >= LEVEL_CLIP
+        p.fillRect(QRectF(mid - half, 0, 2 * half, h), self._clip if clipping else self._fill)
+        tick = self._fraction(self.peak) * mid
+        p.fillRect(QRectF(mid - tick - 2, 0, 2, h), self._clip if clipping else self._fill)
+        p.fillRect(QRectF(mid + tick, 0, 2, h), self._clip if clipping else self._fill)
+        p.end()
 
 
 class HUD(QWidget):
@@ -18,6 +141,8 @@ class HUD(QWidget):
     # Thread-safe bridge: any thread can emit this; slot runs on UI thread.
     request_set_text = Signal(str, int)
     request_set_accent = Signal(str)
+    request_perf_panel = Signal(bool)
+    request_level = Signal()
 
     def __init__(self):
         super().__init__()
@@ -55,19 +180,20 @@ class HUD(QWidget):
         self.accent.setFixedHeight(4)
         self.accent.setStyleSheet("background-color: #4EA1FF; border-top-left-radius: 16px; border-top-right-radius: 16px;")
 
-        # Shadow
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(40)
-        shadow.setOffset(0, 10)
-        shadow.setColor(QColor(0, 0, 0, 180))
-        self.container.setGraphicsEffect(shadow)
+        self.level_bar = _LevelBar(self.accent)
+        self.level_bar.hide()
+
+        # Shadow: painted by the window from a cached pixmap (see paintEvent), so
+        # text updates don't re-render a live blur effect over the whole panel
+        self.stats = RenderStats()
+        self._shadow: Optional[Tuple[QSize, QPixmap]] = None
 
         # Layout
         self.layout = QVBoxLayout(self.container)
         self.layout.setContentsMargins(20, 18, 20, 18)
         self.layout.setSpacing(10)
 
-        self.label = QLabel("Halo is idle")
+        self.label = _TimedLabel("Halo is idle", self.stats)
         self.label.setAlignment(Qt.AlignCenter)
         self.label.setWordWrap(True)
         font = QFont()
@@ -78,7 +204,8 @@ class HUD(QWidget):
         self.layout.addWidget(self.label)
 
         # Size and position
-        self.setFixedWidth(900)  # wide enough for long replies
+        self.setFixedWidth(CONTENT_WIDTH + 2 * SHADOW_MARGIN)
+        self._lines = self._wrapped_lines(self.label.text())
         self._adjust_height_to_label()
         self._snap_to_top_center()
 
@@ -94,6 +221,27 @@ class HUD(QWidget):
         self._autohide_timer.setSingleShot(True)
         self._autohide_timer.timeout.connect(self.fade_out)
 
+        # Frame gate for text updates
+        self._pending: Optional[Tuple[str, int]] = None
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(FRAME_MS)
+        self._frame_timer.timeout.connect(self._on_frame)
+
+        # Append-only stream (begin_stream / append / end_stream); written from any thread
+        self._stream_lock = threading.Lock()
+        self._stream_parts: Optional[list] = None
+        self._stream_prefix = ""
+        self._stream_queued = False   # a stream frame is already on its way to the UI thread
+
+        # Level meter: latest (rms, peak) from the audio thread; one signal in flight at a time
+        self._level: Tuple[float, float] = (0.0, 0.0)
+        self._level_queued = False
+        self._level_hold = QTimer(self)
+        self._level_hold.setSingleShot(True)
+        self._level_hold.setInterval(LEVEL_HOLD_MS)
+        self._level_hold.timeout.connect(self.level_bar.hide)
+
         # Dragging
         self._drag_pos: Optional[QPoint] = None
 
@@ -103,6 +251,16 @@ class HUD(QWidget):
         # Connect thread-safe bridges
         self.request_set_text.connect(self._set_text_ui)
         self.request_set_accent.connect(self._set_accent_ui)
+        self.request_perf_panel.connect(self._set_perf_panel_ui)
+        self.request_level.connect(self._set_level_ui)
+
+        # Performance overlay (created on first use)
+        self._perf_panel = None
+        self._perf_shortcut = QShortcut(QKeySequence(PERF_PANEL_KEY), self)
+        self._perf_shortcut.setContext(Qt.ApplicationShortcut)
+        self._perf_shortcut.activated.connect(self.toggle_perf_panel)
+        if PERF_PANEL_ON:
+            QTimer.singleShot(0, lambda: self._set_perf_panel_ui(True))
 
     # ---------- public API ----------
     @classmethod
@@ -125,6 +283,64 @@ class HUD(QWidget):
         else:
             self.request_set_accent.emit(color_hex)
 
+    # Streaming text (STT partials, LLM tokens). All three are safe from any thread.
+    def begin_stream(self, prefix: str = "", accent: Optional[str] = None):
+        """Start a live line; appended text shows up at most once per frame."""
+        if accent:
+            self.set_accent(accent)
+        with self._stream_lock:
+            self._stream_parts = []
+            self._stream_prefix = prefix
+            self._stream_queued = True
+        self.set_text(prefix, autohide_ms=STREAM_FRAME)
+
+    def append(self, chunk: str):
+        """Add text to the live line. Appends between frames are batched into one update."""
+        if not chunk:
+            return
+        with self._stream_lock:
+            if self._stream_parts is None:
+                return
+            self._stream_parts.append(chunk)
+            if self._stream_queued:
+                return  # the queued frame will pick this up
+            self._stream_queued = True
+            text = self._stream_prefix + "".join(self._stream_parts)
+        self.set_text(text, autohide_ms=STREAM_FRAME)
+
+    def end_stream(self, final_text: Optional[str] = None, *, autohide_ms: int = 4000):
+        """Finish the live line (optionally replacing it) and re-arm autohide."""
+        with self._stream_lock:
+            if self._stream_parts is None and final_text is None:
+                return
+            text = final_text if final_text is not None else self._stream_prefix + "".join(self._stream_parts or [])
+            self._stream_parts = None
+            self._stream_queued = False
+        self.set_text(text, autohide_ms=autohide_ms)
+
+    @property
+    def streaming(self) -> bool:
+        return self._stream_parts is not None
+
+    def _stream_text(self) -> Optional[str]:
+        """Latest stream text for a frame (None once the stream has ended)."""
+        with self._stream_lock:
+            self._stream_queued = False
+            if self._stream_parts is None:
+                return None
+            return self._stream_prefix + "".join(self._stream_parts)
+
+    def set_level(self, rms: float, peak: float):
+        """Mic level (linear 0..1). Safe from any thread, including the audio callback."""
+        self._level = (rms, peak)
+        if self._level_queued:
+            return  # the queued update reads the newest value
+        self._level_queued = True
+        if QThread.currentThread() == self.thread():
+            self._set_level_ui()
+        else:
+            self.request_level.emit()
+
     # State helpers (no emojis)
     def show_waiting(self):
         self.set_accent("#7A7F8B")
@@ -154,6 +370,16 @@ class HUD(QWidget):
         self.set_accent("#4EA1FF")
         self.set_text("Halo is now listening for your call...", autohide_ms=0)
 
+    def show_perf_panel(self, visible: bool = True):
+        """Safe from any thread."""
+        if QThread.currentThread() == self.thread():
+            self._set_perf_panel_ui(visible)
+        else:
+            self.request_perf_panel.emit(visible)
+
+    def toggle_perf_panel(self):
+        self.show_perf_panel(not (self._perf_panel is not None and self._perf_panel.isVisible()))
+
     def set_click_through(self, enable: bool):
         self._click_through = enable
         if enable:
@@ -167,11 +393,66 @@ class HUD(QWidget):
     # ---------- internal UI-thread slots ----------
     @Slot(str, int)
     def _set_text_ui(self, text: str, autohide_ms: int):
-        self.label.setText(text)
-        self._adjust_height_to_label()
+        self.stats.requests += 1
+        if self._pending is not None:
+            self.stats.coalesced += 1
+            if self._pending[1] == STREAM_FRAME and autohide_ms != STREAM_FRAME:
+                self._stream_text()  # unblock the stream; its next append queues a fresh frame
+        self._pending = (text, autohide_ms)
+        if not self._frame_timer.isActive():
+            # Leading edge: show it now, then hold further updates until the next frame
+            self._flush_text()
+            self._frame_timer.start()
+
+    def _on_frame(self):
+        if self._pending is not None:
+            self._flush_text()
+            self._frame_timer.start()
+
+    def _flush_text(self):
+        text, autohide_ms = self._pending
+        self._pending = None
+        if autohide_ms == STREAM_FRAME:
+            text = self._stream_text()
+            if text is None:
+                return  # stale frame from a stream that already ended
+        self.stats.updates += 1
+        if text != self.label.text():
+            self.label.setText(text)
+            # Only re-measure the window when the wrapped line count changes
+            lines = self._wrapped_lines(text)
+            if lines != self._lines:
+                self._lines = lines
+                self._adjust_height_to_label()
         self.fade_in()
         if autohide_ms > 0:
             self._autohide_timer.start(autohide_ms)
+        else:
+            self._autohide_timer.stop()
+
+    @Slot()
+    def _set_level_ui(self):
+        self._level_queued = False
+        self.stats.levels += 1
+        self.level_bar.set_level(*self._level)
+        if not self.level_bar.isVisible():
+            self.level_bar.show()
+        self._level_hold.start()
+
+    @Slot(bool)
+    def _set_perf_panel_ui(self, visible: bool):
+        if self._perf_panel is None:
+            if not visible:
+                return
+            from halo_core.perf import get_perf
+            from .perf_panel import PerfPanel
+            perf = get_perf()
+            self._perf_panel = PerfPanel(lambda: perf.latest, self)
+        if visible:
+            self._place_perf_panel()
+            self._perf_panel.show()
+        else:
+            self._perf_panel.hide()
 
     @Slot(str)
     def _set_accent_ui(self, color_hex: str):
@@ -186,6 +467,9 @@ class HUD(QWidget):
         if not self.isVisible():
             self.setWindowOpacity(0.0)
             self.show()
+        elif self._fade.endValue() == 1.0 and (
+                self._fade.state() == QPropertyAnimation.Running or self.windowOpacity() >= 1.0):
+            return  # already shown / fading in; don't restart the animation
 
         self._fade.stop()
         self._fade.setStartValue(self.windowOpacity())
@@ -201,30 +485,71 @@ class HUD(QWidget):
     # ---------- geometry ----------
     def _layout_accent(self):
         # Span the top edge of the container
-        self.accent.setGeometry(0, 0, self.width(), self.accent.height())
+        self.accent.setGeometry(0, 0, self.container.width(), self.accent.height())
+        self.level_bar.setGeometry(self.accent.rect())
 
     def _snap_to_top_center(self):
         screen = QApplication.primaryScreen().availableGeometry()
         x = int((screen.width() - self.width()) / 2)
-        y = 30
+        y = max(0, 30 - (SHADOW_MARGIN - SHADOW_OFFSET))  # keeps the panel itself 30px from the top
         self.move(x, y)
 
+    def _label_width(self) -> int:
+        margins = self.layout.contentsMargins()
+        return max(200, CONTENT_WIDTH - (margins.left() + margins.right()))
+
+    def _wrapped_lines(self, text: str) -> int:
+        fm = self.label.fontMetrics()
+        rect = fm.boundingRect(QRect(0, 0, self._label_width(), 1 << 20), Qt.TextWordWrap | Qt.AlignCenter, text)
+        return max(1, round(rect.height() / max(1, fm.lineSpacing())))
+
     def _adjust_height_to_label(self):
         # Set wrapping width so QLabel computes a correct sizeHint
         margins = self.layout.contentsMargins()
-        label_width = self.width() - (margins.left() + margins.right())
-        self.label.setFixedWidth(max(200, label_width))
+        self.label.setFixedWidth(self._label_width())
+        self.stats.layouts += 1
 
         # Compute height: label + margins + accent
         sh = self.label.sizeHint().height()
         content_height = sh + margins.top() + margins.bottom() + self.accent.height()
         min_height = 110
-        self.setFixedHeight(max(content_height + 10, min_height))
+        panel_height = max(content_height + 10, min_height)
+        self.setFixedHeight(panel_height + 2 * SHADOW_MARGIN)
 
         # Keep container matched and accent spanning
-        self.container.setGeometry(0, 0, self.width(), self.height())
+        self.container.setGeometry(SHADOW_MARGIN, SHADOW_MARGIN - SHADOW_OFFSET, CONTENT_WIDTH, panel_height)
         self._layout_accent()
 
+    def _place_perf_panel(self):
+        if getattr(self, "_perf_panel", None) is None:  # geometry events also fire during __init__
+            return
+        panel = self.container.geometry()
+        self._perf_panel.move(self.mapToGlobal(panel.bottomLeft()) + QPoint(0, 8))
+
+    def moveEvent(self, event):
+        super().moveEvent(event)
+        self._place_perf_panel()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._place_perf_panel()
+
+    def _shadow_pixmap(self) -> QPixmap:
+        size = self.container.size()
+        if self._shadow is None or self._shadow[0] != size:
+            self._shadow = (size, render_shadow(size))
+            self.stats.shadow_renders += 1
+        return self._shadow[1]
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        p = QPainter(self)
+        origin = self.container.pos() - QPoint(SHADOW_MARGIN, SHADOW_MARGIN - SHADOW_OFFSET)
+        p.drawPixmap(origin, self._shadow_pixmap())
+        p.end()
+        self.stats.frames += 1
+        self.stats.paint_s += time.perf_counter() - t0
+
     # ---------- mouse / drag ----------
     def mousePressEvent(self, event):
         if self._click_through:
@@ -0,0 +1,170 @@
+# halo_core/ui/perf_panel.py
+"""
+Compact performance overlay shown under the HUD.
+
+It polls a PerfSnapshot getter on a slow UI timer (HALO_PERF_REFRESH_MS), and
+repaints only when a new snapshot has been published. Row strings and sparkline
+polygons are built once per snapshot in refresh(), and the rounded background is
+cached as a pixmap per size, so paintEvent only blits and draws text.
+RenderStats-style counters (refreshes, paint time) are kept in `stats`.
+"""
+from __future__ import annotations
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QPointF, QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen, QPixmap, QPolygonF
+from PySide6.QtWidgets import QWidget
+
+from halo_core.perf import PerfSnapshot
+
+REFRESH_MS = int(os.getenv("HALO_PERF_REFRESH_MS", "500"))
+
+WIDTH = 420
+PAD = 10
+ROW_H = 18
+LABEL_W = 64
+SPARK_W = 180
+BACKGROUND = QColor(18, 18, 22, 215)
+TEXT = QColor(235, 235, 240)
+DIM = QColor(150, 150, 160)
+SPARK = QColor(78, 161, 255)
+GOOD = QColor(87, 211, 140)
+BAD = QColor(255, 107, 107)
+
+
+def _fmt_ms(ms: float) -> str:
+    return f"{ms / 1000:.2f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+class PerfPanel(QWidget):
+    def __init__(self, source: Callable[[], PerfSnapshot], parent: Optional[QWidget] = None):
+        super().__init__(parent, Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self._source = source
+        self._snapshot: Optional[PerfSnapshot] = None
+        self._stage_rows: List[Tuple[str, QPolygonF, str]] = []
+        self._text_rows: List[str] = []
+        self._residency: List[Tuple[float, bool, str]] = []
+        self._background: Optional[QPixmap] = None
+        self.stats: Dict[str, float] = {"refreshes": 0, "repaints": 0, "paint_s": 0.0, "max_paint_ms": 0.0}
+
+        self._font = QFont()
+        self._font.setPointSize(9)
+        self._mono = QFont("Consolas")
+        self._mono.setStyleHint(QFont.Monospace)
+        self._mono.setPointSize(9)
+        self._spark_pen = QPen(SPARK, 1.5)
+        self._font_metrics = QFontMetrics(self._font)
+        self.setFixedWidth(WIDTH)
+        self.setFixedHeight(PAD * 2 + ROW_H * 3)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    # ---------- lifecycle ----------
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Timer tick: take the latest snapshot reference; repaint only if it's new."""
+        self.stats["refreshes"] += 1
+        snap = self._source()
+        if snap is self._snapshot:
+            return
+        self._snapshot = snap
+        self._layout(snap)
+        rows = len(snap.latencies_ms) + 3
+        height = PAD * 2 + ROW_H * rows
+        if height != self.height():
+            self.setFixedHeight(height)
+        self.update()
+
+    def _layout(self, snap: PerfSnapshot):
+        """Turn a snapshot into ready-to-draw rows; runs once per new snapshot."""
+        y = PAD
+        self._stage_rows = []
+        for stage, values in snap.latencies_ms.items():
+            spark = _sparkline(values, QRectF(PAD + LABEL_W, y + 3, SPARK_W, ROW_H - 6))
+            self._stage_rows.append((stage, spark, f"{_fmt_ms(values[-1])}  max {_fmt_ms(max(values))}"))
+            y += ROW_H
+        cpu = f"{snap.cpu:.0f}%" if snap.cpu is not None else "-"
+        mem = f"{snap.mem:.0f}%" if snap.mem is not None else "-"
+        queues = "  ".join(f"{k} {v}" for k, v in snap.queues.items()) or "-"
+        hits = "  ".join(f"{k} {v * 100:.0f}%" for k, v in snap.hit_rates.items()) or "-"
+        self._text_rows = [f"CPU {cpu}   RAM {mem}   queues: {queues}", f"cache hits: {hits}"]
+        self._residency = []
+        x = PAD
+        for name, loaded in snap.residency.items():
+            text = f"● {name}"
+            self._residency.append((x, loaded, text))
+            x += self._font_metrics.horizontalAdvance(text) + 12
+
+    # ---------- painting ----------
+    def _background_pixmap(self) -> QPixmap:
+        if self._background is None or self._background.size() != self.size():
+            pm = QPixmap(self.size())
+            pm.fill(Qt.transparent)
+            bp = QPainter(pm)
+            bp.setRenderHint(QPainter.Antialiasing)
+            bp.setPen(Qt.NoPen)
+            bp.setBrush(BACKGROUND)
+            bp.drawRoundedRect(QRectF(0, 0, self.width(), self.height()), 10, 10)
+            bp.end()
+            self._background = pm
+        return self._background
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        p = QPainter(self)
+        p.drawPixmap(0, 0, self._background_pixmap())
+        if self._snapshot is not None:
+            self._paint_rows(p)
+        p.end()
+        elapsed = time.perf_counter() - t0
+        self.stats["repaints"] += 1
+        self.stats["paint_s"] += elapsed
+        self.stats["max_paint_ms"] = max(self.stats["max_paint_ms"], elapsed * 1000.0)
+
+    def _paint_rows(self, p: QPainter):
+        y = PAD
+        p.setFont(self._mono)
+        for stage, spark, value in self._stage_rows:
+            p.setPen(DIM)
+            p.drawText(QRectF(PAD, y, LABEL_W, ROW_H), Qt.AlignVCenter, stage)
+            if spark.size() > 1:
+                p.setPen(self._spark_pen)
+                p.drawPolyline(spark)
+            p.setPen(TEXT)
+            p.drawText(QRectF(PAD + LABEL_W + SPARK_W + 8, y, WIDTH, ROW_H), Qt.AlignVCenter, value)
+            y += ROW_H
+
+        p.setFont(self._font)
+        p.setPen(TEXT)
+        for text in self._text_rows:
+            p.drawText(QRectF(PAD, y, WIDTH - 2 * PAD, ROW_H), Qt.AlignVCenter, text)
+            y += ROW_H
+        for x, loaded, text in self._residency:
+            p.setPen(GOOD if loaded else BAD)
+            p.drawText(QRectF(x, y, WIDTH, ROW_H), Qt.AlignVCenter, text)
+
+
+def _sparkline(values, rect: QRectF) -> QPolygonF:
+    if len(values) < 2:
+        return QPolygonF()
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or 1.0
+    step = rect.width() / (len(values) - 1)
+    return QPolygonF([
+        QPointF(rect.left() + i * step, rect.bottom() - (v - lo) / span * rect.height())
+        for i, v in enumerate(values)
+    ])
@@ -0,0 +1,134 @@
+# halo_core/voice/levels.py
+"""
+Input level metering for the capture path.
+
+Each audio block is reduced to a sum of squares, a peak and a clipped-sample
+count with a few numpy calls (no per-sample Python). The meter accumulates
+blocks and publishes one (rms, peak) pair per decimation window, about
+HALO_METER_HZ times a second. Publishing doesn't depend on the capture block
+size, so the HUD gets a steady rate.
+
+It also counts what `exception_on_overflow=False` used to hide: input
+overflows reported by PortAudio and clipped samples. summary() turns a
+recording into numbers that tell a dead or muted device (digital silence)
+apart from a quiet speaker.
+
+Levels are linear 0..1 of int16 full scale; dbfs() converts for display.
+
+Env knobs:
+  HALO_METER_HZ        level updates per second             (default: 30)
+  HALO_CLIP_LEVEL      |sample| counted as clipped, 0..1     (default: 0.99)
+  HALO_QUIET_DBFS      RMS below this is "too quiet"         (default: -50)
+"""
+from __future__ import annotations
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+METER_HZ = float(os.getenv("HALO_METER_HZ", "30"))
+CLIP_LEVEL = float(os.getenv("HALO_CLIP_LEVEL", "0.99"))
+QUIET_DBFS = float(os.getenv("HALO_QUIET_DBFS", "-50"))
+FULL_SCALE = 32768.0
+FLOOR_DBFS = -90.0
+
+
+@dataclass(frozen=True)
+class BlockStats:
+    samples: int
+    sum_squares: float   # in full-scale units (samples / 32768)
+    peak: float          # 0..1
+    clipped: int
+
+
+def block_stats(data: bytes, clip_level: float = CLIP_LEVEL) -> BlockStats:
+    """Reduce one int16 PCM block to sum-of-squares / peak / clipped count."""
+    pcm = np.frombuffer(data, dtype=np.int16)
+    if pcm.size == 0:
+        return BlockStats(0, 0.0, 0.0, 0)
+    x = pcm.astype(np.float32) * (1.0 / FULL_SCALE)
+    a = np.abs(x)
+    return BlockStats(
+        samples=int(pcm.size),
+        sum_squares=float(np.dot(x, x)),
+        peak=float(a.max()),
+        clipped=int(np.count_nonzero(a >= clip_level)),
+    )
+
+
+def dbfs(level: float) -> float:
+    return 20.0 * math.log10(level) if level > 0 else FLOOR_DBFS
+
+
+class LevelMeter:
+    """
+    Feed raw capture blocks; `publish(rms, peak)` fires about `rate_hz` times a second.
+
+    feed() is meant to run on the audio thread (PortAudio callback or read loop)
+    and does constant work per block. `publish` must be cheap and thread-safe;
+    HUD.set_level is.
+    """
+
+    def __init__(self, publish: Optional[Callable[[float, float], None]] = None,
+                 sample_rate: int = 16000, rate_hz: float = METER_HZ, clip_level: float = CLIP_LEVEL):
+        self.publish = publish
+        self.sample_rate = sample_rate
+        self.clip_level = clip_level
+        self.window = max(1, int(round(sample_rate / rate_hz)))   # samples per published value
+
+        # current decimation window; _next_at is an absolute sample position so
+        # windows don't drift when blocks don't divide the window evenly
+        self._next_at = self.window
+        self._win_samples = 0
+        self._win_squares = 0.0
+        self._win_peak = 0.0
+
+        # totals for the whole recording
+        self.blocks = 0
+        self.samples = 0
+        self.sum_squares = 0.0
+        self.peak = 0.0
+        self.clipped = 0
+        self.overflows = 0
+        self.published = 0
+
+    def feed(self, data: bytes, overflow: bool = False):
+        s = block_stats(data, self.clip_level)
+        self.blocks += 1
+        self.samples += s.samples
+        self.sum_squares += s.sum_squares
+        self.peak = max(self.peak, s.peak)
+        self.clipped += s.clipped
+        if overflow:
+            self.overflows += 1
+
+        self._win_samples += s.samples
+        self._win_squares += s.sum_squares
+        self._win_peak = max(self._win_peak, s.peak)
+        if self.samples >= self._next_at:
+            self._next_at = max(self._next_at + self.window, self.samples + 1)
+            rms = math.sqrt(self._win_squares / self._win_samples)
+            peak = self._win_peak
+            self._win_samples, self._win_squares, self._win_peak = 0, 0.0, 0.0
+            self.published += 1
+            if self.publish is not None:
+                self.publish(rms, peak)
+
+    @property
+    def rms(self) -> float:
+        return math.sqrt(self.sum_squares / self.samples) if self.samples else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        rms_db = dbfs(self.rms)
+        return {
+            "seconds": round(self.samples / self.sample_rate, 2),
+            "rms_dbfs": round(rms_db, 1),
+            "peak_dbfs": round(dbfs(self.peak), 1),
+            "clipped": self.clipped,
+            "clip_ratio": round(self.clipped / self.samples, 5) if self.samples else 0.0,
+            "overflows": self.overflows,
+            "silent": self.samples > 0 and self.peak == 0.0,   # all zeros: muted / wrong device
+            "quiet": rms_db < QUIET_DBFS,
+        }
@@ -4,6 +4,18 @@ import tempfile
 import os
 import uuid
 import time
+import wave
+
+from halo_core.tracing import annotate
+
+
+def _wav_seconds(path):
+    try:
+        with wave.open(path, "rb") as wf:
+            return round(wf.getnframes() / float(wf.getframerate() or 1), 3)
+    except Exception:
+        return None
+
 
 class LocalSTT:
     def __init__(
@@ -16,6 +28,23 @@ class LocalSTT:
         self.exe = exe
         self.threads = threads
 
+    def warm_up(self, block_size: int = 1 << 20):
+        """
+        whisper-cli loads the model on every call, so the best we can do is keep
+        the model file in the OS page cache: read it once up front so the first
+        transcription doesn't pay the cold disk read.
+        """
+        for path in (self.exe, self.model):
+            if not os.path.exists(path):
+                print(f"[STT] ⚠️ Missing {path}")
+                return False
+        start = time.time()
+        with open(self.model, "rb") as f:
+            while f.read(block_size):
+                pass
+        print(f"[STT] 🔥 Model cached in {time.time() - start:.2f}s")
+        return True
+
     def transcribe(self, audio_path):
         """Fast, silent transcription using whisper-cli (no VAD)."""
         base_result = os.path.join(tempfile.gettempdir(), f"halo_stt_{uuid.uuid4().hex}")
@@ -35,6 +64,7 @@ class LocalSTT:
         start = time.time()
         subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         elapsed = time.time() - start
+        annotate(audio_s=_wav_seconds(audio_path), stt_s=round(elapsed, 3))
 
         txt_path = base_result + ".txt"
         if not os.path.exists(txt_path):
@@ -49,6 +79,7 @@ class LocalSTT:
         except FileNotFoundError:
             pass
 
+        annotate(chars=len(text))
         print(f"[STT] ⏱️ Transcription took {elapsed:.2f}s")
         if text:
             print(f"[STT] 📝 \"{text}\"")
@@ -6,6 +6,8 @@ import re
 import time
 import json
 
+from halo_core.tracing import get_tracer
+
 class TTS:
     def __init__(
         self,
@@ -21,6 +23,23 @@ class TTS:
             "tch": "t͡ʃ",      # sharp 'tch' click
         }
 
+    def warm_up(self, block_size: int = 1 << 20):
+        """
+        Piper loads the voice model per invocation; pre-read the .onnx (and its
+        .json config) so the first reply is synthesized from the page cache.
+        """
+        if not os.path.exists(self.piper_path) or not os.path.exists(self.model_path):
+            print("[TTS] ⚠️ Piper binary or model missing; skipping warm-up")
+            return False
+        start = time.time()
+        for path in (self.model_path, self.model_path + ".json"):
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    while f.read(block_size):
+                        pass
+        print(f"[TTS] 🔥 Voice model cached in {time.time() - start:.2f}s")
+        return True
+
     def _preprocess_text(self, text: str) -> str:
         """
         Clean and tsundere-ify text for Piper.
@@ -89,6 +108,8 @@ class TTS:
         # Temp file for Piper output
         out_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav").name
 
+        tracer = get_tracer()
+
         # 🧠 Run Piper
         start_time = time.time()
         cmd = [
@@ -99,25 +120,27 @@ class TTS:
         if use_phoneme_mode:
             cmd.append("--phoneme-input")
 
-        subprocess.run(
-            cmd,
-            input=input_data,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True
-        )
+        with tracer.span("tts.synth", chars=len(input_data), phonemes=use_phoneme_mode):
+            subprocess.run(
+                cmd,
+                input=input_data,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True
+            )
         gen_time = time.time() - start_time
 
         # 🔊 Play using PowerShell's SoundPlayer (no UI)
-        subprocess.run(
-            [
-                "powershell",
-                "-c",
-                f"(New-Object Media.SoundPlayer '{out_wav}').PlaySync();"
-            ],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
+        with tracer.span("tts.playback"):
+            subprocess.run(
+                [
+                    "powershell",
+                    "-c",
+                    f"(New-Object Media.SoundPlayer '{out_wav}').PlaySync();"
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
 
         print(f"\033[92m[TTS] ⏱️ Generated & played in {gen_time:.2f}s\033[0m")
 
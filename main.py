@@ -7,6 +7,7 @@ import datetime
 import pyaudio
 import json
 import re
+import tempfile
 import threading
 from dotenv import load_dotenv
 from pathlib import Path
@@ -14,9 +15,22 @@ from pathlib import Path
 from halo_core.voice.wakeword import WakeWordDetector
 from halo_core.voice.recognizer import LocalSTT
 from halo_core.voice.tts import TTS
+from halo_core.voice.levels import LevelMeter
 from halo_core.llm.local_llm import LocalLLM
-from halo_core.skills import execute_intents  # <- now includes web skills routing
+from halo_core.skills import execute_intents, job_event_text, validate_action_map  # <- now includes web skills routing
+from halo_core.skills.executor import JobEvent, get_executor
+from halo_core.skills.shell_host import get_mixer, set_mixer
+from halo_core.skills.monitoring import get_sampler
+from halo_core.skills.app_index import get_app_index
+from halo_core.skills.automation import Task, get_scheduler, reminder_text
+from halo_core.skills.notifications import HIGH, LOW, get_notifier, render_batch
+from halo_core.skills.web_session import WebSession
 from halo_core.ui.hud import HUD  # NOTE: we run Qt in main thread; no run_ui import
+from halo_core.pipeline import CommandContext, Pipeline, Stage
+from halo_core.tracing import annotate, get_tracer
+from halo_core.perf import get_perf, ollama_residency, throttled
+from halo_core.history import DROPPED, ERROR, NO_SPEECH, CommandRecord, get_history
+from halo_core.startup import Startup
 
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import QTimer
@@ -32,7 +46,7 @@ CUSTOM_KEYWORD_PATH = "halo_core/voice/models/halo.ppn"
 PERSONALITY_PATH = "configs/personality.txt"
 ACTION_MAP_PATH = Path(__file__).resolve().parent / "halo_core" / "skills" / "action_map.json"
 
-CHUNK = 1024
+CHUNK = 512    # 32 ms blocks at 16 kHz, so the level meter can update ~30 times a second
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
@@ -54,18 +68,33 @@ def log(msg, level="INFO"):
     print(f"{colors.get(level, '')}[{level}] {msg}{reset}")
 
 
-def record_audio(filename="temp.wav", seconds=5):
-    """Record audio for a short period after wake word."""
+def record_audio(filename="temp.wav", seconds=5, meter: LevelMeter | None = None):
+    """Record audio for a short period after wake word.
+
+    Runs in callback mode so PortAudio's overflow flag reaches the meter instead
+    of being swallowed by exception_on_overflow=False.
+    """
     log("🎙️ Recording voice command...", "STAGE")
+    meter = meter or LevelMeter(sample_rate=RATE)
     p = pyaudio.PyAudio()
-    stream = p.open(format=FORMAT, channels=CHANNELS,
-                    rate=RATE, input=True,
-                    frames_per_buffer=CHUNK)
     frames = []
+    total = int(RATE / CHUNK * seconds)
+    done = threading.Event()
 
-    for _ in range(0, int(RATE / CHUNK * seconds)):
-        data = stream.read(CHUNK, exception_on_overflow=False)
-        frames.append(data)
+    def on_audio(in_data, frame_count, time_info, status):
+        frames.append(in_data)
+        meter.feed(in_data, overflow=bool(status & pyaudio.paInputOverflow))
+        if len(frames) >= total:
+            done.set()
+            return None, pyaudio.paComplete
+        return None, pyaudio.paContinue
+
+    stream = p.open(format=FORMAT, channels=CHANNELS,
+                    rate=RATE, input=True,
+                    frames_per_buffer=CHUNK,
+                    stream_callback=on_audio)
+    stream.start_stream()
+    done.wait(seconds + 2.0)
 
     stream.stop_stream()
     stream.close()
@@ -77,7 +106,10 @@ def record_audio(filename="temp.wav", seconds=5):
         wf.setframerate(RATE)
         wf.writeframes(b''.join(frames))
 
-    log(f"✅ Saved audio to {filename}", "SUCCESS")
+    levels = meter.summary()
+    log(f"✅ Saved audio to {filename} (rms {levels['rms_dbfs']} dBFS, peak {levels['peak_dbfs']} dBFS)", "SUCCESS")
+    if levels["overflows"] or levels["clipped"]:
+        log(f"⚠️ Capture dropped {levels['overflows']} block(s), {levels['clipped']} clipped sample(s)", "WARN")
     return filename
 
 
@@ -265,14 +297,15 @@ def llm_parse_and_reply(llm: LocalLLM, personality: str, action_map: dict, user_
         reply_text = data.get("reply", "") if isinstance(data.get("reply"), str) else ""
         intents = normalize_intents_from_llm(data.get("intents", []))
 
+    parse_error = None
     try:
         try_parse(json_str)
-    except Exception:
+    except Exception as e:
         # Repair flow unchanged
-        ...
+        parse_error = f"{type(e).__name__}: {e}"
 
     reply_text = sanitize_reply(reply_text)
-    return {"reply": reply_text, "intents": intents}
+    return {"reply": reply_text, "intents": intents, "parse_error": parse_error, "raw": raw}
 
 
 # ───────────────────────────────
@@ -284,10 +317,6 @@ def hud_update(hud: HUD, text: str):
     QTimer.singleShot(0, lambda: hud.set_text(text))
 
 
-# ───────────────────────────────
-# 🎛️ Voice loop (runs in background thread)
-# ───────────────────────────────
-
 # ───────────────────────────────
 # 🎛️ Voice loop (runs in background thread)
 # ───────────────────────────────
@@ -295,83 +324,265 @@ def hud_update(hud: HUD, text: str):
 def voice_loop(hud: HUD):
     log("Initializing Halo Voice Core...", "STAGE")
     hud.set_text("🚀 Initializing Halo...")
-
-    wake = WakeWordDetector(ACCESS_KEY, keyword_path=CUSTOM_KEYWORD_PATH)
-    log("Halo wake word detector initialized ✨", "SUCCESS")
-
-    stt = LocalSTT()
-    log("Whisper recognizer ready 🧠", "SUCCESS")
-
-    tts = TTS()
-    log("TTS engine ready 🗣️", "SUCCESS")
-
-    llm = LocalLLM(model="gemma3:4b")
-    log("LLM ready 🧠", "SUCCESS")
+    tracer = get_tracer()
+    history = get_history()  # every command (and why it ended) lands in data/history.db
+
+    # 🚀 Start every subsystem at once; only the wake word gates listening.
+    # STT/TTS/LLM finish (and warm up) in the background; stages block on them if needed.
+    startup = Startup()
+    startup.add("wake", lambda: WakeWordDetector(ACCESS_KEY, keyword_path=CUSTOM_KEYWORD_PATH))
+    startup.add("stt", LocalSTT, warm_up=lambda stt: stt.warm_up())
+    startup.add("tts", TTS, warm_up=lambda tts: tts.warm_up())
+    startup.add("llm", lambda: LocalLLM(model="gemma3:4b"), warm_up=lambda llm: llm.warm_up())
+    # Keep the system_control shell host warm so the first "mute" is instant
+    startup.add("mixer", get_mixer, warm_up=lambda mixer: mixer and mixer.warm_up())
+    # Background metrics history: "status" answers instantly with 1/5/15-min trends
+    startup.add("monitor", get_sampler)
+    # Installed-app catalog: loads the persisted index and rescans only changed dirs
+    startup.add("apps", get_app_index, warm_up=lambda index: index.refresh())
 
     personality = load_personality()
     log("Halo personality loaded 💫", "SUCCESS")
     action_map = load_action_map()
+    bad_entries = validate_action_map()
+    if bad_entries:
+        log(f"{len(bad_entries)} action_map.json entr{'y' if len(bad_entries) == 1 else 'ies'} won't dispatch", "WARN")
 
-    log("🌟 Halo is now listening for your call...", "STAGE")
-    hud.show_idle()
-
-    try:
-        while True:
-            start_time = datetime.datetime.now()
-            log(f"🕒 Command started at {start_time.strftime('%H:%M:%S')}", "STAGE")
-
-            # 👂 Waiting for wake word
-            hud.show_waiting()
-            wake.listen_for_wake_word()
-
-            # 🎙️ Listening / recording
-            hud.show_listening()
-            time.sleep(0.5)
-            audio_file = record_audio()
-
-            # 🧠 Transcribing speech to text
-            hud.show_transcribing()
-            text = stt.transcribe(audio_file).strip()
-            print(f"\033[94m[TRANSCRIPT] → {text if text else '(no speech detected)'}\033[0m")
+    wake = startup.get("wake")
+    log("Halo wake word detector initialized ✨", "SUCCESS")
 
-            if not text:
+    def report_startup():
+        startup.wait_all()
+        for name, msg in (("stt", "Whisper recognizer ready 🧠"), ("tts", "TTS engine ready 🗣️"), ("llm", "LLM ready 🧠")):
+            if startup.is_ready(name):
+                log(msg, "SUCCESS")
+        log(startup.report(), "INFO")
+
+    threading.Thread(target=report_startup, name="halo-startup-report", daemon=True).start()
+
+    # One speaker at a time: replies and background job announcements share the voice
+    tts_lock = threading.Lock()
+
+    def announce(text: str):
+        tts = startup.get("tts")
+        with tts_lock:
+            tts.speak(text)
+
+    # 🔔 Everything that isn't a direct reply goes through the notification queue:
+    # it batches, coalesces and rate-limits, then shows on the HUD and speaks.
+    notifier = get_notifier(start=False)
+
+    def hud_sink(batch, pending):
+        sticky = all(n.priority == LOW for n in batch)  # progress lines stay up until replaced
+        hud.set_text(render_batch(batch, pending), autohide_ms=0 if sticky else 5000)
+
+    def tts_sink(batch, pending):
+        spoken = [n.message for n in batch if n.speak]
+        if spoken:
+            threading.Thread(target=announce, args=(" ".join(spoken),), daemon=True).start()
+
+    notifier.add_sink("hud", hud_sink)
+    notifier.add_sink("tts", tts_sink)
+    notifier.start()
+
+    # 📣 Background skill jobs report progress/completion here (executor threads)
+    def on_job_event(event: JobEvent):
+        if not event.job.background:
+            return  # inline jobs are answered in the same turn
+        text = job_event_text(event)
+        if not text:
+            return
+        log(f"[{event.job.id}] {text}", "INFO" if event.kind in ("progress", "done") else "WARN")
+        if event.kind == "progress":
+            notifier.notify(f"⏳ {text}", source="jobs", priority=LOW, key=event.job.id)
+            return
+        notifier.notify(text, source="jobs", priority=HIGH, speak=True, key=event.job.id)
+
+    get_executor().subscribe(on_job_event)
+
+    # ⏰ Scheduled reminders fire on the scheduler thread
+    def on_reminder(task: Task):
+        log(f"⏰ Task #{task.id}: {task.what}", "INFO")
+        notifier.notify(reminder_text(task), source="scheduler", priority=HIGH, speak=True,
+                        title="Halo reminder", key=f"task-{task.id}")
+
+    scheduler = get_scheduler(start=False)
+    scheduler.subscribe(on_reminder)
+    startup.add("scheduler", scheduler.start)
+
+    # 👂 Source: wake word + recording. Goes back to listening right after recording.
+    def capture():
+        hud.show_waiting()
+        wake_start = time.perf_counter()
+        wake.listen_for_wake_word()
+
+        ctx = CommandContext()
+        tracer.add("wake", wake_start, time.perf_counter(), trace=ctx.id)
+        log(f"🕒 Command #{ctx.id} started at {datetime.datetime.now().strftime('%H:%M:%S')}", "STAGE")
+
+        # 🎙️ Listening / recording
+        hud.show_listening()
+        time.sleep(0.5)
+        seconds = 5
+        meter = LevelMeter(hud.set_level, sample_rate=RATE)
+        with tracer.span("record", trace=ctx.id, audio_s=seconds):
+            ctx.audio_path = record_audio(os.path.join(tempfile.gettempdir(), f"halo_cmd_{ctx.id}.wav"), seconds, meter)
+            ctx.meta["levels"] = meter.summary()
+            annotate(**ctx.meta["levels"])
+        return ctx
+
+    # 🧠 Transcribing speech to text
+    def transcribe(ctx: CommandContext):
+        hud.show_transcribing()
+        try:
+            ctx.text = startup.get("stt").transcribe(ctx.audio_path).strip()
+        finally:
+            try:
+                os.remove(ctx.audio_path)
+            except OSError:
+                pass
+        print(f"\033[94m[TRANSCRIPT] → {ctx.text if ctx.text else '(no speech detected)'}\033[0m")
+
+        if not ctx.text:
+            history.record(CommandRecord.from_context(ctx, NO_SPEECH))
+            levels = ctx.meta.get("levels", {})
+            if levels.get("silent"):
+                hud.set_text("🔇 Your mic gave me pure silence... is it muted, or the wrong device?!")
+            elif levels.get("quiet"):
+                hud.set_text("🤏 I could barely hear anything. Speak up, baka!")
+            else:
                 hud.set_text("😶 No speech detected")
-                continue
-
-            hud.show_user_text(text)
-
-            # 🤔 LLM reasoning
-            log("🧠 LLM reasoning...", "STAGE")
-            hud.show_thinking()
-            llm_result = llm_parse_and_reply(llm, personality, action_map, text)
-            reply_text = llm_result["reply"]
-            intents = llm_result["intents"]
-            print(f"\033[93m[LLM INTENTS] → {intents}\033[0m")
-
-            # 🛠️ Execute actions (skills) and display their responses
-            skill_responses = execute_intents(intents)
-            if skill_responses:
-                # For now, just display the first one. Later we can toast all.
-                hud.set_text(f"⚡ {skill_responses[0]}")
-                print(f"[Skills] Response → {skill_responses[0]}")
-
-            # 💬 Speak the reply
-            log(f"Halo: {reply_text}", "STAGE")
-            hud.show_reply(reply_text)
-            tts.speak(reply_text)
-
-            # 🕒 Finish timing
-            end_time = datetime.datetime.now()
-            elapsed = (end_time - start_time).total_seconds()
-            log(f"🏁 Command finished at {end_time.strftime('%H:%M:%S')} — took {elapsed:.2f}s", "SUCCESS")
-
-            # Return to listening state
+            return None
+
+        hud.show_user_text(ctx.text)
+        return ctx
+
+    # 🤔 LLM reasoning
+    def think(ctx: CommandContext):
+        log("🧠 LLM reasoning...", "STAGE")
+        hud.show_thinking()
+        llm = startup.get("llm")
+        llm_result = llm_parse_and_reply(llm, personality, action_map, ctx.text)
+        ctx.reply = llm_result["reply"]
+        ctx.intents = llm_result["intents"]
+        if llm_result["parse_error"]:
+            ctx.meta["parse_error"] = llm_result["parse_error"]
+            ctx.meta["llm_raw"] = llm_result["raw"]
+            log(f"LLM output wasn't valid JSON: {llm_result['parse_error']}", "WARN")
+        annotate(model=llm.model, intents=len(ctx.intents), **llm.last_stats)
+        print(f"\033[93m[LLM INTENTS] → {ctx.intents}\033[0m")
+        return ctx
+
+    # 🛠️ Execute actions (skills) and display their responses
+    def act(ctx: CommandContext):
+        ctx.skill_responses = execute_intents(ctx.intents)
+        if ctx.skill_responses:
+            # For now, just display the first one. Later we can toast all.
+            hud.set_text(f"⚡ {ctx.skill_responses[0]}")
+            print(f"[Skills] Response → {ctx.skill_responses[0]}")
+        return ctx
+
+    # 💬 Speak the reply
+    def speak(ctx: CommandContext):
+        log(f"Halo: {ctx.reply}", "STAGE")
+        hud.show_reply(ctx.reply)
+        announce(ctx.reply)
+        return ctx
+
+    def on_done(ctx: CommandContext):
+        # 🕒 Finish timing
+        tracer.add("command", time.perf_counter() - ctx.elapsed(), time.perf_counter(), trace=ctx.id,
+                   actions=[i.get("action") for i in ctx.intents])
+        log(f"🏁 Command #{ctx.id} finished at {datetime.datetime.now().strftime('%H:%M:%S')} "
+            f"— took {ctx.elapsed():.2f}s", "SUCCESS")
+        history.record(CommandRecord.from_context(ctx))
+        # Return to listening state (unless another command is already in flight)
+        if pipeline.in_flight() == 0:
             hud.show_idle()
 
+    def on_error(stage: str, ctx: CommandContext, e: BaseException):
+        log(f"Command #{ctx.id} failed in {stage}: {e}", "ERROR")
+        history.record(CommandRecord.from_context(ctx, ERROR, stage=stage, error=e))
+
+    def on_drop(ctx: CommandContext):
+        log(f"Command #{ctx.id} dropped (pipeline busy)", "WARN")
+        history.record(CommandRecord.from_context(ctx, DROPPED))
+
+    pipeline = Pipeline(
+        capture,
+        [
+            Stage("stt", transcribe),
+            Stage("llm", think),
+            Stage("skills", act),
+            Stage("tts", speak),
+        ],
+        on_done=on_done,
+        on_error=on_error,
+        on_drop=on_drop,
+    )
+
+    # 📊 Perf overlay data: gathered on its own thread at a low rate, never on the voice path
+    perf = get_perf()
+
+    def system_source():
+        sample = get_sampler(start=False).latest()
+        return {"cpu": sample["cpu_percent"], "mem": sample["mem_percent"]} if sample else {}
+
+    def queue_source():
+        queues = {name: s["queued"] for name, s in pipeline.stats()["stages"].items()}
+        queues["jobs"] = len(get_executor().jobs(active_only=True))
+        queues["notes"] = notifier.stats()["queue_depth"]
+        return {"queues": queues}
+
+    def cache_source():
+        from halo_core.skills.cache import get_result_cache
+        from halo_core.skills.page_cache import PageCache
+        counts = [c for action, c in get_result_cache().stats().items() if action != "_size"]
+        lookups = sum(c.get("hits", 0) + c.get("misses", 0) + c.get("coalesced", 0) for c in counts)
+        rates = {"skills": sum(c.get("hits", 0) + c.get("coalesced", 0) for c in counts) / lookups} if lookups else {}
+        pages = PageCache.current()
+        if pages is not None:
+            ps = pages.stats
+            fetches = ps["hits"] + ps["revalidated"] + ps["misses"]
+            if fetches:
+                rates["pages"] = (ps["hits"] + ps["revalidated"]) / fetches
+        return {"hit_rates": rates}
+
+    def residency_source():
+        resident = {name: startup.is_ready(name) for name in ("wake", "stt", "tts")}
+        if startup.is_ready("llm"):
+            llm = startup.get("llm")
+            resident.update(ollama_residency(llm.api_url.rsplit("/api/", 1)[0], [llm.model]))
+        return {"residency": resident}
+
+    perf.add_source("system", system_source)
+    perf.add_source("queues", queue_source)
+    perf.add_source("caches", cache_source)
+    perf.add_source("residency", throttled(residency_source, 5.0))
+    perf.start()
+
+    log(f"🌟 Halo is now listening for your call... ({pipeline.mode} mode)", "STAGE")
+    hud.show_idle()
+
+    try:
+        pipeline.run()
     except KeyboardInterrupt:
         log("Exiting cleanly (Ctrl+C).", "WARN")
         hud.set_text("👋 Exiting Halo...")
     finally:
+        pipeline.stop()
+        get_executor().shutdown()
+        tracer.close()
+        startup.shutdown()
+        set_mixer(None)
+        get_sampler(start=False).stop()
+        scheduler.stop()
+        notifier.stop()
+        perf.stop()
+        history.close()
+        if WebSession.current() is not None:
+            log(f"Web session: {WebSession.current().stats()}", "INFO")
+            WebSession.current().shutdown()
         wake.close()
 
 
@@ -386,6 +597,8 @@ def main():
     hud = HUD.get_instance()
     hud.show()
 
+    get_tracer().serve_prometheus()
+
     t = threading.Thread(target=voice_loop, args=(hud,), daemon=True)
     t.start()
 
@@ -0,0 +1,89 @@
+# tests/agent_monitor_test.py
+import asyncio
+from types import SimpleNamespace
+
+from halo_core.skills.agent_monitor import AgentMonitor, action_budget
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class _Action:
+    def __init__(self, **data):
+        self.data = data
+
+    def model_dump(self, exclude_unset=True):
+        return self.data
+
+
+class _Agent:
+    """Just enough of browser-use's Agent for the step hooks."""
+
+    def __init__(self):
+        self.state = SimpleNamespace(history=SimpleNamespace(history=[]), stopped=False)
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def add_step(self, url, action, extracted=None, tokens=None):
+        self.state.history.history.append(SimpleNamespace(
+            model_output=SimpleNamespace(action=[_Action(**action)]),
+            state=SimpleNamespace(url=url),
+            result=[SimpleNamespace(extracted_content=extracted, error=None)],
+            metadata=SimpleNamespace(input_tokens=tokens),
+        ))
+
+
+def _step(monitor, agent, clock, seconds, *args, **kwargs):
+    asyncio.run(monitor.on_step_start(agent))
+    clock.t += seconds
+    agent.add_step(*args, **kwargs)
+    asyncio.run(monitor.on_step_end(agent))
+
+
+def test_records_steps_and_stops_on_repeated_action():
+    clock, agent = _Clock(), _Agent()
+    monitor = AgentMonitor(budget_s=100, repeat_limit=3, clock=clock)
+    _step(monitor, agent, clock, 2.0, "https://a.com", {"go_to_url": {"url": "https://a.com"}}, tokens=900)
+    _step(monitor, agent, clock, 1.0, "https://a.com", {"extract_content": {"goal": "x"}}, extracted="facts")
+    for _ in range(3):
+        assert not agent.stopped
+        _step(monitor, agent, clock, 0.5, "https://a.com", {"scroll_down": {"amount": None}})
+    assert agent.stopped
+    assert "scroll_down" in monitor.stop_reason
+    assert monitor.best_result() == "facts"
+    s = monitor.summary()
+    assert s["steps"] == 5 and s["slowest_step"] == 1 and s["tokens"] == 900
+    assert monitor.steps[0].to_dict()["actions"] == ['{"go_to_url": {"url": "https://a.com"}}']
+
+
+def test_unchanged_page_without_new_content_stops():
+    clock, agent = _Clock(), _Agent()
+    fingerprint = iter(["p1", "p2", "p2", "p2", "p2"])
+    monitor = AgentMonitor(budget_s=100, repeat_limit=3, fingerprint=lambda: next(fingerprint), clock=clock)
+    _step(monitor, agent, clock, 1, "https://a.com", {"go_to_url": {"url": "https://a.com"}})
+    _step(monitor, agent, clock, 1, "https://a.com", {"extract_content": {"goal": "x"}}, extracted="A")
+    _step(monitor, agent, clock, 1, "https://a.com", {"scroll_down": {}})
+    _step(monitor, agent, clock, 1, "https://a.com", {"extract_content": {"goal": "x"}}, extracted="A")
+    assert not agent.stopped
+    _step(monitor, agent, clock, 1, "https://a.com", {"scroll_up": {}})
+    assert agent.stopped and "unchanged" in monitor.stop_reason
+
+
+def test_budget_stops_at_next_step():
+    clock, agent = _Clock(), _Agent()
+    monitor = AgentMonitor(budget_s=10, clock=clock)
+    _step(monitor, agent, clock, 11, "https://a.com", {"go_to_url": {"url": "https://a.com"}})
+    asyncio.run(monitor.on_step_start(agent))
+    assert agent.stopped and "budget" in monitor.stop_reason
+
+
+def test_budget_from_action_map():
+    assert action_budget("web_browse") == 240
+    assert action_budget("no_such_action") == action_budget(None)
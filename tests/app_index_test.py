@@ -0,0 +1,157 @@
+# tests/app_index_test.py
+import os
+import time
+
+from halo_core.skills.app_index import AppIndex
+
+DESKTOP = "[Desktop Entry]\nType=Application\nName={name}\nExec={exec} %U\n"
+
+
+def _write(d, fname, name, exec_):
+    (d / fname).write_text(DESKTOP.format(name=name, exec=exec_), encoding="utf-8")
+
+
+def _index(tmp_path):
+    apps = tmp_path / "applications"
+    apps.mkdir(exist_ok=True)
+    return apps, AppIndex(index_path=tmp_path / "index.json", roots={"desktop": [apps]})
+
+
+def test_fuzzy_lookup_tolerates_stt_spellings(tmp_path):
+    apps, index = _index(tmp_path)
+    _write(apps, "code.desktop", "Visual Studio Code", "/usr/share/code/code")
+    _write(apps, "firefox.desktop", "Firefox Web Browser", "firefox")
+    _write(apps, "gimp.desktop", "GNU Image Manipulation Program", "gimp-2.10")
+    index.refresh()
+
+    assert index.find("v s code").name == "Visual Studio Code"
+    assert index.find("fire fox").name == "Firefox Web Browser"
+    assert index.find("gimp").name == "GNU Image Manipulation Program"
+    assert index.find("spreadsheet") is None
+
+    t = time.perf_counter()
+    for _ in range(100):
+        index.search("v s code")
+    assert (time.perf_counter() - t) / 100 < 0.001
+
+
+def test_index_persists_and_refreshes_incrementally(tmp_path):
+    apps, index = _index(tmp_path)
+    _write(apps, "code.desktop", "Visual Studio Code", "code")
+    assert index.refresh() == 1
+    assert index.refresh() == 0  # nothing changed: stat only
+
+    _, reloaded = _index(tmp_path)
+    assert reloaded.refresh() == 0  # served from the persisted index
+    assert reloaded.find("vs code").exe == "code"
+
+    _write(apps, "gimp.desktop", "GNU Image Manipulation Program", "gimp")
+    os.utime(apps, (time.time() + 5, time.time() + 5))  # coarse-mtime filesystems
+    assert reloaded.refresh() == 1
+    assert reloaded.find("gimp") is not None
+
+
+def test_exec_name_looks_through_launchers():
+    from halo_core.skills.app_index import exec_name
+
+    assert exec_name(["flatpak", "run", "--branch=stable", "md.obsidian.Obsidian"]) == "md.obsidian.Obsidian"
+    assert exec_name(["env", "GDK_BACKEND=x11", "-u", "FOO", "/opt/foo/foo-bin", "--flag"]) == "foo-bin"
+    assert exec_name(["sh", "-c", "GTK_THEME=x exec firefox --new-window"]) == "firefox"
+    assert exec_name(["/bin/bash", "-c", "env A=1 gimp-2.10"]) == "gimp-2.10"
+    assert exec_name(["nice", "-n", "10", "blender"]) == "blender"
+    assert exec_name(["python3", "/usr/bin/some_tool.py"]) is None
+    assert exec_name(["/usr/bin/python3.11", "-m", "tool"]) is None
+    assert exec_name(["sh"]) is None
+    assert exec_name(["code"]) == "code"
+
+
+def test_desktop_entries_with_wrappers_get_the_real_exe(tmp_path):
+    apps, index = _index(tmp_path)
+    _write(apps, "obsidian.desktop", "Obsidian", "flatpak run md.obsidian.Obsidian")
+    _write(apps, "foo.desktop", "Foo Editor", "env GDK_BACKEND=x11 foo")
+    _write(apps, "tool.desktop", "Some Tool", "python3 /opt/tool/main.py")
+    index.refresh()
+    assert index.find("obsidian").exe == "md.obsidian.Obsidian"
+    assert index.find("foo editor").exe == "foo"
+    assert index.find("some tool").exe is None
+
+
+class _FakeProc:
+    def __init__(self, pid, name):
+        self.info = {"pid": pid, "name": name}
+
+
+def _table(monkeypatch, names):
+    import psutil
+    from halo_core.skills.app_index import ProcessTable
+
+    procs = [_FakeProc(1000 + i, n) for i, n in enumerate(names)]
+    monkeypatch.setattr(psutil, "process_iter", lambda attrs=None: iter(procs))
+    return ProcessTable(ttl=60)
+
+
+def test_process_table_never_matches_shells_or_interpreters(monkeypatch):
+    from halo_core.skills.app_index import CLOSE_MIN_SCORE
+
+    table = _table(monkeypatch, ["bash", "python3", "pythonw.exe", "env", "flatpak", "notepad.exe", "firefox"])
+    assert table.match("bash", exe="bash") == {}
+    assert table.match("python", exe="python3") == {}
+    assert table.match("bass") == {}          # used to fuzzy-match bash
+    assert table.match("flatpak", exe="flatpak") == {}
+    assert table.match("notes", min_score=CLOSE_MIN_SCORE) == {}
+    assert table.match("notepad", min_score=CLOSE_MIN_SCORE) == {"notepad.exe": [1005]}
+    assert table.match("whatever", exe="firefox") == {"firefox": [1006]}
+
+
+def test_close_app_requires_a_confident_match(tmp_path, monkeypatch):
+    import psutil
+    from halo_core.skills import apps as apps_mod
+
+    apps, index = _index(tmp_path)
+    _write(apps, "notepad.desktop", "Notepad", "notepad.exe")
+    _write(apps, "obsidian.desktop", "Obsidian", "flatpak run md.obsidian.Obsidian")
+    index.refresh()
+    table = _table(monkeypatch, ["notepad.exe", "bash", "flatpak", "obsidian"])
+    terminated = []
+
+    class _Proc:
+        def __init__(self, pid):
+            self.pid = pid
+
+        def terminate(self):
+            terminated.append(self.pid)
+
+    monkeypatch.setattr(apps_mod, "get_app_index", lambda: index)
+    monkeypatch.setattr(apps_mod, "get_process_table", lambda: table)
+    monkeypatch.setattr(psutil, "Process", _Proc)
+    monkeypatch.setattr(psutil, "wait_procs", lambda procs, timeout=None: (procs, []))
+
+    assert "isn't even running" in apps_mod.close_app("notes")
+    assert "isn't even running" in apps_mod.close_app("bass")
+    assert terminated == []
+
+    assert "closed obsidian" in apps_mod.close_app("obsidian")   # flatpak exe -> falls back to the app name
+    assert terminated == [1003]
+    apps_mod.close_app("notepad")
+    assert terminated == [1003, 1000]
+
+
+def test_periodic_rescan_waits_while_the_machine_is_busy(tmp_path, monkeypatch):
+    import halo_core.skills.app_index as app_index_mod
+    import halo_core.skills.monitoring as mon
+
+    _, index = _index(tmp_path)
+    busy = {"now": True}
+    monkeypatch.setattr(mon, "machine_busy", lambda **kw: busy["now"])
+    refreshes = []
+    real_refresh = index.refresh
+    monkeypatch.setattr(index, "refresh", lambda force=False: refreshes.append(1) or real_refresh(force))
+
+    index.maybe_refresh()                 # first load always happens
+    assert refreshes == [1]
+    monkeypatch.setattr(app_index_mod, "REFRESH_INTERVAL_S", -1.0)
+    index.maybe_refresh()
+    assert refreshes == [1]               # due, but deferred
+    busy["now"] = False
+    index.maybe_refresh()
+    assert refreshes == [1, 1]
@@ -0,0 +1,215 @@
+# tests/cache_test.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+import halo_core.skills.cache as cache_mod
+from halo_core.skills.cache import CachePolicy, ResultCache
+from halo_core.skills.registry import SkillSpec
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(cache_mod.time, "monotonic", c)
+    return c
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    c = ResultCache(max_entries=3)
+    monkeypatch.setattr(cache_mod.ResultCache, "_instance", c)
+    return c
+
+
+def _counter():
+    calls = []
+
+    def compute(value="v"):
+        calls.append(value)
+        return f"{value}#{len(calls)}"
+    return calls, compute
+
+
+def test_policy_from_entry():
+    assert CachePolicy.from_entry(None) is None
+    assert CachePolicy.from_entry(5).ttl == 5.0
+    assert CachePolicy.from_entry({"ttl": 2, "key": "lower"}).key(" Foo  BAR ") == "foo bar"
+    with pytest.raises(ValueError):
+        CachePolicy.from_entry({"ttl": 2, "key": "nope"})
+
+
+def test_ttl_expiry(cache, clock):
+    calls, compute = _counter()
+    policy = CachePolicy(ttl=5)
+    assert cache.get_or_call("status", None, policy, compute) == "v#1"
+    clock.now += 4.9
+    assert cache.get_or_call("status", None, policy, compute) == "v#1"
+    clock.now += 0.2
+    assert cache.get_or_call("status", None, policy, compute) == "v#2"
+    assert len(calls) == 2
+
+
+def test_lru_bound_evicts_least_recently_used(cache, clock):
+    policy = CachePolicy(ttl=60)
+    calls, compute = _counter()
+    for t in ("a", "b", "c"):
+        cache.get_or_call("lookup", t, policy, lambda t=t: compute(t))
+    cache.get_or_call("lookup", "a", policy, lambda: compute("a"))       # touch a
+    cache.get_or_call("lookup", "d", policy, lambda: compute("d"))       # evicts b
+    assert cache.stats()["_size"]["entries"] == 3
+    cache.get_or_call("lookup", "a", policy, lambda: compute("a"))
+    cache.get_or_call("lookup", "b", policy, lambda: compute("b"))
+    assert calls == ["a", "b", "c", "d", "b"]
+    assert cache.stats()["lookup"]["evictions"] == 2
+
+
+def test_single_flight_coalesces_concurrent_callers(cache):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "shared"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_call("s", None, CachePolicy(60), slow)))
+               for _ in range(5)]
+    threads[0].start()
+    started.wait(2)
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(2)
+    assert results == ["shared"] * 5 and calls == [1]
+    s = cache.stats()["s"]
+    assert s["misses"] == 1 and s["coalesced"] == 4 and s["hit_rate"] == pytest.approx(0.8)
+
+
+def test_errors_reach_waiters_and_are_not_cached(cache):
+    started, release = threading.Event(), threading.Event()
+
+    def boom():
+        started.set()
+        release.wait(2)
+        raise RuntimeError("down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_call("s", None, CachePolicy(60), boom)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    first = threading.Thread(target=call)
+    first.start()
+    started.wait(2)
+    second = threading.Thread(target=call)
+    second.start()
+    time.sleep(0.05)
+    release.set()
+    first.join(2)
+    second.join(2)
+    assert errors == ["down", "down"]
+    assert cache.get_or_call("s", None, CachePolicy(60), lambda: "ok") == "ok"
+
+
+def test_invalidation_and_stats(cache, clock):
+    policy = CachePolicy(ttl=60)
+    calls, compute = _counter()
+    cache.get_or_call("status", None, policy, compute)
+    cache.get_or_call("volume", None, policy, compute)
+    cache.get_or_call("status", None, policy, compute)
+    cache.invalidate(["status"])
+    cache.get_or_call("status", None, policy, compute)
+    cache.get_or_call("volume", None, policy, compute)
+    assert len(calls) == 3
+    cache.invalidate()
+    cache.get_or_call("volume", None, policy, compute)
+    assert len(calls) == 4
+
+    s = cache.stats()
+    assert s["status"] == {"misses": 2, "hits": 1, "invalidations": 2, "hit_rate": pytest.approx(1 / 3)}
+    assert s["volume"]["hits"] == 1 and s["volume"]["misses"] == 2 and s["volume"]["invalidations"] == 1
+
+
+def test_async_lane_uses_the_cache_and_coalesces(cache):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "page"
+
+    async def run():
+        policy = CachePolicy(60)
+        first = await asyncio.gather(*(cache.aget_or_call("web", "x", policy, fetch) for _ in range(3)))
+        again = await cache.aget_or_call("web", "x", policy, fetch)
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first == ["page"] * 3 and again == "page" and calls == [1]
+    s = cache.stats()["web"]
+    assert s["misses"] == 1 and s["coalesced"] == 2 and s["hits"] == 1
+
+
+def _spec(func, **kw):
+    spec = SkillSpec(action=kw.pop("action", "act"), module="m", function="f", entry={}, **kw)
+    spec.func = func
+    spec.accepts_target = True
+    spec.is_async = asyncio.iscoroutinefunction(func)
+    return spec
+
+
+def test_spec_invalidates_even_when_the_skill_raises(cache):
+    calls, compute = _counter()
+    status = _spec(lambda target=None: compute(), action="check_status", cache=CachePolicy(60))
+    status.call(None)
+
+    def close_everything(target=None):
+        raise RuntimeError("closed half the apps, then failed")
+
+    closer = _spec(close_everything, action="close_all_apps", invalidates=["check_status"])
+    with pytest.raises(RuntimeError):
+        closer.call(None)
+    status.call(None)
+    assert len(calls) == 2
+
+
+def test_async_spec_goes_through_cache_and_invalidation(cache):
+    calls = []
+
+    async def search(q):
+        calls.append(q)
+        return f"results for {q}"
+
+    async def clear(target=None):
+        return "cleared"
+
+    searcher = _spec(search, action="search", cache=CachePolicy(60, key=cache_mod.KEY_FUNCS["lower"]))
+    clearer = _spec(clear, action="clear", invalidates=["search"])
+    assert searcher.runner == searcher.acall and clearer.runner == clearer.acall
+
+    async def run():
+        await searcher.runner("Cats")
+        await searcher.runner("cats ")
+        await clearer.runner(None)
+        await searcher.runner("cats")
+
+    asyncio.run(run())
+    assert calls == ["Cats", "cats"]
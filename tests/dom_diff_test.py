@@ -0,0 +1,85 @@
+# tests/dom_diff_test.py
+from halo_core.skills.dom_diff import DomDiffer, install, parse_tree
+
+NAV = "\n".join(f"\t[{i}]<a>Nav link {i} />" for i in range(1, 30))
+ARTICLE = "\n".join(f"\tParagraph {i} of the article body, long enough to matter." for i in range(40))
+
+
+def _page(extra="", shift=0):
+    header = "[0]<div>Header />\n" + "\n".join(
+        f"\t[{i + shift}]<a>Nav link {i} />" for i in range(1, 30))
+    return f"{header}\n<main>\n{ARTICLE}\n{extra}"
+
+
+def test_subtree_hashes_ignore_indices():
+    a = parse_tree("[1]<div>x />\n\t[2]<a>y />")
+    b = parse_tree("[7]<div>x />\n\t[9]<a>y />")
+    assert a[0].digest == b[0].digest
+    assert parse_tree("[1]<div>x />\n\t[2]<a>z />")[0].digest != a[0].digest
+
+
+def test_same_page_sends_only_changes():
+    differ = DomDiffer()
+    first = differ.render("https://ex.com/a", _page())
+    assert first == _page()
+
+    step2 = _page(extra="\t[99]<button>Load more />", shift=1)
+    out = differ.render("https://ex.com/a#comments", step2)
+    assert "[99]<button>Load more />" in out
+    assert "Paragraph 3" not in out  # unchanged text is not resent
+    assert "[5]<a>Nav link 4" in out  # unchanged elements keep their current index
+    s = differ.steps[-1]
+    assert s["mode"] == "diff" and s["sent_tokens"] < s["full_tokens"] / 2
+
+
+def test_navigation_sends_full_state():
+    differ = DomDiffer()
+    differ.render("https://ex.com/a", _page())
+    assert differ.render("https://ex.com/b", _page()) == _page()
+    assert differ.steps[-1]["mode"] == "full"
+
+
+def test_mostly_changed_page_sends_full_state():
+    differ = DomDiffer(max_changed=0.5)
+    differ.render("https://ex.com/a", _page())
+    other = "\n".join(f"[{i}]<p>Totally new {i} />" for i in range(50))
+    assert differ.render("https://ex.com/a", other) == other
+
+
+class _Tree:
+    def __init__(self, text):
+        self.text = text
+
+    def clickable_elements_to_string(self, include_attributes=None):
+        return self.text
+
+
+class _State:
+    def __init__(self, url, text):
+        self.url, self.element_tree = url, _Tree(text)
+
+
+class _Manager:
+    def __init__(self):
+        self.sent = []
+
+    def add_state_message(self, state, result=None, step_info=None, use_vision=True):
+        self.sent.append(state.element_tree.clickable_elements_to_string(include_attributes=["title"]))
+        self.sent.append(state.element_tree.clickable_elements_to_string(include_attributes=["title"]))
+
+
+class _Agent:
+    def __init__(self):
+        self.message_manager = _Manager()
+
+
+def test_install_wraps_agent_state_messages():
+    agent, differ = _Agent(), DomDiffer()
+    assert install(agent, differ)
+    agent.message_manager.add_state_message(_State("https://ex.com/a", _page()))
+    agent.message_manager.add_state_message(_State("https://ex.com/a", _page(extra="\t[99]<b>new />")))
+    sent = agent.message_manager.sent
+    assert sent[0] == _page() and sent[1] == sent[0]  # same state serialized twice -> one render
+    assert sent[2].startswith("[Same page") and sent[3] == sent[2]
+    assert [s["mode"] for s in differ.steps] == ["full", "diff"]
+    assert not install(object(), differ)
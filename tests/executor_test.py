@@ -0,0 +1,184 @@
+# tests/executor_test.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+import halo_core.skills.executor as executor_mod
+from halo_core.skills.executor import SkillExecutor, current_job, report_progress
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    ex = SkillExecutor(max_workers=2)
+    monkeypatch.setattr(executor_mod.SkillExecutor, "_instance", ex)   # report_progress() goes through it
+    yield ex
+    ex.shutdown()
+
+
+def _settled(job, timeout=1.0):
+    """Wait until listeners have seen the job's final event (done-callbacks run after them)."""
+    fired = threading.Event()
+    job.add_done_callback(lambda j: fired.set())
+    return fired.wait(timeout)
+
+
+@pytest.fixture
+def events(executor):
+    seen = []
+    executor.subscribe(lambda e: seen.append((e.kind, e.job.action, e.message)))
+    return seen
+
+
+def test_quick_job_answers_inline(executor, events):
+    job = executor.submit("quick", lambda x: x * 2, 21)
+    assert executor.wait_inline(job, 1.0) and _settled(job)
+    assert job.status == "done" and job.result == 42 and not job.background
+    assert events == [("done", "quick", None)]
+
+
+def test_slow_job_is_backgrounded_and_still_completes(executor, events):
+    release = threading.Event()
+    job = executor.submit("slow", lambda: release.wait(2) and "finished")
+    assert not executor.wait_inline(job, 0.05)
+    assert job.background and not job.done and executor.jobs(active_only=True) == [job]
+    release.set()
+    assert _settled(job, 2) and job.result == "finished"
+    assert events == [("done", "slow", None)] and executor.jobs(active_only=True) == []
+
+
+def test_failure_is_recorded(executor, events):
+    def boom():
+        raise ValueError("bad target")
+
+    job = executor.submit("boom", boom)
+    assert _settled(job) and job.status == "failed" and str(job.error) == "bad target"
+    assert events == [("failed", "boom", None)]
+
+
+def test_sync_timeout_emits_a_timeout_event_and_discards_the_late_result(executor, events):
+    release = threading.Event()
+    job = executor.submit("hang", lambda: release.wait(2) and "late", timeout=0.05)
+    assert _settled(job) and job.status == "timeout" and isinstance(job.error, TimeoutError)
+    release.set()
+    time.sleep(0.05)
+    assert job.status == "timeout" and job.result is None
+    assert events == [("timeout", "hang", None)]
+
+
+def test_async_timeout(executor, events):
+    async def hang():
+        await asyncio.sleep(2)
+
+    job = executor.submit("hang", hang, timeout=0.05)
+    assert _settled(job) and job.status == "timeout"
+    assert events == [("timeout", "hang", None)]
+
+
+def test_cancel_a_queued_job_before_it_runs(executor, events):
+    release = threading.Event()
+    ran = []
+    busy = [executor.submit(f"busy{i}", release.wait, 2) for i in range(2)]   # fills both workers
+    queued = executor.submit("queued", lambda: ran.append(1))
+    assert executor.cancel(queued.id)
+    assert queued.done and queued.status == "cancelled"
+    assert not executor.cancel(queued.id) and not executor.cancel("job-999")
+    release.set()
+    for job in busy:
+        job.wait(1)
+    time.sleep(0.02)
+    assert ran == [] and queued.status == "cancelled"
+    assert ("cancelled", "queued", None) in events
+
+
+def test_cancel_a_running_coroutine(executor, events):
+    started, cancelled = threading.Event(), threading.Event()
+
+    async def long():
+        started.set()
+        try:
+            await asyncio.sleep(2)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    job = executor.submit("long", long)
+    assert started.wait(1)
+    assert executor.cancel(job.id)
+    assert cancelled.wait(1) and job.status == "cancelled"
+    assert events == [("cancelled", "long", None)]
+
+
+def test_coroutines_run_on_the_asyncio_lane(executor):
+    seen = {}
+
+    async def skill(target):
+        seen["thread"] = threading.current_thread().name
+        seen["job"] = current_job()
+        await asyncio.sleep(0)
+        return f"opened {target}"
+
+    job = executor.submit("open", skill, "docs")
+    assert job.wait(1) and job.result == "opened docs"
+    assert seen == {"thread": "halo-skill-loop", "job": job}
+    sync = executor.submit("sync", lambda: threading.current_thread().name)
+    assert sync.wait(1) and sync.result.startswith("halo-skill") and sync.result != "halo-skill-loop"
+
+
+def test_report_progress_from_inside_a_skill(executor, events):
+    def skill():
+        report_progress("halfway")
+        report_progress("almost")
+        return "ok"
+
+    job = executor.submit("crawl", skill)
+    assert _settled(job)
+    assert events == [("progress", "crawl", "halfway"), ("progress", "crawl", "almost"), ("done", "crawl", None)]
+    assert job.progress == "almost"
+    report_progress("outside any job")   # no-op, no event
+    assert len(events) == 3
+
+
+def test_done_callbacks_fire_once_even_if_added_late(executor):
+    calls = []
+    job = executor.submit("quick", lambda: "x")
+    job.add_done_callback(lambda j: calls.append(("early", j.status)))
+    assert _settled(job)
+    job.add_done_callback(lambda j: calls.append(("late", j.status)))
+    assert calls == [("early", "done"), ("late", "done")]
+
+
+def test_only_the_newest_finished_jobs_are_kept():
+    ex = SkillExecutor(max_workers=2, keep_finished=2)
+    try:
+        release = threading.Event()
+        running = ex.submit("running", release.wait, 2)
+        finished = [ex.submit(f"quick{i}", lambda: None) for i in range(4)]
+        for job in finished:
+            assert _settled(job)
+        assert ex.jobs() == [running] + finished[-2:]         # active jobs are never evicted
+        assert ex.get(finished[0].id) is None and ex.get(finished[3].id) is finished[3]
+        release.set()
+        assert _settled(running)
+        assert ex.jobs() == [running, finished[3]] and ex.get(finished[2].id) is None
+    finally:
+        ex.shutdown()
+
+
+def test_get_instance_builds_one_executor_under_contention(monkeypatch):
+    monkeypatch.setattr(executor_mod.SkillExecutor, "_instance", None)
+    built = []
+
+    def slow_init(self, *args, **kwargs):
+        built.append(self)
+        time.sleep(0.01)     # widen the check-then-create window
+
+    monkeypatch.setattr(executor_mod.SkillExecutor, "__init__", slow_init)
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(SkillExecutor.get_instance())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(2)
+    assert len(built) == 1 and len(seen) == 8 and all(s is built[0] for s in seen)
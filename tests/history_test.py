@@ -0,0 +1,122 @@
+# tests/history_test.py
+import sqlite3
+import time
+
+import pytest
+
+from halo_core.history import (
+    DROPPED, ERROR, NO_SPEECH, CommandHistory, CommandRecord, main, normalize_utterance,
+)
+from halo_core.pipeline import CommandContext
+
+DAY = 86400.0
+
+
+@pytest.fixture
+def history(tmp_path):
+    h = CommandHistory(tmp_path / "history.db", retention_days=30, max_rows=1000, enabled=True)
+    yield h
+    h.close()
+
+
+def _rec(text, action, total_s, ago_s=0.0, **kw):
+    return CommandRecord(transcript=text, intents=[{"action": action, "target": None}] if action else [],
+                         total_s=total_s, timings={"stt": total_s / 3, "llm": total_s / 2},
+                         ts=time.time() - ago_s, **kw)
+
+
+def test_normalize_utterance():
+    assert normalize_utterance("  Open   Spotify! ") == normalize_utterance("open spotify") == "open spotify"
+    assert normalize_utterance("What's the time?") == "what's the time"
+
+
+def test_from_context_splits_parse_failure_out_of_meta():
+    ctx = CommandContext(text="open the thing", reply="Fine.", intents=[{"action": "open_app", "target": "x"}])
+    ctx.timings["llm"] = 1.25
+    ctx.meta.update(levels={"rms_dbfs": -30.0}, parse_error="JSONDecodeError: boom", llm_raw="not json")
+    rec = CommandRecord.from_context(ctx)
+    assert not rec.parse_ok and rec.error == "JSONDecodeError: boom" and rec.llm_raw == "not json"
+    assert rec.meta == {"levels": {"rms_dbfs": -30.0}} and rec.timings == {"llm": 1.25}
+    assert rec.command_id == ctx.id and rec.row()[6] == "open_app"
+
+    failed = CommandRecord.from_context(CommandContext(text="x"), ERROR, stage="think", error=ValueError("bad"))
+    assert failed.parse_ok and failed.stage == "think" and failed.error == "ValueError: bad"
+
+
+def test_writes_are_batched_off_thread_and_queryable(history):
+    history.record(_rec("open spotify", "open_app", 2.0))
+    history.record(_rec("Open Spotify!", "open_app", 1.0))
+    history.record(_rec("open spotify", "open_app", 1.5))
+    history.record(_rec("search the web for cats", "search_web", 9.0))
+    history.record(_rec("what's the weather", None, 4.0, ago_s=10 * DAY))   # outside "this week"
+    history.record(_rec("", None, 0.3, outcome=NO_SPEECH))
+    history.record(_rec("turn it up", None, 0.0, outcome=DROPPED))
+    history.record(_rec("blah", None, 3.0, parse_ok=False, error="JSONDecodeError: x", llm_raw="{oops"))
+    history.flush()
+
+    assert history.stats["written"] == 8 and history.stats["dropped"] == 0
+    slow = history.slowest(days=7, limit=3)
+    assert [r["transcript"] for r in slow] == ["search the web for cats", "blah", "open spotify"]
+    assert slow[0]["timings"] == {"stt": 3.0, "llm": 4.5}
+    assert [r["total_s"] for r in history.slowest(days=7, action="open_app")] == [2.0, 1.5, 1.0]
+
+    top = history.frequent_utterances(days=30, limit=2)
+    assert top[0] == {"utterance": "open spotify", "count": 3, "last_ts": pytest.approx(time.time(), abs=5),
+                      "avg_s": pytest.approx(1.5), "action": "open_app"}
+
+    fails = history.parse_failures(days=7)
+    assert [(f["transcript"], f["llm_raw"]) for f in fails] == [("blah", "{oops")]
+    assert history.counts(days=30) == {"ok": 6, NO_SPEECH: 1, DROPPED: 1}
+
+
+def test_store_is_wal_and_indexed(history):
+    history.record(_rec("hi", None, 1.0))
+    history.flush()
+    db = sqlite3.connect(str(history.db_path))
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"commands_ts", "commands_action", "commands_outcome", "commands_parse_failed"} <= indexes
+    plan = " ".join(r[3] for r in db.execute(
+        "EXPLAIN QUERY PLAN SELECT ts FROM commands WHERE parse_ok = 0 AND ts >= ?", (0,)))
+    assert "commands_parse_failed" in plan
+    db.close()
+
+
+def test_record_never_blocks_and_counts_overflow(tmp_path, monkeypatch):
+    import halo_core.history as mod
+    monkeypatch.setattr(mod, "QUEUE_MAX", 5)
+    h = CommandHistory(tmp_path / "h.db", enabled=True)
+    h._ensure_writer = lambda: None   # no writer: the queue can only fill up
+    t0 = time.perf_counter()
+    for i in range(50):
+        h.record(_rec(f"cmd {i}", None, 1.0))
+    assert time.perf_counter() - t0 < 0.1
+    assert h.stats["queued"] == 5 and h.stats["dropped"] == 45
+
+
+def test_compaction_applies_age_and_row_cap(tmp_path):
+    h = CommandHistory(tmp_path / "h.db", retention_days=7, max_rows=5, enabled=True)
+    for i in range(8):
+        h.record(_rec(f"new {i}", None, 1.0, ago_s=i))
+    for i in range(3):
+        h.record(_rec(f"old {i}", None, 1.0, ago_s=30 * DAY))
+    h.flush()
+    assert h.compact() == 6
+    assert sorted(r["transcript"] for r in h.recent(50)) == [f"new {i}" for i in range(3, 8)]
+    h.close()
+
+
+def test_cli(history, capsys):
+    history.record(_rec("open spotify", "open_app", 2.0))
+    history.record(_rec("blah", None, 3.0, parse_ok=False, error="JSONDecodeError: x", llm_raw="{oops"))
+    history.flush()
+    db = history.db_path
+
+    assert main(["--db", str(db), "slowest", "--days", "7"]) == 0
+    out = capsys.readouterr().out
+    assert "open spotify" in out and "open_app" in out and "2.00s" in out
+    main(["--db", str(db), "frequent"])
+    assert "1x" in capsys.readouterr().out
+    main(["--db", str(db), "failures"])
+    out = capsys.readouterr().out
+    assert "JSONDecodeError" in out and "{oops" in out
@@ -0,0 +1,112 @@
+# tests/hud_test.py
+import os
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PySide6.QtWidgets import QApplication
+
+from halo_core.ui.hud import FRAME_MS, HUD
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def hud(app):
+    widget = HUD()
+    widget.show()
+    _pump(app, 30)
+    yield widget
+    widget.close()
+    widget.deleteLater()
+    _pump(app, 5)
+
+
+def _pump(app, ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def test_burst_is_coalesced_to_frames(app, hud):
+    before = hud.stats.snapshot()
+    t0 = time.perf_counter()
+    for i in range(300):
+        hud.set_text(f"partial transcript {i}")
+    _pump(app, 4 * FRAME_MS)
+    frames_elapsed = (time.perf_counter() - t0) * 1000 / FRAME_MS
+    s = hud.stats.snapshot()
+
+    assert hud.label.text() == "partial transcript 299"  # the latest text always lands
+    assert s["requests"] - before["requests"] == 300
+    assert s["updates"] - before["updates"] <= frames_elapsed + 1
+    assert s["layouts"] == before["layouts"]  # one line before and after: no relayout
+
+
+def test_layout_only_when_line_count_changes(app, hud):
+    hud.set_text("short")
+    _pump(app, 2 * FRAME_MS)
+    layouts, height = hud.stats.layouts, hud.height()
+
+    hud.set_text("also short")
+    _pump(app, 2 * FRAME_MS)
+    assert hud.stats.layouts == layouts and hud.height() == height
+
+    hud.set_text("long reply " * 120)
+    _pump(app, 2 * FRAME_MS)
+    assert hud.stats.layouts == layouts + 1 and hud.height() > height
+
+
+def test_shadow_is_cached_and_paint_is_counted(app, hud):
+    renders = hud.stats.shadow_renders
+    frames = hud.stats.frames
+    for i in range(5):
+        hud.set_text(f"tick {i}")
+        hud.repaint()
+    s = hud.stats.snapshot()
+    assert s["frames"] >= frames + 5
+    assert s["shadow_renders"] == renders
+    assert s["paint_s"] > 0 and s["avg_paint_ms"] > 0
+
+
+def test_stream_batches_appends_from_another_thread(app, hud):
+    updates = hud.stats.updates
+    hud.begin_stream("Halo: ", accent="#57D38C")
+    words = [f"w{i} " for i in range(200)]
+    worker = threading.Thread(target=lambda: [hud.append(w) for w in words])
+    worker.start()
+    while worker.is_alive():
+        _pump(app, 2)
+    _pump(app, 3 * FRAME_MS)
+    assert hud.streaming
+    assert hud.label.text() == "Halo: " + "".join(words)
+    assert hud.stats.updates - updates < 50  # batched, not one update per token
+    assert not hud._autohide_timer.isActive()  # no autohide while streaming
+
+    hud.end_stream(autohide_ms=1500)
+    _pump(app, 2 * FRAME_MS)
+    assert not hud.streaming
+    assert hud._autohide_timer.isActive() and hud._autohide_timer.interval() == 1500
+    assert hud.label.text() == "Halo: " + "".join(words)
+
+
+def test_stream_relayouts_only_when_wrapping_changes(app, hud):
+    hud.begin_stream("You said: ")
+    _pump(app, 2 * FRAME_MS)
+    layouts = hud.stats.layouts
+    for ch in "hello there":
+        hud.append(ch)
+        _pump(app, FRAME_MS + 2)
+    assert hud.stats.layouts == layouts  # still one line
+    hud.append(" and more" * 40)
+    _pump(app, 2 * FRAME_MS)
+    assert hud.stats.layouts > layouts
+    hud.end_stream("You said: done", autohide_ms=0)
+    _pump(app, 2 * FRAME_MS)
+    assert hud.label.text() == "You said: done" and not hud._autohide_timer.isActive()
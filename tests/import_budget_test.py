@@ -0,0 +1,52 @@
+# tests/import_budget_test.py
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Cold import budget for the skill router (seconds); override on slow machines.
+IMPORT_BUDGET_S = float(os.getenv("HALO_IMPORT_BUDGET_S", "0.5"))
+
+# Nothing on the plain dispatch path should drag these in.
+HEAVY_MODULES = ["browser_use", "playwright", "langchain_core", "PySide6", "psutil"]
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"elapsed": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _cold_import(module: str) -> dict:
+    """Import `module` in a fresh interpreter and report time + heavy modules loaded."""
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_skills_import_within_budget():
+    result = _cold_import("halo_core.skills")
+    assert result["heavy"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_S, (
+        f"import halo_core.skills took {result['elapsed']:.3f}s (budget {IMPORT_BUDGET_S}s)"
+    )
+
+
+def test_web_skill_module_defers_browser_use():
+    result = _cold_import("halo_core.skills.web")
+    assert "browser_use" not in result["heavy"]
+    assert "playwright" not in result["heavy"]
+    assert result["elapsed"] < IMPORT_BUDGET_S
+
+
+if __name__ == "__main__":
+    for mod in ("halo_core.skills", "halo_core.skills.web"):
+        print(mod, _cold_import(mod))
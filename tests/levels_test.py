@@ -0,0 +1,94 @@
+# tests/levels_test.py
+import math
+import os
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+
+from halo_core.voice.levels import LevelMeter, block_stats, dbfs
+
+RATE = 16000
+
+
+def _tone(seconds: float, amplitude: float, freq: float = 440.0) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return np.round(amplitude * 32767 * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def _blocks(pcm: np.ndarray, size: int):
+    for i in range(0, len(pcm), size):
+        yield pcm[i:i + size].tobytes()
+
+
+def test_block_stats_match_reference():
+    pcm = np.array([0, 16384, -16384, 32767, -32768, 100], dtype=np.int16)
+    s = block_stats(pcm.tobytes(), clip_level=0.99)
+    ref = [v / 32768 for v in pcm.tolist()]
+    assert s.samples == 6
+    assert s.sum_squares == pytest.approx(sum(v * v for v in ref), rel=1e-5)
+    assert s.peak == pytest.approx(1.0)  # -32768 doesn't wrap
+    assert s.clipped == 2
+    assert block_stats(b"").samples == 0
+
+
+@pytest.mark.parametrize("block", [128, 512, 1000])
+def test_publishes_about_30_hz_regardless_of_block_size(block):
+    published = []
+    meter = LevelMeter(lambda rms, peak: published.append((rms, peak)), sample_rate=RATE, rate_hz=30)
+    for data in _blocks(_tone(2.0, 0.5), block):
+        meter.feed(data)
+    per_second = len(published) / 2.0
+    assert 0.9 * min(30, RATE / block) <= per_second <= 31
+    rms, peak = published[-1]
+    assert rms == pytest.approx(0.5 / math.sqrt(2), rel=0.02)
+    assert peak == pytest.approx(0.5, rel=0.01)
+
+
+def test_summary_tells_silence_quiet_clipping_and_overflow_apart():
+    silent = LevelMeter(sample_rate=RATE)
+    for data in _blocks(np.zeros(RATE, dtype=np.int16), 512):
+        silent.feed(data)
+    assert silent.summary()["silent"] and silent.summary()["quiet"]
+
+    quiet = LevelMeter(sample_rate=RATE)
+    for data in _blocks(_tone(1.0, 0.001), 512):
+        quiet.feed(data)
+    assert not quiet.summary()["silent"] and quiet.summary()["quiet"]
+
+    loud = LevelMeter(sample_rate=RATE)
+    for i, data in enumerate(_blocks(np.clip(_tone(1.0, 1.5), -32768, 32767).astype(np.int16), 512)):
+        loud.feed(data, overflow=(i == 3))
+    s = loud.summary()
+    assert not s["quiet"] and s["clipped"] > 0 and s["overflows"] == 1
+    assert s["seconds"] == 1.0 and s["peak_dbfs"] == pytest.approx(dbfs(32767 / 32768), abs=0.1)
+
+
+def test_hud_level_bar_coalesces_updates_from_audio_thread():
+    from PySide6.QtWidgets import QApplication
+    from halo_core.ui.hud import HUD, LEVEL_HOLD_MS
+
+    app = QApplication.instance() or QApplication([])
+    hud = HUD()
+    hud.show()
+    meter = LevelMeter(hud.set_level, sample_rate=RATE, rate_hz=1000)  # far faster than the UI drains
+    worker = threading.Thread(target=lambda: [meter.feed(d) for d in _blocks(_tone(1.0, 0.3), 16)])
+    worker.start()
+    while worker.is_alive():
+        app.processEvents()
+    app.processEvents()
+
+    assert meter.published >= 900
+    assert 0 < hud.stats.levels < meter.published  # one queued update at a time
+    assert hud.level_bar.isVisible()
+    assert hud.level_bar.peak == pytest.approx(0.3, rel=0.05)
+
+    end = time.perf_counter() + (LEVEL_HOLD_MS + 100) / 1000
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.005)
+    assert not hud.level_bar.isVisible()
+    hud.close()
@@ -0,0 +1,124 @@
+# tests/monitoring_test.py
+import collections
+import threading
+import time
+
+import pytest
+
+import halo_core.skills.monitoring as mon
+from halo_core.skills.monitoring import MetricsSampler, RingBuffer
+
+VM = collections.namedtuple("VM", "total used available percent")
+Disk = collections.namedtuple("Disk", "total used free")
+
+
+@pytest.fixture
+def fake_psutil(monkeypatch):
+    """Deterministic psutil/shutil readings; `state` controls what the next sample sees."""
+    state = {"cpu": 10.0, "mem": 40.0, "calls": 0, "disk_reads": 0}
+
+    def disk_usage(path):
+        state["disk_reads"] += 1
+        return Disk(1000 << 30, 250 << 30, 750 << 30)
+
+    def cpu_percent(interval=None, percpu=False):
+        if percpu:
+            return [state["cpu"]] * 2
+        state["calls"] += 1
+        time.sleep(0.001)   # widen the window for concurrent samples
+        return state["cpu"]
+
+    monkeypatch.setattr(mon.psutil, "cpu_count", lambda logical=True: 2)
+    monkeypatch.setattr(mon.psutil, "cpu_percent", cpu_percent)
+    monkeypatch.setattr(mon.psutil, "virtual_memory", lambda: VM(16 << 30, 4 << 30, 12 << 30, state["mem"]))
+    monkeypatch.setattr(mon.psutil, "pids", lambda: list(range(123)))
+    monkeypatch.setattr(mon.shutil, "disk_usage", disk_usage)
+    return state
+
+
+def _rows(sampler, *rows):
+    """Inject (seconds_ago, cpu, mem) rows straight into the history."""
+    now = time.time()
+    for ago, cpu, mem in rows:
+        sampler._rows.append((now - ago, cpu, mem, 25.0, 100))
+
+
+def test_ring_buffer_wraps_around():
+    ring = RingBuffer(3, width=1)
+    assert len(ring) == 0 and ring.latest() is None and ring.last(2).shape == (0, 1)
+    for v in range(1, 6):
+        ring.append(v)
+    assert len(ring) == 3 and ring.latest()[0] == 5
+    assert ring.last(10)[:, 0].tolist() == [3, 4, 5]    # oldest first, capped at capacity
+    assert ring.last(2)[:, 0].tolist() == [4, 5]
+    snapshot = ring.last(3)
+    ring.append(6)
+    assert snapshot[:, 0].tolist() == [3, 4, 5]          # last() returns a copy
+
+
+def test_trend_windows_and_peak(fake_psutil):
+    sampler = MetricsSampler(interval=1.0, history_s=900)
+    _rows(sampler, (800, 90.0, 50.0), (200, 50.0, 50.0), (30, 20.0, 60.0), (10, 10.0, 70.0))
+    trend = sampler.trend("cpu")
+    assert trend == {"1m": 15.0, "5m": pytest.approx(26.7, abs=0.05), "15m": 42.5, "peak_15m": 90.0}
+    assert sampler.trend("mem")["1m"] == 65.0
+    assert sampler.average("cpu", 60) == pytest.approx(15.0)
+    assert MetricsSampler(interval=1.0).trend("cpu") == {"1m": None, "5m": None, "15m": None, "peak_15m": None}
+
+
+def test_is_busy_uses_the_recent_window(fake_psutil):
+    sampler = MetricsSampler(interval=1.0)
+    assert not sampler.is_busy()
+    _rows(sampler, (120, 99.0, 40.0), (20, 30.0, 40.0), (5, 40.0, 40.0))
+    assert not sampler.is_busy(seconds=30)               # the spike is outside the window
+    _rows(sampler, (1, 95.0, 40.0), (0, 99.0, 40.0))
+    assert sampler.is_busy(cpu_threshold=50, seconds=30)
+    _rows(sampler, (0, 5.0, 95.0))
+    assert sampler.is_busy(cpu_threshold=100, seconds=30) is False
+    assert sampler.is_busy(cpu_threshold=100, mem_threshold=50, seconds=30)
+
+
+def test_concurrent_samples_do_not_lose_ticks(fake_psutil):
+    sampler = MetricsSampler(interval=1.0)
+    threads = [threading.Thread(target=lambda: [sampler.sample() for _ in range(20)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert sampler._ticks == 80 and sampler.samples == 80
+    assert fake_psutil["disk_reads"] == len(range(0, 80, mon.DISK_EVERY))   # every DISK_EVERY-th tick, no doubles
+    assert sampler.latest()["disk"].total == 1000 << 30
+
+
+def test_check_status_answers_from_the_sampler(fake_psutil, monkeypatch):
+    sampler = MetricsSampler(interval=1.0)
+    sampler.drive = "C:"
+    monkeypatch.setattr(mon, "_sampler", sampler)
+    monkeypatch.setattr(MetricsSampler, "start", lambda self: self)
+
+    first = mon.check_status()                           # nothing sampled yet: one blocking sample
+    assert fake_psutil["calls"] == 1 and sampler.samples == 1
+    assert "CPU avg" not in first["summary"]
+
+    fake_psutil["cpu"] = 30.0
+    sampler.sample()
+    result = mon.check_status()
+    assert fake_psutil["calls"] == 2                     # answered from history, no new sample
+    status = result["status"]
+    assert status["cpu_percent"] == 30.0 and status["per_core"] == [30.0, 30.0]
+    assert status["mem"] == {"total": "16.0 GB", "used": "4.0 GB", "available": "12.0 GB", "percent": 40.0}
+    assert status["disk"] == {"drive": "C:", "total": "1000.0 GB", "used": "250.0 GB", "free": "750.0 GB"}
+    assert status["processes"] == 123 and status["trend"]["cpu"]["1m"] == 20.0
+    assert result["summary"] == ("CPU 30% • RAM 40% (4.0 GB/16.0 GB) • Disk C: 250.0 GB/1000.0 GB "
+                                 "free 750.0 GB • 123 processes • CPU avg 20/20/20% (1/5/15m), peak 30%")
+
+
+def test_machine_busy_never_starts_the_sampler(fake_psutil, monkeypatch):
+    monkeypatch.setattr(mon, "_sampler", None)
+    assert mon.machine_busy() is False and mon._sampler is None
+    sampler = MetricsSampler(interval=1.0)
+    _rows(sampler, (0, 99.0, 40.0))
+    monkeypatch.setattr(mon, "_sampler", sampler)
+    assert mon.machine_busy() is False                   # not running: no opinion
+    monkeypatch.setattr(MetricsSampler, "running", property(lambda self: True))
+    assert mon.machine_busy() is True
@@ -0,0 +1,54 @@
+# tests/notifications_test.py
+import threading
+
+from halo_core.skills import notifications
+from halo_core.skills.notifications import LOW, URGENT, NotificationService
+
+
+def _service(**kwargs):
+    svc = NotificationService(native=False, **kwargs)
+    batches = []
+    got = threading.Event()
+
+    def sink(batch, pending):
+        batches.append([n.text() for n in batch])
+        got.set()
+
+    svc.add_sink("test", sink)
+    return svc, batches, got
+
+
+def test_coalesces_duplicates_and_replaces_keyed_updates():
+    svc, batches, got = _service()
+    svc.start()
+    for _ in range(4):
+        svc.notify("disk almost full", source="monitor")
+    for i in range(3):
+        svc.notify(f"step {i}", source="jobs", key="job-1", priority=LOW)
+    assert got.wait(3)
+    svc.stop()
+    assert batches[0] == ["disk almost full ×4", "step 2"]
+    assert svc.stats()["coalesced"] == 5
+
+
+def test_rate_limit_and_bounded_queue(monkeypatch):
+    monkeypatch.setattr(notifications, "RATE_BURST", 2.0)
+    svc, _, _ = _service(max_pending=2)  # not started: everything stays pending
+    assert svc.notify("a", source="spam")
+    assert svc.notify("b", source="spam")
+    assert not svc.notify("c", source="spam")            # bucket empty
+    assert svc.notify("urgent", source="x", priority=URGENT)  # evicts a lower item
+    assert not svc.notify("low", source="y", priority=LOW)    # lowest: dropped itself
+    stats = svc.stats()
+    assert (stats["rate_limited"], stats["dropped"], stats["queue_depth"]) == (1, 2, 2)
+
+
+def test_urgent_preempts_the_batch_window(monkeypatch):
+    monkeypatch.setattr(notifications, "BATCH_WINDOW_S", 5.0)
+    svc, batches, got = _service()
+    svc.start()
+    svc.notify("normal")
+    svc.notify("fire!", priority=URGENT)
+    assert got.wait(1)
+    svc.stop()
+    assert batches[0] == ["fire!"]
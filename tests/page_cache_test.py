@@ -0,0 +1,168 @@
+# tests/page_cache_test.py
+import http.server
+import threading
+
+import pytest
+
+import halo_core.skills.page_cache as page_cache_mod
+from halo_core.skills.page_cache import PageCache, decode_body, normalize_url, read_capped
+
+PAGE = (b"<html><head><title>Stub</title><script>var x = 1;</script></head>"
+        b"<body><h1>Hello</h1><p>Cached <b>page</b> body.</p></body></html>")
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    requests = []
+    cache_control = "max-age=0"
+    bodies = {}     # path -> (Content-Type, body) overriding the default page
+
+    def do_GET(self):
+        _Handler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Cache-Control", _Handler.cache_control)
+            self.end_headers()
+            return
+        ctype, body = _Handler.bodies.get(self.path, ("text/html; charset=utf-8", PAGE))
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Cache-Control", _Handler.cache_control)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    _Handler.requests = []
+    _Handler.cache_control = "max-age=0"
+    _Handler.bodies = {}
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443/a?b=2&utm_source=x&a=1#frag") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("example.com") == "https://example.com/"
+
+
+def test_revalidates_with_etag_and_serves_fresh_hits(tmp_path, base_url):
+    cache = PageCache(tmp_path / "pages.db")
+    first = cache.fetch(base_url + "/page?utm_source=feed")
+    assert first.source == "network"
+    assert first.title == "Stub"
+    assert first.text == "Hello\nCached page body."
+
+    again = cache.fetch(base_url + "/page")          # stale (max-age=0): conditional GET
+    assert again.source == "revalidated"
+    assert again.text == first.text
+    assert _Handler.requests[-1] == ("/page", '"v1"')
+
+    _Handler.cache_control = "max-age=600"
+    cache.fetch(base_url + "/other")
+    n = len(_Handler.requests)
+    assert cache.fetch(base_url + "/other").source == "cache"
+    assert len(_Handler.requests) == n                # fresh hit: no request at all
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path, base_url):
+    cache = PageCache(tmp_path / "pages.db")
+    cache.fetch(base_url + "/a")
+    one = cache.size_bytes()
+    cache.max_bytes = one * 2
+    cache.fetch(base_url + "/b")
+    cache.fetch(base_url + "/a")                      # touch /a
+    cache.fetch(base_url + "/c")                      # evicts /b
+    assert cache.stats["evictions"] == 1
+    assert cache.size_bytes() <= cache.max_bytes
+
+
+def test_summary_memoized_per_content_and_model(tmp_path, base_url):
+    cache = PageCache(tmp_path / "pages.db")
+    calls = []
+
+    def summarize(page):
+        calls.append(page.url)
+        return "- hello"
+
+    for path in ("/x", "/y"):                         # same content, different URLs
+        page = cache.fetch(base_url + path)
+        assert cache.summarize(page, "model-a", summarize) == "- hello"
+    cache.summarize(page, "model-b", summarize)
+    assert len(calls) == 2
+
+
+def test_failed_summary_is_not_stored(tmp_path, base_url):
+    from halo_core.skills.summarize import SummaryError
+
+    cache = PageCache(tmp_path / "pages.db")
+    page = cache.fetch(base_url + "/x")
+    outcomes = [SummaryError("ollama timed out"), None, "- real summary"]
+    calls = []
+
+    def summarize(page):
+        calls.append(page.url)
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    with pytest.raises(SummaryError):
+        cache.summarize(page, "m", summarize)
+    assert cache.summarize(page, "m", summarize) is None
+    assert cache.summary(page.content_hash, "m") is None
+    assert cache.summarize(page, "m", summarize) == "- real summary"
+    assert cache.summarize(page, "m", summarize) == "- real summary"
+    assert len(calls) == 3
+
+
+def test_charset_comes_from_header_then_meta():
+    cafe = "<p>Caf\u00e9 \u2013 na\u00efve</p>"
+    assert decode_body(cafe.encode("cp1252"), "text/html; charset=windows-1252") == cafe
+    meta = '<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">'
+    latin = (meta + "<p>Caf\u00e9</p>").encode("latin-1")
+    assert decode_body(latin, "text/html").endswith("Caf\u00e9</p>")
+    assert decode_body(b'<meta charset="nope"><p>ok \xc3\xa9</p>', "text/html") == '<meta charset="nope"><p>ok \u00e9</p>'
+    # No charset anywhere: UTF-8, not requests' ISO-8859-1 default for text/html
+    assert decode_body(cafe.encode("utf-8"), "text/html") == cafe
+
+
+def test_fetch_decodes_undeclared_utf8_and_meta_charsets(tmp_path, base_url):
+    _Handler.bodies = {
+        "/utf8": ("text/html", "<title>Cr\u00e8me br\u00fbl\u00e9e</title><p>\u2014</p>".encode("utf-8")),
+        "/meta": ("text/html", '<meta charset="windows-1252"><title>Caf\u00e9</title>'.encode("cp1252")),
+    }
+    cache = PageCache(tmp_path / "pages.db")
+    assert cache.fetch(base_url + "/utf8").title == "Cr\u00e8me br\u00fbl\u00e9e"
+    assert cache.fetch(base_url + "/meta").title == "Caf\u00e9"
+
+
+class _StreamResponse:
+    def __init__(self, chunks):
+        self.chunks, self.pulled, self.closed = chunks, 0, False
+
+    def iter_content(self, size):
+        for chunk in self.chunks:
+            self.pulled += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def test_download_stops_at_the_size_cap(tmp_path, base_url, monkeypatch):
+    resp = _StreamResponse([b"x" * 100] * 50)
+    assert read_capped(resp, 250) == b"x" * 250
+    assert resp.pulled == 3 and resp.closed
+
+    monkeypatch.setattr(page_cache_mod, "MAX_PAGE_BYTES", 40)
+    _Handler.bodies = {"/big": ("text/html", b"<p>" + b"a" * 100 + b"</p>")}
+    page = PageCache(tmp_path / "pages.db").fetch(base_url + "/big")
+    assert page.text == "a" * 37
@@ -0,0 +1,187 @@
+# tests/pipeline_test.py
+import threading
+import time
+
+import pytest
+
+from halo_core.pipeline import CommandContext, Pipeline, Stage, StageQueue
+
+
+# ───────────────────────────────────────────────────────────
+# StageQueue back-pressure
+# ───────────────────────────────────────────────────────────
+def test_block_policy_waits_for_room():
+    q = StageQueue("q", maxsize=1, policy="block")
+    assert q.put("a")
+    accepted = []
+    producer = threading.Thread(target=lambda: accepted.append(q.put("b")))
+    producer.start()
+    time.sleep(0.05)
+    assert producer.is_alive() and len(q) == 1      # still waiting for room
+    assert q.get() == "a"
+    producer.join(1)
+    assert accepted == [True] and q.get() == "b" and q.dropped == 0
+
+
+def test_drop_oldest_evicts_the_head():
+    dropped = []
+    q = StageQueue("q", maxsize=2, policy="drop_oldest", on_drop=dropped.append)
+    assert q.put("a") and q.put("b") and q.put("c")
+    assert dropped == ["a"] and q.dropped == 1
+    assert [q.get(), q.get()] == ["b", "c"]
+
+
+def test_drop_newest_refuses_the_incoming_item():
+    dropped = []
+    q = StageQueue("q", maxsize=2, policy="drop_newest", on_drop=dropped.append)
+    assert q.put("a") and q.put("b")
+    assert q.put("c") is False
+    assert dropped == ["c"] and q.dropped == 1
+    assert [q.get(), q.get()] == ["a", "b"]
+
+
+def test_close_releases_blocked_producers_and_consumers():
+    q = StageQueue("q", maxsize=1, policy="block")
+    q.put("a")
+    results = []
+    producer = threading.Thread(target=lambda: results.append(q.put("b")))
+    producer.start()
+    time.sleep(0.02)
+    q.close()
+    producer.join(1)
+    assert results == [False]
+    assert q.get() == "a" and q.get(timeout=0.01) is None and q.put("c") is False
+    assert StageQueue("empty").get(timeout=0.01) is None
+    with pytest.raises(ValueError):
+        StageQueue("q", policy="newest")
+
+
+# ───────────────────────────────────────────────────────────
+# Pipeline
+# ───────────────────────────────────────────────────────────
+class Harness:
+    """Source that emits `n` commands, then waits for all of them to settle before stopping."""
+
+    def __init__(self, n):
+        self.n = n
+        self.emitted = 0
+        self.settled = threading.Semaphore(0)
+        self.done, self.errors, self.dropped = [], [], []
+        self.events = []
+        self.lock = threading.Lock()
+
+    def log(self, *event):
+        with self.lock:
+            self.events.append(event)
+
+    def source(self):
+        if self.emitted == self.n:
+            for _ in range(self.n):
+                assert self.settled.acquire(timeout=3), "commands never settled"
+            return None
+        self.emitted += 1
+        ctx = CommandContext(text=f"cmd{self.emitted}")
+        self.log("capture", ctx.text, threading.current_thread().name)
+        return ctx
+
+    def stage(self, name, delay=0.0, fail_on=None):
+        def run(ctx):
+            self.log(name, ctx.text, threading.current_thread().name)
+            time.sleep(delay)
+            if ctx.text == fail_on:
+                raise RuntimeError(f"{name} choked on {ctx.text}")
+            return ctx
+        return Stage(name, run)
+
+    def pipeline(self, stages, mode, **kw):
+        def settle(callback):
+            def fire(*args):
+                callback(*args)
+                self.settled.release()
+            return fire
+        return Pipeline(self.source, stages, mode=mode,
+                        on_done=settle(lambda ctx: self.done.append(ctx.text)),
+                        on_error=settle(lambda stage, ctx, e: self.errors.append((stage, ctx, str(e)))),
+                        on_drop=settle(lambda ctx: self.dropped.append(ctx.text)), **kw)
+
+
+def test_serial_mode_runs_each_command_to_completion_on_the_caller_thread():
+    h = Harness(3)
+    h.pipeline([h.stage("stt"), h.stage("llm")], "serial").run()
+    assert [e[:2] for e in h.events] == [(step, f"cmd{i}") for i in (1, 2, 3) for step in ("capture", "stt", "llm")]
+    assert {e[2] for e in h.events} == {threading.current_thread().name}
+    assert h.done == ["cmd1", "cmd2", "cmd3"]
+
+
+def test_pipelined_stage_overlaps_capture_of_the_next_command():
+    h = Harness(2)
+    second_captured = threading.Event()
+    overlapped = []
+    source = h.source
+
+    def capture():
+        ctx = source()
+        if ctx is not None and ctx.text == "cmd2":
+            second_captured.set()
+        return ctx
+
+    def think(ctx):
+        if ctx.text == "cmd1":
+            # Serially this would deadlock: cmd2 can't be captured until cmd1 is through
+            overlapped.append(second_captured.wait(2))
+        return ctx
+
+    h.source = capture
+    pipeline = h.pipeline([h.stage("stt"), Stage("llm", think)], "pipelined")
+    pipeline.run()
+    assert overlapped == [True]
+    assert h.done == ["cmd1", "cmd2"] and pipeline.in_flight() == 0
+    workers = {e[2] for e in h.events if e[0] == "stt"}
+    assert workers == {"halo-stage-stt"}
+
+
+def test_pipelined_mode_keeps_command_order():
+    h = Harness(5)
+    pipeline = h.pipeline([h.stage("stt", 0.01), h.stage("llm", 0.02), h.stage("tts")], "pipelined")
+    pipeline.run()
+    assert h.done == [f"cmd{i}" for i in range(1, 6)]
+    stats = pipeline.stats()["stages"]
+    assert all(s["processed"] == 5 and s["dropped"] == 0 for s in stats.values())
+
+
+@pytest.mark.parametrize("mode", ["serial", "pipelined"])
+def test_on_error_reports_the_stage_and_the_rest_keep_flowing(mode):
+    h = Harness(3)
+    h.pipeline([h.stage("stt"), h.stage("llm", fail_on="cmd2"), h.stage("tts")], mode).run()
+    [(stage, ctx, error)] = h.errors
+    assert (stage, ctx.text, error) == ("llm", "cmd2", "llm choked on cmd2")
+    assert h.done == ["cmd1", "cmd3"]
+    assert "llm" in ctx.timings and "tts" not in ctx.timings
+    assert not any(e[0] == "tts" and e[1] == "cmd2" for e in h.events)
+
+
+def test_on_drop_fires_when_back_pressure_discards_a_command():
+    h = Harness(4)
+    started, release = threading.Event(), threading.Event()
+
+    def slow(ctx):
+        started.set()
+        release.wait(2)
+        return ctx
+
+    source = h.source
+
+    def capture():
+        if h.emitted == 1:
+            started.wait(2)      # cmd1 is off the queue and in the stage
+        if h.emitted == h.n:
+            release.set()        # every command has been offered; let the stage drain
+        return source()
+
+    h.source = capture
+    pipeline = h.pipeline([Stage("llm", slow, maxsize=1, policy="drop_newest")], "pipelined")
+    pipeline.run()
+    # cmd1 is being processed, cmd2 sits in the one-slot queue, cmd3 and cmd4 are refused
+    assert h.dropped == ["cmd3", "cmd4"]
+    assert h.done == ["cmd1", "cmd2"]
+    assert pipeline.stats()["stages"]["llm"]["dropped"] == 2 and pipeline.in_flight() == 0
@@ -0,0 +1,126 @@
+# tests/planner_test.py
+import threading
+import time
+
+import pytest
+
+from halo_core.skills.executor import SkillExecutor
+from halo_core.skills.planner import EXCLUSIVE, PlanRunner, Step, conflicts, entry_resources, plan_dependencies
+
+
+@pytest.fixture
+def executor():
+    ex = SkillExecutor(max_workers=4)
+    yield ex
+    ex.shutdown()
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = []
+        self.active = 0
+        self.peak = 0
+
+    def skill(self, name, delay=0.05, fail=False):
+        def run():
+            with self.lock:
+                self.events.append(("start", name))
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(delay)
+            with self.lock:
+                self.active -= 1
+                self.events.append(("end", name))
+            if fail:
+                raise RuntimeError(f"{name} broke")
+            return name
+        return run
+
+
+def _steps(executor, specs, inline=2.0):
+    steps = []
+    for i, (action, resources, func) in enumerate(specs):
+        steps.append(Step(index=i, action=action, target=None, entry={}, inline=inline, resources=resources,
+                          launch=lambda bg, a=action, f=func: executor.submit(a, f, background=bg)))
+    return plan_dependencies(steps)
+
+
+def test_resources_and_conflicts():
+    assert entry_resources({"resources": "audio"}) == ["audio"]
+    assert entry_resources({"resources": []}) == []
+    assert entry_resources(["apps", "open_app"]) == [EXCLUSIVE]
+    assert conflicts(["audio"], ["audio", "ui"]) and not conflicts(["audio"], ["browser"])
+    assert conflicts([EXCLUSIVE], []) and not conflicts([], [])
+
+
+def test_independent_steps_run_concurrently(executor):
+    rec = Recorder()
+    steps = _steps(executor, [(f"s{i}", [f"r{i}"], rec.skill(f"s{i}", 0.1)) for i in range(3)])
+    assert all(s.deps == [] for s in steps)
+    PlanRunner(steps, executor).run()
+    assert rec.peak == 3  # all three were running at once
+    assert [s.job.result for s in steps] == ["s0", "s1", "s2"]
+
+
+def test_shared_resource_serializes_in_order(executor):
+    rec = Recorder()
+    steps = _steps(executor, [
+        ("mute", ["audio"], rec.skill("mute", 0.05)),
+        ("open", ["apps"], rec.skill("open", 0.05)),
+        ("unmute", ["audio"], rec.skill("unmute", 0.01)),
+        ("status", [EXCLUSIVE], rec.skill("status", 0.01)),
+    ])
+    assert [d.action for d in steps[2].deps] == ["mute"]
+    assert [d.action for d in steps[3].deps] == ["mute", "open", "unmute"]
+    PlanRunner(steps, executor).run()
+    ev = rec.events
+    assert ev.index(("end", "mute")) < ev.index(("start", "unmute"))
+    assert ev.index(("start", "status")) > max(ev.index(("end", n)) for n in ("mute", "open", "unmute"))
+    assert [s.job.result for s in steps] == ["mute", "open", "unmute", "status"]
+
+
+def test_dependents_of_a_failed_step_are_skipped(executor):
+    rec = Recorder()
+    steps = _steps(executor, [
+        ("open_webpage", ["browser"], rec.skill("open_webpage", 0.02, fail=True)),
+        ("mute", ["audio"], rec.skill("mute", 0.02)),
+        ("click_element", ["browser"], rec.skill("click_element")),
+        ("extract_text", ["browser"], rec.skill("extract_text")),
+    ])
+    PlanRunner(steps, executor).run()
+    started = {name for kind, name in rec.events if kind == "start"}
+    assert started == {"open_webpage", "mute"}
+    assert steps[0].job.status == "failed" and steps[1].succeeded
+    assert steps[2].job is None and steps[2].skipped == "open_webpage failed"
+    assert steps[3].skipped == "open_webpage failed"  # the root cause, not the intermediate skip
+    assert not any(s.background for s in steps)
+
+
+def test_timed_out_dependency_skips_dependents(executor):
+    steps = [
+        Step(index=0, action="slow", target=None, entry={}, inline=2.0, resources=["x"],
+             launch=lambda bg: executor.submit("slow", time.sleep, 1.0, timeout=0.05, background=bg)),
+        Step(index=1, action="after", target=None, entry={}, inline=2.0, resources=["x"],
+             launch=lambda bg: executor.submit("after", lambda: "ran", background=bg)),
+    ]
+    PlanRunner(plan_dependencies(steps), executor).run()
+    assert steps[0].job.status == "timeout"
+    assert steps[1].job is None and steps[1].skipped == "slow timed out"
+
+
+def test_slow_step_is_backgrounded_and_its_dependents_follow(executor):
+    rec = Recorder()
+    steps = _steps(executor, [
+        ("slow", ["x"], rec.skill("slow", 0.3)),
+        ("next", ["x"], rec.skill("next", 0.01)),
+        ("quick", ["y"], rec.skill("quick", 0.01)),
+    ], inline=0.05)
+    PlanRunner(steps, executor).run()
+    assert steps[0].background and steps[1].background and steps[1].job is None
+    assert steps[2].succeeded and not steps[2].background
+    steps[0].job.wait(2)
+    deadline = time.monotonic() + 2
+    while steps[1].job is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert steps[1].job.wait(2) and steps[1].job.result == "next"
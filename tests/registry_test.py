@@ -0,0 +1,133 @@
+# tests/registry_test.py
+import asyncio
+import sys
+import types
+
+import pytest
+
+from halo_core.skills.executor import DEFAULT_INLINE, DEFAULT_TIMEOUT
+from halo_core.skills.planner import EXCLUSIVE
+from halo_core.skills.registry import COERCERS, SkillRegistry, _inspect_signature, resolve_entry
+
+
+@pytest.fixture
+def fake_skills(monkeypatch):
+    """A skill module importable as halo_core.skills._fake_skills."""
+    mod = types.ModuleType("halo_core.skills._fake_skills")
+
+    def status():
+        return "all good"
+
+    def open_app(name):
+        return f"opened {name}"
+
+    def volume(level=50):
+        return level
+
+    async def fetch(url=None):
+        await asyncio.sleep(0)
+        return url
+
+    mod.status, mod.open_app, mod.volume, mod.fetch = status, open_app, volume, fetch
+    mod.not_callable = 42
+    monkeypatch.setitem(sys.modules, "halo_core.skills._fake_skills", mod)
+    return mod
+
+
+def _entry(function, **options):
+    return {"module": "_fake_skills", "function": function, **options}
+
+
+def test_resolve_entry_shapes():
+    assert resolve_entry(["apps", "open_app"]) == ("apps", "open_app")
+    assert resolve_entry({"module": "apps", "function": "open_app"}) == ("apps", "open_app")
+    assert resolve_entry("system_control.mute_system") == ("system_control", "mute_system")
+    assert resolve_entry({"module": "apps"}) is None and resolve_entry("nodots") is None
+
+
+def test_coercers():
+    text, to_int, percent = COERCERS["text"], COERCERS["int"], COERCERS["percent"]
+    assert text({"b": 1}) == '{"b": 1}' and text(3) == "3" and text(None) is None
+    assert to_int("volume 40%") == 40 and to_int(7.9) == 7
+    assert to_int("loud") is None and to_int(True) is None and to_int(None) is None
+    assert percent("150") == 100 and percent(-5) == 0 and percent("half") is None
+
+
+def test_signature_inspection():
+    def no_args(): ...
+    def required(target): ...
+    def optional(target=None): ...
+    def varargs(*targets): ...
+    def keyword_only(*, target=None): ...
+
+    assert _inspect_signature(no_args) == (False, False)
+    assert _inspect_signature(required) == (True, True)
+    assert _inspect_signature(optional) == (True, False)
+    assert _inspect_signature(varargs) == (True, False)
+    assert _inspect_signature(keyword_only) == (False, False)
+
+
+def test_specs_resolve_lazily_and_call_by_signature(fake_skills):
+    registry = SkillRegistry({
+        "status": _entry("status"),
+        "open_app": _entry("open_app", coerce="text"),
+        "volume": _entry("volume", coerce="percent", timeout=5, inline=None, resources="audio"),
+        "fetch": _entry("fetch"),
+    })
+    status = registry._specs["status"]
+    assert status.func is None and status.timeout == DEFAULT_TIMEOUT and status.inline == DEFAULT_INLINE
+    assert status.resources == [EXCLUSIVE]
+
+    assert registry.get("status").call("ignored") == "all good"       # no target parameter
+    assert registry.get("open_app").call({"app": "x"}) == 'opened {"app": "x"}'
+    volume = registry.get("volume")
+    assert (volume.timeout, volume.inline, volume.resources) == (5.0, None, ["audio"])
+    assert volume.call("150%") == 100 and volume.call(None) == 50     # None leaves the default alone
+    fetch = registry.get("fetch")
+    assert fetch.is_async and fetch.runner == fetch.acall
+    assert asyncio.run(fetch.runner("https://x")) == "https://x"
+
+
+def test_unresolvable_actions_return_none(fake_skills, capsys):
+    registry = SkillRegistry({
+        "missing_module": {"module": "_no_such_skills", "function": "f"},
+        "missing_function": _entry("nope"),
+        "not_callable": _entry("not_callable"),
+    })
+    assert registry.get("missing_module") is None
+    assert registry.get("missing_function") is None and registry.get("not_callable") is None
+    assert registry.get("unknown") is None
+    assert "failed to import" in capsys.readouterr().out
+
+
+def test_bad_entries_are_reported_not_raised():
+    registry = SkillRegistry({
+        "ok": {"module": "system_control", "function": "mute_system", "resources": ["audio"]},
+        "bad_timeout": {"module": "system_control", "function": "mute_system", "timeout": "soon"},
+        "bad_inline": {"module": "system_control", "function": "mute_system", "inline": [1]},
+        "bad_resources": {"module": "system_control", "function": "mute_system", "resources": 5},
+        "bad_invalidates": {"module": "system_control", "function": "mute_system", "invalidates": 5},
+        "bad_cache": {"module": "system_control", "function": "mute_system", "cache": {"ttl": "x"}},
+        "bad_coercer": {"module": "system_control", "function": "mute_system", "coerce": "roman"},
+        "bad_shape": 42,
+        "no_module": {"module": "no_such_module", "function": "f"},
+        "no_function": {"module": "system_control", "function": "no_such_function"},
+        "stale": {"module": "system_control", "function": "mute_system", "invalidates": ["ghost"]},
+    })
+    assert registry.actions() == ["ok", "no_module", "no_function", "stale"]
+    assert registry.get("bad_timeout") is None
+
+    problems = registry.validate()
+    by_action = {p.split(":", 1)[0]: p for p in problems}
+    assert set(by_action) == {"bad_timeout", "bad_inline", "bad_resources", "bad_invalidates", "bad_cache",
+                              "bad_coercer", "bad_shape", "no_module", "no_function", "stale"}
+    assert "'timeout' must be a number" in by_action["bad_timeout"]
+    assert "'resources' must be" in by_action["bad_resources"]
+    assert "unknown coercer 'roman'" in by_action["bad_coercer"]
+    assert "not found" in by_action["no_module"] and "not defined" in by_action["no_function"]
+    assert "unknown action 'ghost'" in by_action["stale"]
+
+
+def test_shipped_action_map_is_valid():
+    from halo_core.skills import REGISTRY
+    assert REGISTRY.validate() == []
@@ -0,0 +1,135 @@
+# tests/research_test.py
+import http.server
+import threading
+import time
+
+import pytest
+
+from halo_core.skills.page_cache import PageCache
+from halo_core.skills.research import gather_pages, merge_prompt, research
+from halo_core.skills.web_search import SearchResult
+
+PAGE_DELAY_S = 0.3
+SLOW_DELAY_S = 3.0
+
+
+class _SiteHandler(http.server.BaseHTTPRequestHandler):
+    """/pN answers after PAGE_DELAY_S, /slow after SLOW_DELAY_S, /js has no static text."""
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    @classmethod
+    def reset(cls):
+        with cls.lock:
+            cls.active = cls.peak = 0
+
+    def do_GET(self):
+        name = self.path.strip("/")
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(SLOW_DELAY_S if name == "slow" else PAGE_DELAY_S)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+        if name == "js":
+            body = "<html><head><title>App</title></head><body><div id=root></div></body></html>"
+        else:
+            para = f"<p>{name} says the answer is {len(name)}. " + "Filler sentence for length. " * 20 + "</p>"
+            body = f"<html><head><title>Page {name}</title></head><body>{para}</body></html>"
+        data = body.encode("utf-8")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up on /slow
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    _SiteHandler.reset()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def _fetcher():
+    cache = PageCache(db_path=None)  # fresh cache per run so nothing is served from disk
+
+    def fetch(url, timeout):
+        page = cache.fetch(url, timeout=timeout)
+        return page.final_url, page.title, page.text, page.source
+    return fetch
+
+
+def test_fetches_overlap_up_to_the_concurrency_limit(site):
+    urls = [f"{site}/p{i}" for i in range(6)]
+
+    sequential = gather_pages(urls, _fetcher(), concurrency=1, page_timeout=2, progress=lambda _: None)
+    assert _SiteHandler.peak == 1
+
+    _SiteHandler.reset()
+    parallel = gather_pages(urls, _fetcher(), concurrency=3, page_timeout=2, progress=lambda _: None)
+    # Every request sleeps PAGE_DELAY_S on the server, so the pool stays full
+    assert _SiteHandler.peak == 3
+
+    assert all(p.usable for p in sequential + parallel)
+    assert [p.url for p in parallel] == urls  # result order follows the search ranking
+
+
+def test_slow_site_does_not_stall_the_answer(site):
+    results = [SearchResult(f"r{i}", f"{site}/{name}") for i, name in enumerate(["p1", "slow", "p2", "js"])]
+    rendered = []
+
+    def render(urls, timeout):
+        rendered.extend(urls)
+        return {u: ("App", "Rendered by the browser. " * 20) for u in urls}
+
+    t0 = time.perf_counter()
+    result = research("compare p1 and p2", lambda q, n: results[:n], _fetcher(), render=render,
+                      k=4, concurrency=4, page_timeout=1.0, progress=lambda _: None)
+    elapsed = time.perf_counter() - t0
+
+    assert elapsed < SLOW_DELAY_S
+    by_name = {p.url.rsplit("/", 1)[1]: p for p in result.pages}
+    assert by_name["slow"].error and not by_name["slow"].usable
+    assert rendered == [f"{site}/js"] and by_name["js"].source == "browser"
+    assert [p.title for p in result.usable] == ["Page p1", "Page p2", "App"]
+
+    prompt = merge_prompt("compare p1 and p2", result.usable, excerpt_chars=100)
+    assert "[1] Page p1" in prompt and "[3] App" in prompt and "Question: compare p1 and p2" in prompt
+
+
+def test_failed_pages_are_not_rendered():
+    def fetch(url, timeout):
+        if url.endswith("/down"):
+            raise ConnectionError("HTTP 503")
+        if url.endswith("/read-timeout"):
+            raise TimeoutError("ReadTimeout: read timed out")
+        return url, "Thin", "Loading...", "network"
+
+    rendered = []
+
+    def render(urls, timeout):
+        rendered.extend(urls)
+        return {u: ("Rendered", "Rendered by the browser. " * 20) for u in urls}
+
+    results = [SearchResult(name, f"http://x/{name}") for name in ("down", "read-timeout", "thin")]
+    result = research("q", lambda q, n: results[:n], fetch, render=render, k=3, progress=lambda _: None)
+    assert rendered == ["http://x/thin"]
+    by_name = {p.url.rsplit("/", 1)[1]: p for p in result.pages}
+    assert by_name["down"].error == "ConnectionError: HTTP 503" and not by_name["down"].usable
+    assert by_name["read-timeout"].error.startswith("TimeoutError") and by_name["thin"].source == "browser"
@@ -0,0 +1,57 @@
+# tests/scheduler_test.py
+import datetime as dt
+import threading
+import time
+
+from halo_core.skills.automation import Schedule, Scheduler, parse_schedule
+
+NOW = dt.datetime(2026, 10, 19, 14, 30).timestamp()
+
+
+def _at(ts):
+    return dt.datetime.fromtimestamp(ts)
+
+
+def test_parse_what_and_when():
+    what, s = parse_schedule("remind me to stretch in 20 minutes", NOW)
+    assert (what, s.kind, _at(s.next_run)) == ("stretch", "once", dt.datetime(2026, 10, 19, 14, 50))
+
+    what, s = parse_schedule("stand-up every weekday at 9:30am", NOW)
+    assert (what, s.kind, s.spec) == ("stand-up", "cron", "30 9 * * 1-5")
+    assert _at(s.next_run) == dt.datetime(2026, 10, 20, 9, 30)
+
+    what, s = parse_schedule('{"what": "pay rent", "when": "on friday at noon"}', NOW)
+    assert (what, _at(s.next_run)) == ("pay rent", dt.datetime(2026, 10, 23, 12, 0))
+
+    what, s = parse_schedule("drink water every 2 hours", NOW)
+    assert (what, s.kind, s.spec) == ("drink water", "interval", "7200")
+
+
+def test_fires_in_order_and_survives_restart(tmp_path):
+    db = tmp_path / "schedule.db"
+    fired = []
+    done = threading.Event()
+
+    def on_fire(task):
+        fired.append(task.what)
+        if len(fired) == 2:
+            done.set()
+
+    scheduler = Scheduler(db)
+    scheduler.subscribe(on_fire)
+    scheduler.start()
+    now = time.time()
+    scheduler.add("second", Schedule("once", "", now + 0.2))
+    scheduler.add("first", Schedule("once", "", now + 0.05))
+    cancelled = scheduler.add("never", Schedule("once", "", now + 0.1))
+    scheduler.add("tomorrow", Schedule("once", "", now + 86400))
+    assert scheduler.cancel(cancelled.id)
+    assert done.wait(2)
+    scheduler.stop()
+    assert fired == ["first", "second"]
+
+    reloaded = Scheduler(db).start()
+    try:
+        assert [t.what for t in reloaded.tasks()] == ["tomorrow"]
+    finally:
+        reloaded.stop()
@@ -0,0 +1,68 @@
+# tests/shell_host_test.py
+import os
+
+import pytest
+
+from halo_core.skills import system_control
+from halo_core.skills.shell_host import (
+    FakeHost, HostError, PosixShellHost, PulseMixer, WindowsMixer, set_mixer,
+)
+
+
+def test_set_volume_is_a_single_mixer_call():
+    host = FakeHost()
+    set_mixer(WindowsMixer(host))
+    try:
+        assert system_control.set_volume("63") is None
+        system_control.mute_system()
+        system_control.unmute_system()
+    finally:
+        set_mixer(None)
+    assert host.commands == [
+        "[HaloAudio]::Mute = $false; [HaloAudio]::Volume = 0.63",
+        "[HaloAudio]::Mute = $true",
+        "[HaloAudio]::Mute = $false",
+    ]
+
+
+def test_pulse_mixer_parses_volume():
+    host = FakeHost({"pactl get-sink-volume @DEFAULT_SINK@": "Volume: front-left: 26214 /  40% / -23.88 dB"})
+    assert PulseMixer(host).get_volume() == 40
+
+
+@pytest.mark.skipif(os.name == "nt" or not os.path.exists("/bin/sh"), reason="needs /bin/sh")
+def test_posix_host_stays_warm_and_restarts():
+    host = PosixShellHost()
+    try:
+        assert host.run("echo one") == "one"
+        pid = host.pid
+        assert host.run("echo two; echo three") == "two\nthree"
+        assert host.pid == pid  # same process served both requests
+
+        with pytest.raises(HostError):
+            host.run("echo oops; exit 3")  # kills the host mid-request
+
+        assert host.run("echo back") == "back"
+        assert host.restarts == 1
+
+        with pytest.raises(HostError):
+            host.run("false")
+        assert host.run("echo still-alive") == "still-alive"
+    finally:
+        host.close()
+
+
+@pytest.mark.skipif(os.name == "nt" or not os.path.exists("/bin/sh"), reason="needs /bin/sh")
+def test_failed_prelude_kills_the_host_and_reruns_on_next_call(tmp_path):
+    flag = tmp_path / "ready"
+    host = PosixShellHost(prelude=f"test -f '{flag}' && HALO_READY=yes")
+    try:
+        with pytest.raises(HostError, match="setup failed"):
+            host.run("echo $HALO_READY")
+        assert host.pid is None  # not left running without its prelude
+
+        flag.touch()
+        assert host.run("echo $HALO_READY") == "yes"
+        assert host.run("echo $HALO_READY") == "yes"
+    finally:
+        host.close()
@@ -0,0 +1,85 @@
+# tests/startup_test.py
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from halo_core.startup import Startup
+
+
+def _slow(value, delay):
+    def build():
+        time.sleep(delay)
+        return value
+    return build
+
+
+def test_components_build_concurrently_past_any_pool_size():
+    startup = Startup()
+    gate = threading.Barrier(10, timeout=2)
+    for i in range(10):
+        # Each factory waits for all ten to be running at once; a bounded pool would deadlock here
+        startup.add(f"c{i}", lambda i=i: (gate.wait(), i)[1])
+    assert startup.wait_all(timeout=3)
+    assert [startup.get(f"c{i}") for i in range(10)] == list(range(10))
+
+
+def test_readiness_is_per_component():
+    startup = Startup()
+    release = threading.Event()
+    startup.add("wake", lambda: "wake")
+    startup.add("llm", lambda: release.wait(2) and "llm", warm_up=lambda llm: None)
+    assert startup.get("wake", timeout=1) == "wake"
+    assert startup.is_ready("wake") and not startup.is_ready("llm")
+    assert not startup.is_ready("unknown")
+    release.set()
+    assert startup.get("llm", timeout=1) == "llm" and startup.is_ready("llm")
+
+
+def test_init_error_is_reraised_by_get():
+    startup = Startup()
+    startup.add("tts", lambda: "tts", warm_up=lambda tts: (_ for _ in ()).throw(OSError("no audio device")))
+    with pytest.raises(OSError, match="no audio device"):
+        startup.get("tts", timeout=1)
+    assert not startup.is_ready("tts")
+    assert startup.timeline()[0]["status"] == "failed"
+
+
+def test_duplicate_registration_is_rejected():
+    startup = Startup()
+    startup.add("stt", lambda: 1)
+    with pytest.raises(ValueError):
+        startup.add("stt", lambda: 2)
+
+
+def test_timeline_orders_by_readiness():
+    startup = Startup()
+    startup.add("slow", _slow("s", 0.15))
+    startup.add("fast", _slow("f", 0.01))
+    startup.add("mid", _slow("m", 0.08), warm_up=lambda m: time.sleep(0.02))
+    startup.wait_all(timeout=2)
+    rows = startup.timeline()
+    assert [r["name"] for r in rows] == ["fast", "mid", "slow"]
+    for r in rows:
+        assert r["status"] == "ready" and r["start_s"] <= r["built_s"] <= r["ready_s"]
+    mid = rows[1]
+    assert mid["ready_s"] - mid["built_s"] >= 0.015   # warm-up shows up between built and ready
+    report = startup.report()
+    assert report.splitlines()[0].startswith("Startup timeline") and "[ready]" in report
+
+
+def test_shutdown_cancels_pending_components():
+    startup = Startup()
+    release = threading.Event()
+    startup.add("done", lambda: "ok")
+    startup.get("done", timeout=1)
+    future = startup.add("stuck", lambda: release.wait(2))
+    startup.shutdown()
+    with pytest.raises(concurrent.futures.CancelledError):
+        startup.get("stuck", timeout=1)
+    assert future.cancelled() and not startup.is_ready("stuck")
+    assert startup.get("done") == "ok" and startup.wait_all(timeout=0)
+    release.set()   # the build finishing afterwards must not blow up its thread
+    time.sleep(0.05)
+    assert {r["name"]: r["status"] for r in startup.timeline()} == {"done": "ready", "stuck": "cancelled"}
@@ -0,0 +1,105 @@
+# tests/summarize_test.py
+import threading
+import time
+
+from halo_core.skills.summarize import Summarizer, chunk_text, estimate_tokens
+
+
+def _page(sections=6, words=300):
+    blocks = []
+    for s in range(sections):
+        blocks.append(f"Section {s}")
+        blocks.append(" ".join(f"word{s}_{i}." for i in range(words)))
+    return "\n".join(blocks)
+
+
+class FakeModel:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return "- point about " + prompt.split("\n")[-1][:20]
+
+
+def test_chunks_are_bounded_and_break_on_blocks():
+    chunks = chunk_text(_page(), max_tokens=500)
+    assert len(chunks) > 1
+    assert all(c.tokens <= 500 for c in chunks)
+    assert all(c.text.startswith("Section") or c.text.startswith("word") for c in chunks)
+    # one huge block with no line breaks still gets split
+    assert len(chunk_text("x " * 10000, max_tokens=200)) >= estimate_tokens("x " * 10000) // 200
+
+
+def test_map_reduce_runs_concurrently_and_reports_progress():
+    model, progress = FakeModel(delay=0.05), []
+    s = Summarizer(model, "m", concurrency=3, chunk_tokens=500, progress=progress.append)
+    out = s.summarize(_page(), "Title")
+    assert out.startswith("- point")
+    assert model.peak == 3
+    assert s.stats["model_calls"] == s.stats["chunks"] + s.stats["reduce_rounds"]
+    assert progress[-1] == "writing the final summary"
+    assert f"summarized part {s.stats['chunks']}/{s.stats['chunks']}" in progress
+    assert "3 short bullet points" in model.prompts[-1]
+
+
+def test_unchanged_chunks_are_skipped():
+    memo = {}
+    get = lambda d, m, k: memo.get((d, m, k))
+    put = lambda d, m, v, k: memo.__setitem__((d, m, k), v)
+    text = _page()
+
+    first = FakeModel()
+    Summarizer(first, "m", chunk_tokens=500, memo_get=get, memo_put=put, progress=lambda _: None).summarize(text)
+
+    edited = text.replace("word5_10.", "changed.")
+    second = FakeModel()
+    s = Summarizer(second, "m", chunk_tokens=500, memo_get=get, memo_put=put, progress=lambda _: None)
+    s.summarize(edited)
+    assert s.stats["reused"] == s.stats["chunks"] - 1
+    assert len(second.prompts) == 2  # the edited chunk + the reduce
+
+
+def test_failed_model_call_is_not_memoized():
+    import pytest
+    from halo_core.skills.summarize import SummaryError
+
+    memo = {}
+    get = lambda d, m, k: memo.get((d, m, k))
+    put = lambda d, m, v, k: memo.__setitem__((d, m, k), v)
+    text = _page()
+
+    class Flaky(FakeModel):
+        failures = 1
+
+        def __call__(self, prompt):
+            if "part 3 of" in prompt and self.failures:
+                self.failures -= 1
+                raise TimeoutError("ollama timed out")
+            return super().__call__(prompt)
+
+    flaky = Flaky()
+    s = Summarizer(flaky, "m", concurrency=1, chunk_tokens=500, memo_get=get, memo_put=put, progress=lambda _: None)
+    with pytest.raises(SummaryError):
+        s.summarize(text)
+    assert not any("timed out" in v for v in memo.values())
+
+    s = Summarizer(flaky, "m", chunk_tokens=500, memo_get=get, memo_put=put, progress=lambda _: None)
+    out = s.summarize(text)
+    assert out.startswith("- point")
+    assert any("part 3 of" in p for p in flaky.prompts)  # the failed chunk went back to the model
+    assert s.stats["reused"] == s.stats["chunks"] - 1  # good partials from the failed run are kept
+
+    # a generate that signals failure with None is treated the same way
+    with pytest.raises(SummaryError):
+        Summarizer(lambda p: None, "m", progress=lambda _: None).summarize("short page")
@@ -0,0 +1,119 @@
+# tests/tracing_test.py
+import json
+import socket
+import urllib.request
+
+import pytest
+
+from halo_core.tracing import Tracer, _percentile, annotate
+
+
+def _tracer(tmp_path=None, **kw):
+    # Long flush interval: tests call flush() themselves
+    return Tracer(enabled=True, out_dir=tmp_path, flush_interval=3600, **kw)
+
+
+def _record(tracer, name, *durations_ms, trace=None):
+    for ms in durations_ms:
+        tracer.add(name, 0.0, ms / 1000.0, trace=trace)
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert _percentile(values, 0.5) == pytest.approx(2.5)
+    assert _percentile(values, 0.95) == pytest.approx(3.85)
+    assert _percentile(values, 0.0) == 1.0 and _percentile(values, 1.0) == 4.0
+    assert _percentile([7.0], 0.99) == 7.0 and _percentile([], 0.5) == 0.0
+
+
+def test_percentiles_per_span_name():
+    tracer = _tracer()
+    _record(tracer, "stt", *range(1, 101))          # 1..100 ms
+    _record(tracer, "llm", 300, 100, 200)
+    stats = tracer.percentiles()
+    assert set(stats) == {"stt", "llm"}
+    stt = stats["stt"]
+    assert stt["count"] == 100 and stt["mean"] == pytest.approx(0.0505)
+    assert (stt["p50"], stt["p95"], stt["p99"]) == (pytest.approx(0.0505), pytest.approx(0.09505),
+                                                     pytest.approx(0.09901))
+    assert tracer.percentiles("llm")["llm"]["p50"] == pytest.approx(0.2)
+    assert tracer.percentiles("unknown") == {}
+
+
+def test_rolling_window_keeps_only_the_latest_samples():
+    tracer = _tracer(window=3)
+    _record(tracer, "tts", 1000, 1000, 10, 20, 30)
+    stats = tracer.percentiles("tts")["tts"]
+    assert stats["count"] == 5                       # lifetime count
+    assert stats["mean"] == pytest.approx(0.02) and stats["p99"] < 0.031
+    assert tracer.last("tts", 2) == pytest.approx([0.02, 0.03])
+    assert tracer.last("nope", 2) == []
+
+
+def test_spans_pick_up_trace_and_attributes():
+    tracer = _tracer()
+    with tracer.trace(7):
+        with tracer.span("skill.open_app", action="open_app") as sp:
+            annotate(target="spotify")
+        with pytest.raises(ValueError):
+            with tracer.span("llm"):
+                raise ValueError("bad json")
+    spans = tracer.recent(trace=7)
+    assert [s.name for s in spans] == ["skill.open_app", "llm"]
+    assert sp.attrs == {"action": "open_app", "target": "spotify"} and sp.duration is not None
+    assert spans[1].attrs == {"error": "ValueError"}
+    annotate(ignored=True)                           # outside any span: no-op
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    tracer = Tracer(enabled=False, out_dir=tmp_path)
+    _record(tracer, "stt", 5)
+    tracer.flush()
+    assert tracer.percentiles() == {} and list(tmp_path.iterdir()) == []
+
+
+def test_flush_appends_jsonl_and_rewrites_metrics(tmp_path):
+    tracer = _tracer(tmp_path)
+    _record(tracer, "stt", 12.5, trace=1)
+    tracer.flush()
+    _record(tracer, "llm", 250, trace=1)
+    tracer.flush()
+    tracer.flush()                                   # nothing pending: no duplicate lines
+
+    rows = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [(r["trace"], r["name"], r["duration_ms"]) for r in rows] == [(1, "stt", 12.5), (1, "llm", 250.0)]
+    assert set(rows[0]) == {"trace", "name", "start", "duration_ms", "attrs"}
+    assert (tmp_path / "metrics.prom").read_text(encoding="utf-8") == tracer.prometheus_text()
+    assert not (tmp_path / "metrics.prom.tmp").exists()
+    tracer.close()
+
+
+def test_prometheus_text_format():
+    tracer = _tracer()
+    _record(tracer, "stt", 100, 200)
+    _record(tracer, 'we"ird', 1)
+    lines = tracer.prometheus_text().splitlines()
+    assert lines[:2] == ["# HELP halo_stage_seconds Latency of Halo pipeline stages (rolling window).",
+                         "# TYPE halo_stage_seconds summary"]
+    assert 'halo_stage_seconds{stage="stt",quantile="0.5"} 0.150000' in lines
+    assert 'halo_stage_seconds{stage="stt",quantile="0.99"} 0.199000' in lines
+    assert 'halo_stage_seconds_sum{stage="stt"} 0.300000' in lines
+    assert 'halo_stage_seconds_count{stage="stt"} 2' in lines
+    assert 'halo_stage_seconds_count{stage="we\\"ird"} 1' in lines
+    assert Tracer(enabled=True, out_dir=None).prometheus_text().count("\n") == 2
+
+
+def test_serves_metrics_over_http():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    tracer = _tracer()
+    _record(tracer, "stt", 100)
+    assert tracer.serve_prometheus(port) is tracer.serve_prometheus(port)    # idempotent
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=2) as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain")
+            assert resp.read().decode("utf-8") == tracer.prometheus_text()
+    finally:
+        tracer.close()
+    assert tracer.serve_prometheus(0) is None
@@ -0,0 +1,97 @@
+# tests/web_search_test.py
+import http.server
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from halo_core.skills import web_search
+from halo_core.skills.web_search import SearchBlocked, search
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    page = "ddg_results.html"
+    queries = []
+
+    def do_GET(self):
+        _StubHandler.queries.append(self.path)
+        body = (FIXTURES / _StubHandler.page).read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    _StubHandler.page = "ddg_results.html"
+    _StubHandler.queries = []
+    yield f"http://127.0.0.1:{server.server_port}/html/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_parses_top_results_and_skips_ads(stub_url):
+    t = time.perf_counter()
+    results = search("python asyncio", n=3, url=stub_url)
+    assert time.perf_counter() - t < 1.0
+
+    assert [r.domain for r in results] == ["docs.python.org", "realpython.com", "stackoverflow.com"]
+    assert results[0].url == "https://docs.python.org/3/library/asyncio.html"
+    assert results[0].title == "asyncio — Asynchronous I/O — Python 3.12 documentation"
+    assert results[0].snippet.startswith("asyncio is a library")
+    assert "q=python+asyncio" in _StubHandler.queries[0]
+
+
+def test_challenge_page_raises(stub_url):
+    _StubHandler.page = "ddg_challenge.html"
+    with pytest.raises(SearchBlocked):
+        search("anything", url=stub_url)
+
+
+def test_search_web_uses_fast_path(stub_url, monkeypatch):
+    from halo_core.skills import web
+
+    monkeypatch.setattr(web_search, "SEARCH_URL", stub_url)
+    monkeypatch.setattr(web, "_agent_search", lambda q: pytest.fail("agent should not run"))
+    payload = web.search_web("python asyncio")
+    assert len(payload["results"]) == 4  # every organic result in the fixture
+    assert payload["summary"].startswith("Top results for 'python asyncio': 1) asyncio")
+
+
+class _HangHandler(http.server.BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        _HangHandler.hits += 1
+        time.sleep(0.5)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_shared_session_does_not_retry_read_timeouts():
+    import requests
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _HangHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    try:
+        t0 = time.perf_counter()
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            web_search._http().get(f"http://127.0.0.1:{server.server_port}/", timeout=0.2)
+        assert _HangHandler.hits == 1
+        assert time.perf_counter() - t0 < 0.4
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,152 @@
+# tests/web_session_test.py
+import threading
+import time
+
+import pytest
+
+import halo_core.skills.web as web
+from halo_core.skills.web_session import WebSession
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.started = False
+        self.closed = threading.Event()
+        self.page = None
+
+    async def start(self):
+        self.started = True
+
+    async def close(self):
+        self.closed.set()
+
+
+async def _value(value):
+    return value
+
+
+@pytest.fixture
+def launched():
+    return []
+
+
+@pytest.fixture
+def session(launched):
+    def launch():
+        browser = FakeBrowser()
+        launched.append(browser)
+        return browser
+
+    s = WebSession(launch, make_llm=lambda: "llm", idle_s=0)
+    yield s
+    s.shutdown(timeout=2)
+
+
+def test_browser_is_launched_once_and_reused_across_runs(session, launched):
+    async def visit(browser, llm):
+        browser.page = "https://example.com"
+        return browser, llm
+
+    async def current_page(browser, llm):
+        return browser, browser.page
+
+    first, llm = session.run(visit, timeout=2)
+    second, page = session.run(current_page, timeout=2)
+    assert first is second is launched[0] and first.started and llm == "llm"
+    assert page == "https://example.com"                 # page state survives between commands
+    stats = session.stats()
+    assert (stats["launches"], stats["reuses"], stats["tasks"], stats["failures"]) == (1, 1, 2, 0)
+    assert stats["warm"] and stats["saved_s"] == pytest.approx(stats["avg_launch_s"])
+
+
+def test_failures_are_counted_and_the_browser_stays_warm(session, launched):
+    async def boom(browser, llm):
+        raise RuntimeError("page crashed")
+
+    with pytest.raises(RuntimeError, match="page crashed"):
+        session.run(boom, timeout=2)
+    session.run(lambda b, l: _value(b), timeout=2)
+    stats = session.stats()
+    assert (stats["tasks"], stats["failures"], stats["launches"]) == (2, 1, 1) and len(launched) == 1
+
+
+def test_idle_browser_is_closed_and_relaunched_on_demand(session, launched):
+    session.idle_s = 0.05
+    session.run(lambda b, l: _value(b), timeout=2)
+    assert launched[0].closed.wait(2)
+    deadline = time.monotonic() + 2
+    while session.stats()["warm"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = session.stats()
+    assert stats["idle_closes"] == 1 and not stats["warm"]
+
+    session.idle_s = 0
+    assert session.run(lambda b, l: _value(b), timeout=2) is launched[1]
+    assert session.stats()["launches"] == 2 and not launched[1].closed.is_set()
+
+
+def test_close_browser_forces_a_relaunch(session, launched):
+    session.run(lambda b, l: _value(b), timeout=2)
+    session.close_browser(timeout=2)
+    assert launched[0].closed.is_set() and not session.stats()["warm"]
+    session.run(lambda b, l: _value(b), timeout=2)
+    assert len(launched) == 2
+
+
+# ───────────────────────────────────────────────────────────
+# web._build_browser keeps the shared browser alive
+# ───────────────────────────────────────────────────────────
+class _Symbol:
+    def __init__(self, value):
+        self.value = value
+
+    def resolve(self):
+        return self.value
+
+
+@pytest.fixture
+def browser_use(monkeypatch, tmp_path):
+    """Fake browser_use classes that record how they were constructed."""
+    calls = []
+
+    def recorder(name, accepts=None):
+        class Fake:
+            def __init__(self, **kwargs):
+                if accepts is not None and not set(kwargs) <= accepts:
+                    raise TypeError(f"{name} got unexpected {sorted(set(kwargs) - accepts)}")
+                calls.append((name, kwargs))
+                self.kwargs = kwargs
+        return Fake
+
+    def install(browser_accepts=None, config=True, profile=True):
+        monkeypatch.setattr(web, "_BROWSER", _Symbol(recorder("Browser", browser_accepts)))
+        monkeypatch.setattr(web, "_BROWSER_CONFIG", _Symbol(recorder("BrowserConfig") if config else None))
+        monkeypatch.setattr(web, "_BROWSER_PROFILE", _Symbol(recorder("BrowserProfile") if profile else None))
+        return calls
+
+    monkeypatch.setattr(web, "DOWNLOADS_DIR", tmp_path / "downloads")
+    monkeypatch.setattr(web, "OPERA_PROFILE_PATH", None)
+    monkeypatch.setattr(web, "USER_DATA_DIR", None)
+    return install
+
+
+def test_build_browser_passes_keep_alive_through_browser_config(browser_use):
+    calls = browser_use()
+    browser = web._build_browser()
+    [(config_cls, config), (browser_cls, _)] = calls
+    assert (config_cls, browser_cls) == ("BrowserConfig", "Browser") and config["keep_alive"] is True
+    assert config["headless"] == web.HEADLESS and browser.kwargs["config"].kwargs is config
+
+
+def test_build_browser_passes_keep_alive_without_browser_config(browser_use):
+    calls = browser_use(config=False)
+    web._build_browser()
+    assert calls == [("Browser", {"headless": web.HEADLESS, "keep_alive": True})]
+
+
+def test_build_browser_passes_keep_alive_through_browser_profile(browser_use):
+    calls = browser_use(browser_accepts={"browser_profile"}, config=False)
+    web._build_browser()
+    [(profile_cls, profile), (browser_cls, kwargs)] = calls
+    assert (profile_cls, browser_cls) == ("BrowserProfile", "Browser")
+    assert profile == {"headless": web.HEADLESS, "keep_alive": True} and set(kwargs) == {"browser_profile"}